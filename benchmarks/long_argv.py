@@ -0,0 +1,58 @@
+"""
+Benchmark `CLI.parse_cli` on very long argv.
+
+Parses argv of increasing length through `nargs="*"` and `extend` options and reports
+the cost per token. Parsing is linear when the cost per token stays flat as argv grows.
+
+Usage:
+    python benchmarks/long_argv.py
+"""
+
+import sys
+import time
+from unittest.mock import patch
+
+from saiuncli.cli import CLI
+from saiuncli.option import Option
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def build_cli() -> CLI:
+    return CLI(
+        title="Benchmark",
+        handler=lambda **kwargs: None,
+        options=[
+            Option(flags=["-f", "--files"], nargs="*"),
+            Option(flags=["-i", "--include"], action="extend", nargs="*"),
+        ],
+    )
+
+
+def build_argv(size: int):
+    half = size // 2
+    return (
+        ["bench", "--files"]
+        + [f"file_{i}.txt" for i in range(half)]
+        + ["--include"]
+        + [f"dir_{i}" for i in range(size - half)]
+    )
+
+
+def time_parse(cli: CLI, argv) -> float:
+    with patch.object(sys, "argv", argv):
+        start = time.perf_counter()
+        cli.parse_cli()
+        return time.perf_counter() - start
+
+
+def main():
+    cli = build_cli()
+    print(f"{'tokens':>10} {'total (ms)':>12} {'per token (us)':>16}")
+    for size in SIZES:
+        elapsed = min(time_parse(cli, build_argv(size)) for _ in range(3))
+        print(f"{size:>10} {elapsed * 1e3:>12.2f} {elapsed / size * 1e6:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
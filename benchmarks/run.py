@@ -0,0 +1,361 @@
+"""
+Startup, parsing and rendering benchmarks for SaiunCLI.
+
+Runs every benchmark, prints a summary table and optionally writes the results as JSON
+so they can be compared across releases.
+
+Usage:
+    python benchmarks/run.py [--json results.json] [--filter parse] [--rounds 5]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from unittest.mock import patch
+
+from saiuncli.argument import Argument
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli.completion import complete, load_index, save_index
+from saiuncli.console import Console
+from saiuncli.daemon import DaemonServer, forward
+from saiuncli.exceptions import ParseError
+from saiuncli.option import Option
+
+from long_argv import build_argv, build_cli as build_long_argv_cli
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, items: int = 1, self_timed: bool = False):
+    """
+    Register a benchmark.
+
+    The decorated function does any setup and returns the callable to time. `items` is the
+    number of operations one call performs and is used to report throughput. Callables of
+    `self_timed` benchmarks measure themselves and return the elapsed seconds.
+    """
+
+    def decorator(func):
+        BENCHMARKS[name] = (func, items, self_timed)
+        return func
+
+    return decorator
+
+
+def _handler(**kwargs):
+    pass
+
+
+def build_tree(size: int) -> CLI:
+    """Build a CLI with `size` leaf commands spread over groups of 10."""
+    groups = []
+    for group_index in range(max(size // 10, 1)):
+        leaves = [
+            Command(
+                name=f"cmd{leaf_index}",
+                handler=_handler,
+                description=f"Leaf command {leaf_index}.",
+                options=[
+                    Option(flags=["-n", "--name"], description="A name."),
+                    Option(flags=["-c", "--count"], type=int, default=1),
+                    Option(flags=["-v", "--verbose"], action="store_true"),
+                ],
+                arguments=[Argument(name="target", description="A target.")],
+            )
+            for leaf_index in range(min(size, 10))
+        ]
+        groups.append(
+            Command(
+                name=f"group{group_index}",
+                handler=_handler,
+                description=f"Group {group_index}.",
+                subcommands=leaves,
+            )
+        )
+    return CLI(title="Benchmark", version="1.0.0", handler=_handler, subcommands=groups)
+
+
+def _import_time_us(module: str) -> int:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.rsplit("|", 1)[-1].strip() == module:
+            return int(line.split("|")[1])
+    raise RuntimeError(f"{module} was not imported")
+
+
+@benchmark("import_saiuncli_cli", self_timed=True)
+def bench_import():
+    # Measured with `-X importtime` in a fresh interpreter, the module is cached here.
+    return lambda: _import_time_us("saiuncli.cli") / 1e6
+
+
+for _size in (10, 100, 1000):
+
+    @benchmark(f"construct_tree[{_size}]")
+    def bench_construct(size=_size):
+        return lambda: build_tree(size).compile()
+
+
+@benchmark("compile_from_cache[1000]")
+def bench_compile_cached():
+    cache_path = os.path.join(tempfile.gettempdir(), "saiuncli-bench-plan.cache")
+    build_tree(1000).compile(cache_path)
+    return lambda: build_tree(1000).compile(cache_path)
+
+
+@benchmark("parse_short_argv", items=1000)
+def bench_parse_short():
+    cli = build_tree(1000)
+    argv = ["tool", "group42", "cmd7", "--name", "x", "--count", "3", "-v", "target"]
+    cli.compile()
+
+    def run():
+        with patch.object(sys, "argv", argv):
+            for _ in range(1000):
+                cli.parse_cli()
+
+    return run
+
+
+@benchmark("parse_long_argv[100000]", items=100_000)
+def bench_parse_long():
+    cli = build_long_argv_cli()
+    argv = build_argv(100_000)
+    cli.compile()
+
+    def run():
+        with patch.object(sys, "argv", argv):
+            cli.parse_cli()
+
+    return run
+
+
+@benchmark("parse_numeric_values[100000]", items=100_000)
+def bench_parse_numeric():
+    cli = CLI(
+        title="Benchmark",
+        handler=_handler,
+        options=[Option(flags=["--ids"], type=int, nargs="*", choices=range(100_000))],
+    )
+    argv = ["--ids"] + [str(index) for index in range(100_000)]
+    cli.compile()
+
+    def run():
+        cli.parse(argv)
+
+    return run
+
+
+@benchmark("complete_from_index[1000]", items=1000)
+def bench_complete():
+    index_path = os.path.join(tempfile.gettempdir(), "saiuncli-bench-completion.index")
+    save_index(build_tree(1000), index_path)
+
+    def run():
+        for _ in range(1000):
+            complete(load_index(index_path), ["group42", "cmd7", "--n"])
+
+    return run
+
+
+@benchmark("suggest_flag[5000]", items=100)
+def bench_suggest_flag():
+    cli = CLI(
+        title="Benchmark",
+        handler=_handler,
+        options=[Option(flags=[f"--option-{index}"]) for index in range(5000)],
+    )
+    cli.compile()
+
+    def run():
+        for index in range(100):
+            try:
+                cli.parse([f"--optoin-{index * 37}"])
+            except ParseError:
+                pass
+
+    return run
+
+
+@benchmark("display_help")
+def bench_display_help():
+    cli = build_tree(100)
+    command = cli.find_subcommand("group3").find_subcommand("cmd5")
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.display_help(command)
+
+    return run
+
+
+@benchmark("console_success_plain", items=10_000)
+def bench_console_success_plain():
+    console = Console()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(10_000):
+                console.success(f"Processed item {index}")
+
+    return run
+
+
+@benchmark("console_success_rich", items=10_000)
+def bench_console_success_rich():
+    console = Console()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()), patch.dict(os.environ, FORCE_COLOR="1"):
+            for index in range(10_000):
+                console.success(f"Processed item {index}")
+
+    return run
+
+
+@benchmark("console_success_rich_buffered", items=10_000)
+def bench_console_success_rich_buffered():
+    console = Console()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()), patch.dict(os.environ, FORCE_COLOR="1"):
+            with console.buffered():
+                for index in range(10_000):
+                    console.success(f"Processed item {index}")
+
+    return run
+
+
+@benchmark("console_success_jsonl", items=10_000)
+def bench_console_success_jsonl():
+    console = Console(output_format="jsonl")
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(10_000):
+                console.success(f"Processed item {index}")
+
+    return run
+
+
+def _write_lines(console: Console, writer: int, lines: int):
+    for index in range(lines):
+        console.success(f"Writer {writer} item {index}")
+
+
+@benchmark("console_threads[16]", items=16_000)
+def bench_console_threads():
+    console = Console()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()), patch.dict(os.environ, FORCE_COLOR="1"):
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                list(executor.map(_write_lines, [console] * 16, range(16), [1000] * 16))
+
+    return run
+
+
+@benchmark("console_shared_processes[16]", items=16_000)
+def bench_console_shared_processes():
+    console = Console()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()), patch.dict(os.environ, FORCE_COLOR="1"):
+            with console.shared(), ProcessPoolExecutor(max_workers=16) as executor:
+                list(executor.map(_write_lines, [console] * 16, range(16), [1000] * 16))
+
+    return run
+
+
+@benchmark("daemon_round_trip", items=100)
+def bench_daemon_round_trip():
+    socket_path = os.path.join(tempfile.mkdtemp(), "saiuncli-bench.sock")
+    server = DaemonServer(build_tree(1000), socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(100):
+                forward(socket_path, ["group42"])
+
+    return run
+
+
+def run_benchmark(name: str, rounds: int) -> dict:
+    func, items, self_timed = BENCHMARKS[name]
+    call = func()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = call()
+        elapsed = time.perf_counter() - start
+        timings.append(result if self_timed else elapsed)
+    best = min(timings)
+    return {
+        "rounds": rounds,
+        "min_s": best,
+        "mean_s": statistics.mean(timings),
+        "median_s": statistics.median(timings),
+        "items": items,
+        "items_per_s": items / best if best else None,
+    }
+
+
+def _saiuncli_version() -> str:
+    try:
+        return version("saiuncli")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", help="Write the results as JSON to this path.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks matching this text.")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark.")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<28} {'min (ms)':>10} {'median (ms)':>12} {'items/s':>14}")
+    for name in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        result = run_benchmark(name, args.rounds)
+        results[name] = result
+        print(
+            f"{name:<28} {result['min_s'] * 1e3:>10.3f} {result['median_s'] * 1e3:>12.3f}"
+            f" {result['items_per_s']:>14,.0f}"
+        )
+
+    if args.json:
+        report = {
+            "saiuncli_version": _saiuncli_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "benchmarks": results,
+        }
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 _ROOT_COMMAND_NAME = "root"
 _HELP_NAME = "help"
 _VERSION_NAME = "version"
+_BATCH_NAME = "batch"
+_OUTPUT_NAME = "output"
 _GLOBAL_FLAGS = {
     _HELP_NAME: ["-h", "--help"],
     _VERSION_NAME: ["-V", "--version"],
 }
 _DEFAULT_USAGE = "<SUBCOMMANDS>[OPTIONS][ARGUMENTS]"
 _DEFAULT_CONFIG_FILE = ".saiuncli"
+_PROFILE_ENV = "SAIUNCLI_PROFILE"
+_PROFILE_FLAG = "--saiun-profile"
+_OUTPUT_ENV = "SAIUNCLI_OUTPUT"
+_OUTPUT_FORMATS = ("text", "json", "jsonl")
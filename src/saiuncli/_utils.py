@@ -1,6 +1,25 @@
-from typing import List
+import os
+import re
+import heapq
+import threading
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from difflib import get_close_matches
 
+# Matches `rich` console markup tags, along with the backslashes escaping them.
+_MARKUP_TAG = re.compile(r"((\\*)\[([a-z#/@][^[]*?)])")
+
 
 def _is_flag(flag: str) -> bool:
     """
@@ -29,7 +48,8 @@ def _is_long_flag(flag: str) -> bool:
     """
     if len(flag) <= 2 or not flag.startswith("--"):
         return False
-    return all(c.isalnum() or c == "-" for c in flag[2:])
+    name = flag[2:].replace("-", "")
+    return not name or name.isalnum()
 
 
 def _split_short_stack_flags(flag: str) -> List[str]:
@@ -56,9 +76,50 @@ def _possible_commands(command: str, commands: List[str], cutoff: float = 0.6) -
     return get_close_matches(command, commands, n=3, cutoff=cutoff)
 
 
-def _validate_flags(flags: List[str]):
+def _strip_markup(text: str) -> str:
+    """
+    Remove `rich` console markup tags from a string, keeping escaped brackets as text.
+    """
+    if "[" not in text:
+        return text
+
+    def replace(match: "re.Match") -> str:
+        backslashes = match.group(2)
+        escapes, escaped = divmod(len(backslashes), 2)
+        if escaped:
+            return "\\" * escapes + match.group(1).lstrip("\\")
+        return "\\" * escapes
+
+    return _MARKUP_TAG.sub(replace, text)
+
+
+def _atomic_write(path: str, data: bytes) -> bool:
+    """
+    Replace a file with new contents atomically.
+
+    Returns:
+        bool: Whether the file was written.
+    """
+    # Concurrent writers, in this or other processes, never share a temporary file.
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    return True
+
+
+def _validate_flags(flags: Sequence[str]) -> Tuple[Optional[str], Optional[str]]:
     """
     Ensure there are only 2 flags. At most 1 short flag and 1 long flag.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The long flag and the short flag, if any.
     """
     if len(flags) > 2:
         raise ValueError(f"Too many flags detected: {flags}. Only 2 flags are allowed per option.")
@@ -66,21 +127,233 @@ def _validate_flags(flags: List[str]):
     if len(flags) == 0:
         raise ValueError(f"No flags detected: {flags}. At least 1 flag is required per option.")
 
-    long_flags = 0
-    short_flags = 0
+    long_flags = []
+    short_flags = []
     for flag in flags:
-        if not _is_flag(flag):
+        if _is_long_flag(flag):
+            long_flags.append(flag)
+        elif _is_short_flag(flag):
+            short_flags.append(flag)
+        elif not _is_short_stack_flag(flag):
             raise ValueError(f"Invalid flag detected: {flag}. Flags must start with '-' or '--'.")
-        long_flags += 1 if _is_long_flag(flag) else 0
-        short_flags += 1 if _is_short_flag(flag) else 0
 
-    if long_flags > 1:
+    if len(long_flags) > 1:
         raise ValueError(
             f"Too many long flags detected: {flags}. "
             + "At most 1 long flag and 1 short flag are allowed per option."
         )
-    if short_flags > 1:
+    if len(short_flags) > 1:
         raise ValueError(
             f"Too many short flags detected: {flags}. "
             + "At most 1 long flag and 1 short flag are allowed per option."
         )
+    return (long_flags[0] if long_flags else None, short_flags[0] if short_flags else None)
+
+
+def _restore_frozen(cls: type, state: Dict[str, Any]) -> Any:
+    instance = cls.__new__(cls)
+    for name, value in state.items():
+        object.__setattr__(instance, name, value)
+    return instance
+
+
+class _Frozen:
+    """
+    Base of immutable objects whose attributes live in `__slots__`.
+
+    Subclasses set their attributes once in `__init__` with `_set`; any later assignment
+    raises an AttributeError.
+    """
+
+    __slots__ = ()
+
+    def _set(self, **attributes: Any):
+        for name, value in attributes.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"'{type(self).__name__}' objects are immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"'{type(self).__name__}' objects are immutable")
+
+    def __reduce__(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        return _restore_frozen, (type(self), state)
+
+
+class _TokenStream:
+    """
+    Cursor over command line tokens.
+
+    Tokens are consumed from the front without copying the remaining input, so a full
+    pass over the stream is linear in the number of tokens. Tokens pushed back with
+    `push_front` (e.g. the expanded flags of a short stack) and sources pushed with
+    `push_source` (e.g. the lines of an arguments file) are consumed first. Sources are
+    only read as their tokens are consumed.
+    """
+
+    def __init__(self, tokens: Iterable[str]):
+        self._sources: List[Iterator[str]] = [iter(tokens)]
+        self._pushed: List[str] = []
+
+    def _fill(self) -> bool:
+        """
+        Make the next token available in `_pushed`, returning whether there is one.
+        """
+        while not self._pushed and self._sources:
+            token = next(self._sources[-1], None)
+            if token is None:
+                self._sources.pop()
+            else:
+                self._pushed.append(token)
+        return bool(self._pushed)
+
+    def __bool__(self) -> bool:
+        return self._fill()
+
+    def peek(self) -> Optional[str]:
+        """
+        Return the next token without consuming it, or None if the stream is empty.
+        """
+        return self._pushed[-1] if self._fill() else None
+
+    def pop(self) -> str:
+        """
+        Consume and return the next token.
+        """
+        if not self._fill():
+            raise IndexError("pop from empty token stream")
+        return self._pushed.pop()
+
+    def push_front(self, tokens: List[str]):
+        """
+        Push tokens back onto the front of the stream, preserving their order.
+        """
+        self._pushed.extend(reversed(tokens))
+
+    def push_source(self, tokens: Iterable[str]):
+        """
+        Push a source of tokens onto the front of the stream, reading it lazily.
+        """
+        if self._pushed:
+            self._sources.append(iter(self._pushed[::-1]))
+            self._pushed.clear()
+        self._sources.append(iter(tokens))
+
+    def pop_values(
+        self,
+        limit: Optional[int] = None,
+        expand: Optional[Callable[[str], Optional[Iterable[str]]]] = None,
+    ) -> List[str]:
+        """
+        Consume the values up to the next flag, at most `limit` of them if given.
+
+        If `expand` returns tokens for a value (e.g. the arguments of a file it names),
+        they are read in its place.
+        """
+        values = []
+        pushed, sources = self._pushed, self._sources
+        while limit is None or len(values) < limit:
+            if pushed:
+                token = pushed.pop()
+            elif sources:
+                token = next(sources[-1], None)
+                if token is None:
+                    sources.pop()
+                    continue
+            else:
+                break
+            # Most values do not start with "-", so the flag checks are skipped for them.
+            if token[:1] == "-" and _is_flag(token):
+                pushed.append(token)
+                break
+            expanded = expand(token) if expand is not None else None
+            if expanded is not None:
+                self.push_source(expanded)
+                continue
+            values.append(token)
+        return values
+
+    def next_is_value(self) -> bool:
+        """
+        Check if the next token exists and is a value rather than a flag.
+        """
+        token = self.peek()
+        return token is not None and not _is_flag(token)
+
+
+def _convert_all(type: Callable[[str], Any], values: List[str]) -> List[Any]:
+    """
+    Convert values with a type, calling it once per value.
+    """
+    return list(map(type, values))
+
+
+def _all_in(values: Iterable[Any], choices: Collection[Any]) -> bool:
+    """
+    Check if every value is one of the choices.
+
+    Frozen choices are checked with a single subset test instead of a lookup per value.
+    """
+    if isinstance(choices, frozenset):
+        try:
+            return choices.issuperset(values)
+        except TypeError:
+            return False
+    return all(value in choices for value in values)
+
+
+def _names_with_prefix(sorted_names: Sequence[str], prefix: str) -> List[str]:
+    """
+    Get the names starting with a prefix from a sorted sequence of names.
+    """
+    start = bisect_left(sorted_names, prefix)
+    end = start
+    while end < len(sorted_names) and sorted_names[end].startswith(prefix):
+        end += 1
+    return list(sorted_names[start:end])
+
+
+def _bigrams(name: str) -> List[str]:
+    padded = f"\0{name}\0"
+    return [first + second for first, second in zip(padded, padded[1:])]
+
+
+class _SuggestionIndex:
+    """
+    Bigram index over names, to suggest the names closest to a misspelled one.
+
+    Only the names sharing the most bigrams with the misspelled name are ranked with
+    `_possible_commands`, so a lookup does not compare against every name.
+    """
+
+    def __init__(self, names: Iterable[str], shortlist: int = 10):
+        self._names = list(dict.fromkeys(names))
+        self._shortlist = shortlist
+        self._postings: Dict[str, List[int]] = {}
+        for position, name in enumerate(self._names):
+            for bigram in set(_bigrams(name)):
+                self._postings.setdefault(bigram, []).append(position)
+
+    def suggest(self, name: str, limit: int = 3) -> List[str]:
+        """
+        Get up to `limit` names close to `name`, the closest first.
+        """
+        postings = [self._postings.get(bigram, ()) for bigram in set(_bigrams(name))]
+        # Bigrams shared by most names, like the "--" of long flags, barely narrow down the
+        # candidates and dominate the lookup time, so they are only counted as a fallback.
+        common = max(50, len(self._names) // 10)
+        matches = []
+        for skip_common in (True, False):
+            shared: Dict[int, int] = {}
+            for positions in postings:
+                if skip_common and len(positions) > common:
+                    continue
+                for position in positions:
+                    shared[position] = shared.get(position, 0) + 1
+            candidates = heapq.nlargest(self._shortlist, shared, key=shared.__getitem__)
+            matches = _possible_commands(name, [self._names[position] for position in candidates])
+            if matches:
+                break
+        return matches[:limit]
@@ -1,7 +1,11 @@
 from typing import Optional, List, Any
 
+from saiuncli._utils import _Frozen
+
+
+class Argument(_Frozen):
+    __slots__ = ("name", "description", "required", "default", "choices", "type", "stream")
 
-class Argument:
     def __init__(
         self,
         name: str,
@@ -10,10 +14,13 @@ class Argument:
         default: Optional[str] = None,
         choices: Optional[List[Any]] = None,
         type: Optional[type] = str,
+        stream: bool = False,
     ):
         """
         Initialize an Argument object.
 
+        Arguments are immutable once created.
+
         Args:
             name (str):
                 The name of the argument.
@@ -24,13 +31,21 @@ class Argument:
             default (Optional[str]):
                 The default value for the argument.
             choices (Optional[List[Any]]):
-                The choices available for the argument.
+                The choices available for the argument. A `range` is checked without
+                listing its values.
             type (Optional[type]):
                 The type of the argument.
+            stream (bool):
+                Whether the value names a source of many values: "-" for stdin or "@path" for
+                a file with one value per line. The handler receives a `ValueSource` that reads
+                the values lazily.
         """
-        self.name = name
-        self.description = description
-        self.required = required
-        self.default = default
-        self.choices = choices
-        self.type = type
+        self._set(
+            name=name,
+            description=description,
+            required=required,
+            default=default,
+            choices=choices,
+            type=type,
+            stream=stream,
+        )
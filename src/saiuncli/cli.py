@@ -1,23 +1,107 @@
 import os
 import sys
-from typing import Optional, List, Dict, Any
+import json
+import hashlib
+import threading
+from contextlib import nullcontext
+from contextvars import copy_context
+from collections.abc import Awaitable
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    List,
+    Dict,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from rich.text import Text
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Future
 
-from saiuncli._constants import _ROOT_COMMAND_NAME, _HELP_NAME, _VERSION_NAME, _GLOBAL_FLAGS
+from saiuncli._constants import (
+    _ROOT_COMMAND_NAME,
+    _HELP_NAME,
+    _VERSION_NAME,
+    _BATCH_NAME,
+    _OUTPUT_NAME,
+    _OUTPUT_FORMATS,
+    _GLOBAL_FLAGS,
+)
 from saiuncli.option import Option
 from saiuncli.argument import Argument
 from saiuncli.command import Command
+from saiuncli.middleware import Middleware
 from saiuncli.console import Console
+from saiuncli.exceptions import CLIError, HandlerError, ParseError
+from saiuncli.sources import ValueSource, args_file_tokens
+from saiuncli.profiling import Profiler, _IMPORTED_AT_NS, _profiler_from_argv
+from saiuncli.plan import (
+    ArgumentSpec,
+    CommandPlan,
+    OptionSpec,
+    ParserPlan,
+    compile_lazy_subcommand,
+    compile_plan,
+    load_plan,
+    save_plan,
+    tree_key,
+)
 
 from saiuncli._utils import (
+    _all_in,
+    _convert_all,
     _is_flag,
     _is_short_stack_flag,
     _split_short_stack_flags,
     _validate_flags,
+    _atomic_write,
+    _names_with_prefix,
+    _SuggestionIndex,
+    _TokenStream,
 )
 
 
+_NOT_PROFILED = nullcontext()
+
+
+# The code flag of `async def` functions, `inspect.CO_COROUTINE`.
+_CO_COROUTINE = 0x80
+
+
+def _is_coroutine_function(func: Optional[Callable[..., Any]]) -> bool:
+    """
+    Check if a handler or hook is a coroutine function.
+
+    Plain functions and methods are checked from their code flags, `inspect` is only imported
+    for other callables such as partials.
+    """
+    if func is None:
+        return False
+    code = getattr(func, "__code__", None)
+    if code is not None and getattr(func, "_is_coroutine_marker", None) is None:
+        return bool(code.co_flags & _CO_COROUTINE)
+    import inspect
+
+    return inspect.iscoroutinefunction(func)
+
+
+def _is_awaitable(value: Any) -> bool:
+    return isinstance(value, Awaitable)
+
+
+async def _maybe_await(value: Any) -> Any:
+    if _is_awaitable(value):
+        return await value
+    return value
+
+
 class ParsedCLI:
     def __init__(
         self,
@@ -26,6 +110,8 @@ class ParsedCLI:
         parsed_args: Dict[str, Any],
         help: bool = False,
         version: bool = False,
+        batch: Optional[str] = None,
+        output: Optional[str] = None,
     ):
         """
         Initialize a ParsedCLI object.
@@ -34,12 +120,16 @@ class ParsedCLI:
             commands (List[str]): List of commands parsed from the CLI input.
             parsed_options (Dict[str, Any]): Dictionary of option names and their values.
             parsed_args (Dict[str, Any]): Dictionary of argument names and their values.
+            batch (Optional[str]): The batch file to run, "-" for stdin.
+            output (Optional[str]): The output format selected with an output flag.
         """
         self.commands = commands
         self.parsed_options = parsed_options
         self.parsed_args = parsed_args
         self.help = help
         self.version = version
+        self.batch = batch
+        self.output = output
 
     def __repr__(self):
         """String representation for debugging."""
@@ -69,6 +159,55 @@ class ParsedCLI:
         return {**self.parsed_options, **self.parsed_args}
 
 
+class BatchResult(NamedTuple):
+    """
+    The outcome of one command line of a batch.
+
+    Attributes:
+        line_number (int): The line number of the command line in the batch.
+        argv (List[str]): The command line arguments of the line.
+        exit_code (int): The exit status of the command line, 0 on success.
+        error (Optional[str]): The error message if the command line failed.
+    """
+
+    line_number: int
+    argv: List[str]
+    exit_code: int
+    error: Optional[str] = None
+
+
+class FanOutResult(NamedTuple):
+    """
+    The outcome of one handler call of a fan-out command.
+
+    Attributes:
+        value (Any): The value of the fan-out argument the handler was called with.
+        result (Any): The value returned by the handler.
+        error (Optional[str]): The error message if the handler raised an exception.
+    """
+
+    value: Any
+    result: Any = None
+    error: Optional[str] = None
+
+
+def _call_handler(handler: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+    """Call a handler from a worker thread or process, running it to completion."""
+    result = handler(**kwargs)
+    if _is_awaitable(result):
+        import asyncio
+
+        result = asyncio.run(_maybe_await(result))
+    return result
+
+
+def _fan_out_result(value: Any, future: "Future") -> FanOutResult:
+    error = future.exception()
+    if error is not None:
+        return FanOutResult(value, error=str(error) or type(error).__name__)
+    return FanOutResult(value, result=future.result())
+
+
 class CLI(Command):
     def __init__(
         self,
@@ -85,6 +224,15 @@ class CLI(Command):
         global_options: Optional[List[Option]] = None,
         global_arguments: Optional[List[Argument]] = None,
         subcommands: Optional[List[Command]] = None,
+        plan_cache: Optional[str] = None,
+        help_cache: Optional[str] = None,
+        batch_flags: Optional[List[str]] = None,
+        batch_workers: int = 1,
+        allow_abbrev: bool = False,
+        fromfile_prefix_chars: Optional[str] = None,
+        middleware: Optional[List[Middleware]] = None,
+        global_middleware: Optional[List[Middleware]] = None,
+        output_flags: Optional[List[str]] = None,
     ):
         """
         Initialize an AuraCLI object.
@@ -92,6 +240,10 @@ class CLI(Command):
         Operations for displaying "help" and "version" information are handled automatically
         and reserve the flags ["--help", "-h"] and ["--version", "-V"] respectively.
 
+        Setting the `SAIUNCLI_PROFILE` environment variable, or passing the hidden
+        `--saiun-profile` flag, makes `run` time the phases of the invocation and report
+        them on stderr. See `Profiler.from_spec` for the available modes.
+
         Args:
             title (str):
                 The title of the CLI tool.
@@ -123,13 +275,59 @@ class CLI(Command):
                 The global arguments available for the base CLI command and any subcommands.
             subcommands (Optional[List[Command]]):
                 The subcommands available for the base CLI command.
+            plan_cache (Optional[str]):
+                Path of a file to cache the compiled parser plan in. See `compile`.
+            help_cache (Optional[str]):
+                Path of a file to persist rendered help messages in, so they are not
+                rendered again by later invocations of the CLI tool.
+            batch_flags (Optional[List[str]]):
+                The flags for the CLI batch operation, e.g. ["--batch"]. The flag takes the
+                path of a file of command lines to run, or "-" for stdin. See `run_batch`.
+                Batch mode is disabled if not provided.
+            batch_workers (int):
+                The number of threads running the command lines of a batch in parallel.
+            allow_abbrev (bool):
+                Whether subcommands can be selected by a unique prefix of their name or
+                alias, e.g. `tool dep` for `tool deploy`. An ambiguous prefix is an error.
+            fromfile_prefix_chars (Optional[str]):
+                The characters marking an arguments file, e.g. "@" to expand `@args.txt`
+                into the arguments it holds, one per line. Arguments files are read lazily,
+                so they can hold more arguments than the system allows on a command line.
+                Option values can be read from arguments files too, e.g. `--ids @ids.txt`,
+                except for streamed options and arguments, whose `@path` is a file to stream.
+            middleware (Optional[List[Middleware]]):
+                The middleware run around the base CLI command, and any subcommands created
+                with `inherit_middleware=True`.
+            global_middleware (Optional[List[Middleware]]):
+                The middleware run around every command, before any other middleware.
+            output_flags (Optional[List[str]]):
+                The flags selecting the output format of the console, e.g. ["--output"].
+                The flag takes "text", "json" or "jsonl", and overrides the format of the
+                console for the invocation. See `Console`.
         """
         self.version_flags = version_flags or _GLOBAL_FLAGS[_VERSION_NAME]
         self.help_flags = help_flags or _GLOBAL_FLAGS[_HELP_NAME]
+        self.batch_flags = batch_flags or []
+        self.output_flags = output_flags or []
         _validate_flags(self.help_flags)
         _validate_flags(self.version_flags)
         if any(flag in self.help_flags for flag in self.version_flags):
             raise ValueError("Duplicate flags detected for help and version operations.")
+        if self.batch_flags:
+            _validate_flags(self.batch_flags)
+            if any(flag in self.help_flags + self.version_flags for flag in self.batch_flags):
+                raise ValueError(
+                    "Duplicate flags detected for batch and help or version operations."
+                )
+        if self.output_flags:
+            _validate_flags(self.output_flags)
+            reserved_flags = self.help_flags + self.version_flags + self.batch_flags
+            if any(flag in reserved_flags for flag in self.output_flags):
+                raise ValueError(
+                    "Duplicate flags detected for output and help, version or batch operations."
+                )
+        if batch_workers < 1:
+            raise ValueError("batch_workers must be at least 1.")
 
         super().__init__(
             name=_ROOT_COMMAND_NAME,
@@ -141,47 +339,255 @@ class CLI(Command):
             arguments=arguments,
             inherit_arguments=False,
             subcommands=subcommands,
+            middleware=middleware,
         )
         self.title = title
         self.version = version
         self.global_options = global_options or []
         self.global_arguments = global_arguments or []
-        self._cli_command = ""
+        self.global_middleware = global_middleware or []
         self.console = console or Console()
+        self.plan_cache = plan_cache
+        self.help_cache = help_cache
+        self.batch_workers = batch_workers
+        self.allow_abbrev = allow_abbrev
+        self.fromfile_prefix_chars = fromfile_prefix_chars
+        self._compile_lock = threading.Lock()
+        self._loops = threading.local()
+        self._help_lock = threading.Lock()
+        self._rendered_help: Optional[Dict[str, str]] = None
+        self._suggestion_indexes: Dict[Tuple[Tuple[str, ...], str], _SuggestionIndex] = {}
+        self._profiler: Optional[Profiler] = None
+
+    @property
+    def _global_options(self) -> List[Option]:
+        return self.global_options
+
+    @property
+    def _global_middleware(self) -> List[Middleware]:
+        return self.global_middleware
+
+    def _tree_changed(self):
+        super()._tree_changed()
+        self._rendered_help = None
+        self._suggestion_indexes = {}
 
     def add_global_option(self, option: Option):
         self.global_options.append(option)
+        self._invalidate_caches()
 
     def add_global_options(self, options: List[Option]):
         self.global_options.extend(options)
+        self._invalidate_caches()
 
     def add_global_argument(self, argument: Argument):
         self.global_arguments.append(argument)
+        self._invalidate_caches()
 
     def add_global_arguments(self, arguments: List[Argument]):
         self.global_arguments.extend(arguments)
+        self._invalidate_caches()
+
+    def add_global_middleware(self, middleware: Middleware):
+        self.global_middleware.append(middleware)
+        self._invalidate_caches()
+
+    def _phase(self, name: str):
+        """Time a phase of the invocation if it is profiled."""
+        if self._profiler is None:
+            return _NOT_PROFILED
+        return self._profiler.phase(name)
+
+    def _capture(self):
+        """Profile the handler of the invocation if asked to."""
+        if self._profiler is None:
+            return _NOT_PROFILED
+        return self._profiler.capture()
+
+    def compile(self, cache_path: Optional[str] = None) -> ParserPlan:
+        """Freeze the command tree into a pre-validated parser plan.
+
+        Every command is validated once and its flag tables, argument slots, defaults and
+        choices are frozen into a `ParserPlan` used by `parse_cli`. The plan is reused
+        until the command tree is modified. `parse_cli` compiles the tree automatically.
+
+        Args:
+            cache_path (Optional[str]):
+                Path of a file to cache the plan in. If the file holds a plan compiled from
+                the same tree definition, it is loaded instead of revalidating the tree.
+                Defaults to the `plan_cache` of the CLI.
+
+        Returns:
+            ParserPlan: The compiled parser plan.
+        """
+        if self._plan is not None and cache_path is None:
+            return self._plan
+        with self._compile_lock:
+            if self._plan is not None and cache_path is None:
+                return self._plan
+            cache_path = cache_path or self.plan_cache
+            key = tree_key(
+                self,
+                help_flags=self.help_flags,
+                version_flags=self.version_flags,
+                global_options=self.global_options,
+                global_arguments=self.global_arguments,
+                batch_flags=self.batch_flags,
+                output_flags=self.output_flags,
+            )
+            with self._phase("load_plan"):
+                plan = load_plan(cache_path, key) if cache_path else None
+            if plan is None:
+                with self._phase("compile"):
+                    plan = compile_plan(
+                        self,
+                        key,
+                        help_flags=self.help_flags,
+                        version_flags=self.version_flags,
+                        global_arguments=self.global_arguments,
+                        batch_flags=self.batch_flags,
+                        output_flags=self.output_flags,
+                    )
+                if cache_path:
+                    save_plan(cache_path, plan)
+            self._plan = plan
+            return plan
+
+    def _command_at(self, path: Sequence[str]) -> Command:
+        """Get the command at the end of a path of subcommand names."""
+        command = self
+        for name in path:
+            command = command.find_subcommand(name)
+        return command
+
+    def _parse_error(self, error: str, command: CommandPlan) -> ParseError:
+        """Build the error raised for invalid input to a command."""
+        return ParseError(error, command=self._command_at(command.path))
+
+    def _did_you_mean(self, command: CommandPlan, kind: str, name: str) -> str:
+        """Suggest the flags or subcommand names of a command closest to a misspelled one.
+
+        The suggestion index of a command is built the first time it is needed and kept
+        until the command tree is modified.
+        """
+        key = (command.path, kind)
+        index = self._suggestion_indexes.get(key)
+        if index is None:
+            if kind == "flags":
+                names = [
+                    *command.flags,
+                    *self.help_flags,
+                    *self.version_flags,
+                    *self.batch_flags,
+                    *self.output_flags,
+                ]
+            else:
+                names = command.subcommand_names
+            index = self._suggestion_indexes[key] = _SuggestionIndex(names)
+        suggestions = [f"'{suggestion}'" for suggestion in index.suggest(name)]
+        if not suggestions:
+            return ""
+        if len(suggestions) == 1:
+            return f". Did you mean {suggestions[0]}?"
+        return f". Did you mean one of {', '.join(suggestions)}?"
+
+    def _pop_value(
+        self, flag: str, command: CommandPlan, cli_args: _TokenStream, expand: bool = True
+    ) -> str:
+        """Consume the value of a flag, reading it from an arguments file if `expand`."""
+        while cli_args:
+            value = cli_args.pop()
+            tokens = self._args_file_tokens(value) if expand else None
+            if tokens is None:
+                return value
+            cli_args.push_source(tokens)
+        raise self._parse_error(f"Expected a value for '{flag}'", command)
+
+    def _pop_values(
+        self,
+        flag: str,
+        option: OptionSpec,
+        command: CommandPlan,
+        cli_args: _TokenStream,
+        count: Optional[int],
+    ) -> List[str]:
+        """Consume `count` values of a flag, or every value up to the next flag if None."""
+        values = cli_args.pop_values(count, expand=self._args_file_tokens)
+        if count is not None and len(values) < count:
+            error = f"Expected '{option.nargs}' arguments for {flag}"
+            raise self._parse_error(error, command)
+        return values
+
+    def _convert_values(
+        self, values: List[str], spec: Union[OptionSpec, ArgumentSpec], command: CommandPlan
+    ) -> List[Any]:
+        """Convert the values of an option or argument in one pass and check their choices."""
+        resolved_values = _convert_all(spec.type, values)
+        if spec.choices and not _all_in(resolved_values, spec.choices):
+            invalid = next(
+                value
+                for value, resolved in zip(values, resolved_values)
+                if resolved not in spec.choices
+            )
+            raise self._parse_error(f"Invalid choice '{invalid}'", command)
+        return resolved_values
+
+    def _match_subcommand(self, command: CommandPlan, arg: str) -> Optional[str]:
+        """Get the name of the subcommand selected by a name, alias or unique prefix."""
+        name = command.subcommand_names.get(arg)
+        if name is not None or not self.allow_abbrev or not command.subcommands:
+            return name
+        matches = {
+            command.subcommand_names[match]
+            for match in _names_with_prefix(command.sorted_subcommand_names, arg)
+        }
+        if len(matches) > 1:
+            error = f"Ambiguous command '{arg}', could be: {', '.join(sorted(matches))}"
+            raise self._parse_error(error, command)
+        return matches.pop() if matches else None
 
-    def _flag_to_global_option(self, flag: str) -> Optional[Option]:
-        for option in self.global_options:
-            if flag in option.flags:
-                return option
-        return None
+    def _subcommand_plan(self, parent: CommandPlan, name: str) -> CommandPlan:
+        """Get the plan of a subcommand, compiling it if it was registered lazily."""
+        subcommand_plan = parent.subcommands[name]
+        if subcommand_plan is None:
+            command = self._command_at(parent.path + (name,))
+            subcommand_plan = compile_lazy_subcommand(self._plan, parent, name, command)
+        return subcommand_plan
 
     def _process_flag(
-        self, flag: str, latest_command: Command, parsed: Dict[str, Any], cli_args: List[str]
+        self,
+        flag: str,
+        latest_command: CommandPlan,
+        parsed: Dict[str, Any],
+        cli_args: _TokenStream,
     ):
-        if flag in self.help_flags:
+        if flag in self._plan.help_flags:
             parsed[_HELP_NAME] = True
             return
 
-        if flag in self.version_flags:
+        if flag in self._plan.version_flags:
             parsed[_VERSION_NAME] = True
             return
 
-        option = latest_command.flag_to_option(flag) or self._flag_to_global_option(flag)
+        if flag in self._plan.batch_flags:
+            parsed[_BATCH_NAME] = cli_args.pop() if cli_args.next_is_value() else "-"
+            return
+
+        if flag in self._plan.output_flags:
+            output_format = self._pop_value(flag, latest_command, cli_args)
+            if output_format not in _OUTPUT_FORMATS:
+                error = (
+                    f"Invalid output format '{output_format}'. "
+                    + f"Choose from {', '.join(_OUTPUT_FORMATS)}."
+                )
+                raise self._parse_error(error, latest_command)
+            parsed[_OUTPUT_NAME] = output_format
+            return
+
+        option = latest_command.flags.get(flag)
         if not option:
-            error = Text(f"Invalid option '{flag}'")
-            self._cli_error(error, command=latest_command)
+            error = f"Invalid option '{flag}'" + self._did_you_mean(latest_command, "flags", flag)
+            raise self._parse_error(error, latest_command)
 
         flag_action = option.action
 
@@ -194,191 +600,166 @@ class CLI(Command):
                 parsed["parsed_options"][option.name] += 1
             else:
                 parsed["parsed_options"][option.name] = 1
+        elif flag_action == "store" and option.stream:
+            value = self._pop_value(flag, latest_command, cli_args, expand=False)
+            parsed["parsed_options"][option.name] = self._value_source(
+                value, option, latest_command
+            )
         elif flag_action == "store":
-            value = cli_args.pop(0)
-            resolved_value = option.type(value)
-            if option.choices:
-                if resolved_value not in option.choices:
-                    error = Text(f"Invalid choice '{value}'")
-                    self._cli_error(error, command=latest_command)
-
+            values = [self._pop_value(flag, latest_command, cli_args)]
             if option.name in parsed["parsed_options"]:
-                error = Text(f"Duplicate option '{flag}'.")
-                self._cli_error(error, command=latest_command)
-
+                error = f"Duplicate option '{flag}'."
+                raise self._parse_error(error, latest_command)
             if option.nargs:
-                resolved_value = [resolved_value]
-                if isinstance(option.nargs, int):
-                    for i in range(option.nargs - 1):
-                        if cli_args and not _is_flag(cli_args[0]):
-                            value = cli_args.pop(0)
-                            resolved_v = option.type(value)
-                            if option.choices:
-                                if resolved_v not in option.choices:
-                                    error = Text(f"Invalid choice '{value}'")
-                                    self._cli_error(error, command=latest_command)
-                            resolved_value.append(option.type(value))
-                        else:
-                            error = Text(f"Expected '{option.nargs}' arguments for {flag}")
-                            self._cli_error(error, command=latest_command)
-
-                else:
-                    while cli_args and not _is_flag(cli_args[0]):
-                        value = cli_args.pop(0)
-                        resolved_v = option.type(value)
-                        if option.choices:
-                            if resolved_v not in option.choices:
-                                error = Text(f"Invalid choice '{value}'")
-                                self._cli_error(error, command=latest_command)
-                        resolved_value.append(option.type(value))
-
-            parsed["parsed_options"][option.name] = resolved_value
-
-        elif flag_action == "append":
+                remaining = option.nargs - 1 if isinstance(option.nargs, int) else None
+                values += self._pop_values(flag, option, latest_command, cli_args, remaining)
+            resolved_values = self._convert_values(values, option, latest_command)
+            parsed["parsed_options"][option.name] = (
+                resolved_values if option.nargs else resolved_values[0]
+            )
+        elif flag_action in ("append", "extend"):
             if option.nargs:
-                resolved_value = []
-                if isinstance(option.nargs, int):
-                    for i in range(option.nargs):
-                        if cli_args and not _is_flag(cli_args[0]):
-                            value = cli_args.pop(0)
-                            resolved_v = option.type(value)
-                            if option.choices:
-                                if resolved_v not in option.choices:
-                                    error = Text(f"Invalid choice '{value}'")
-                                    self._cli_error(error, command=latest_command)
-                            resolved_value.append(option.type(value))
-                        else:
-                            error = Text(f"Expected {option.nargs} arguments for '{flag}'")
-                            self._cli_error(error, command=latest_command)
-                else:
-                    while cli_args and not _is_flag(cli_args[0]):
-                        value = cli_args.pop(0)
-                        resolved_v = option.type(value)
-                        if option.choices:
-                            if resolved_v not in option.choices:
-                                error = Text(f"Invalid choice '{value}'")
-                                self._cli_error(error, command=latest_command)
-                        resolved_value.append(option.type(value))
-                if option.name in parsed["parsed_options"]:
-                    parsed["parsed_options"][option.name].append(resolved_value)
-                else:
-                    parsed["parsed_options"][option.name] = resolved_value
+                count = option.nargs if isinstance(option.nargs, int) else None
+                values = self._pop_values(flag, option, latest_command, cli_args, count)
             else:
-                value = cli_args.pop(0)
-                resolved_value = option.type(value)
-                if option.choices:
-                    if resolved_value not in option.choices:
-                        error = Text(f"Invalid choice '{value}'")
-                        self._cli_error(error, command=latest_command)
-                if option.name not in parsed["parsed_options"]:
-                    parsed["parsed_options"][option.name] = []
-                parsed["parsed_options"][option.name].append(resolved_value)
-        elif flag_action == "extend":
-            if option.nargs:
-                resolved_value = []
-                if isinstance(option.nargs, int):
-                    for i in range(option.nargs):
-                        if cli_args and not _is_flag(cli_args[0]):
-                            value = cli_args.pop(0)
-                            resolved_v = option.type(value)
-                            if option.choices:
-                                if resolved_v not in option.choices:
-                                    error = Text(f"Invalid choice '{value}'")
-                                    self._cli_error(error, command=latest_command)
-                            resolved_value.append(option.type(value))
-                        else:
-                            error = Text(f"Expected '{option.nargs}' arguments for {flag}")
-                            self._cli_error(error, command=latest_command)
-                else:
-                    while cli_args and not _is_flag(cli_args[0]):
-                        value = cli_args.pop(0)
-                        resolved_v = option.type(value)
-                        if option.choices:
-                            if resolved_v not in option.choices:
-                                error = Text(f"Invalid choice '{value}'")
-                                self._cli_error(error, command=latest_command)
-                        resolved_value.append(option.type(value))
-                if option.name in parsed["parsed_options"]:
-                    parsed["parsed_options"][option.name].extend(resolved_value)
-                else:
-                    parsed["parsed_options"][option.name] = resolved_value
+                values = [self._pop_value(flag, latest_command, cli_args)]
+            resolved_values = self._convert_values(values, option, latest_command)
+            collected = parsed["parsed_options"].get(option.name)
+            if collected is None:
+                parsed["parsed_options"][option.name] = resolved_values
+            elif option.nargs and flag_action == "append":
+                collected.append(resolved_values)
             else:
-                value = cli_args.pop(0)
-                resolved_value = option.type(value)
-                if option.choices:
-                    if resolved_value not in option.choices:
-                        error = Text(f"Invalid choice '{value}'")
-                        self._cli_error(error, command=latest_command)
-                if option.name not in parsed["parsed_options"]:
-                    parsed["parsed_options"][option.name] = []
-                parsed["parsed_options"][option.name].append(resolved_value)
+                collected.extend(resolved_values)
         else:
-            error = Text(f"Invalid action '{flag_action}'")
-            self._cli_error(error, command=latest_command)
+            error = f"Invalid action '{flag_action}'"
+            raise self._parse_error(error, latest_command)
 
-    def _process_argument(
-        self, arg: str, latest_command: Command, parsed: Dict[str, Any], arg_index: int
-    ):
-        all_arguments = self.global_arguments + latest_command.all_arguments
-        if not all_arguments:
-            error = Text(f"Invalid argument '{arg}'")
-            self._cli_error(error, command=latest_command)
-        if arg_index >= len(all_arguments):
-            error = Text(f"Too many arguments '{arg}'")
-            self._cli_error(error, command=latest_command)
-        argument: Argument = all_arguments[arg_index]
-        resolved_value = argument.type(arg)
-        if argument.choices:
-            if resolved_value not in argument.choices:
-                error = Text(f"Invalid choice '{arg}'")
-                self._cli_error(error, command=latest_command)
+    def _value_source(
+        self, value: str, spec: Union[OptionSpec, ArgumentSpec], command: CommandPlan
+    ) -> ValueSource:
+        """Wrap the value of a streamed option or argument, checking its file is readable."""
+        source = ValueSource(value, type=spec.type, choices=spec.choices, name=spec.name)
+        if source.path is not None and not os.access(source.path, os.R_OK):
+            raise self._parse_error(f"Cannot read '{source.path}' for '{spec.name}'", command)
+        return source
+
+    def _names_args_file(self, arg: str) -> bool:
+        """Check if a token starts with one of the arguments file prefix characters."""
+        return bool(
+            self.fromfile_prefix_chars and len(arg) > 1 and arg[0] in self.fromfile_prefix_chars
+        )
 
+    def _args_file_tokens(self, value: str) -> Optional[Iterator[str]]:
+        """Get the arguments read from the file an option value names, or None."""
+        return args_file_tokens(value[1:]) if self._names_args_file(value) else None
+
+    def _is_args_file(self, arg: str, command: CommandPlan, positional_index: int) -> bool:
+        """Check if a token names an arguments file rather than a streamed argument."""
+        if not self._names_args_file(arg):
+            return False
+        positionals = command.positionals
+        return positional_index >= len(positionals) or not positionals[positional_index].stream
+
+    def _process_argument(
+        self, arg: str, latest_command: CommandPlan, parsed: Dict[str, Any], arg_index: int
+    ) -> int:
+        """Store a positional value, returning the index of the slot the next value fills."""
+        all_arguments = latest_command.positionals
+        if not all_arguments or arg_index >= len(all_arguments):
+            error = (
+                f"Invalid argument '{arg}'" if not all_arguments else f"Too many arguments '{arg}'"
+            )
+            if latest_command.subcommands:
+                error += self._did_you_mean(latest_command, "subcommands", arg)
+            raise self._parse_error(error, latest_command)
+        argument = all_arguments[arg_index]
+        if argument.stream:
+            parsed["parsed_args"][argument.name] = self._value_source(arg, argument, latest_command)
+            return arg_index + 1
+        resolved_value = self._convert_values([arg], argument, latest_command)[0]
+        if argument.name == latest_command.fan_out:
+            parsed["parsed_args"].setdefault(argument.name, []).append(resolved_value)
+            return arg_index
         parsed["parsed_args"][argument.name] = resolved_value
+        return arg_index + 1
 
-    def _set_defaults_for_command(self, command: Command, parsed: Dict[str, Any]):
-        for option in command.all_options:
+    def _set_defaults_for_command(self, command: CommandPlan, parsed: Dict[str, Any]):
+        for option in command.options:
             if option.default and option.name not in parsed["parsed_options"]:
                 parsed["parsed_options"][option.name] = option.default
 
-        for argument in command.all_arguments:
-            if argument.default and len(parsed["parsed_args"]) < len(command.all_arguments):
+        for argument in command.arguments:
+            if argument.default and len(parsed["parsed_args"]) < len(command.arguments):
                 parsed["parsed_args"][argument.name] = argument.default
 
-    def parse_cli(self) -> ParsedCLI:
-        """Return the commands and arguments parsed from the command string.
+    def parse(self, argv: Optional[Sequence[str]] = None, prog: Optional[str] = None) -> ParsedCLI:
+        """Return the commands and arguments parsed from a command line.
+
+        Unlike `parse_cli`, errors are raised instead of exiting the CLI tool. Parsing does
+        not modify the CLI, so one CLI can parse many command lines, including from
+        multiple threads.
+
+        Args:
+            argv (Optional[Sequence[str]]):
+                The command line arguments, without the program name.
+                Defaults to `sys.argv[1:]`.
+            prog (Optional[str]):
+                The program name reported with errors. Defaults to the name of the script.
 
         Returns:
             ParsedCLI: The parsed commands and arguments.
+
+        Raises:
+            ParseError: If the command line is invalid.
         """
+        with self._phase("parse"):
+            return self._parse(argv, prog)
+
+    def _parse(self, argv: Optional[Sequence[str]], prog: Optional[str]) -> ParsedCLI:
         parsed = {
             "commands": ["root"],
             "parsed_options": {},
             "parsed_args": {},
             _VERSION_NAME: False,
             _HELP_NAME: False,
+            _BATCH_NAME: None,
+            _OUTPUT_NAME: None,
         }
-        self._cli_command = os.path.basename(sys.argv[0])
-        cli_args = sys.argv[1:]
+        cli_args = _TokenStream(sys.argv[1:] if argv is None else argv)
 
-        latest_command = self
+        latest_command = self.compile().root
         positional_args_count = 0
 
-        while cli_args:
-            arg = cli_args.pop(0)
-            if _is_flag(arg):
-                if _is_short_stack_flag(arg):
-                    short_flags = _split_short_stack_flags(arg)
-                    arg = short_flags.pop(0)
-                    cli_args = short_flags + cli_args
-                self._process_flag(arg, latest_command, parsed, cli_args)
-            else:
-                found_command = latest_command.find_subcommand(arg)
-                if found_command:
-                    latest_command = found_command
-                    parsed["commands"].append(arg)
+        try:
+            while cli_args:
+                arg = cli_args.pop()
+                if self._is_args_file(arg, latest_command, positional_args_count):
+                    cli_args.push_source(args_file_tokens(arg[1:]))
                     continue
-                self._process_argument(arg, latest_command, parsed, positional_args_count)
-                positional_args_count += 1
+                if _is_flag(arg):
+                    if _is_short_stack_flag(arg):
+                        short_flags = _split_short_stack_flags(arg)
+                        cli_args.push_front(short_flags[1:])
+                        arg = short_flags[0]
+                    self._process_flag(arg, latest_command, parsed, cli_args)
+                else:
+                    name = self._match_subcommand(latest_command, arg)
+                    if name is not None:
+                        latest_command = self._subcommand_plan(latest_command, name)
+                        parsed["commands"].append(name)
+                        continue
+                    positional_args_count = self._process_argument(
+                        arg, latest_command, parsed, positional_args_count
+                    )
+        except ParseError as e:
+            if e.command is None:
+                e.command = self._command_at(latest_command.path)
+            e.prog = prog
+            raise
+        except (TypeError, ValueError) as e:
+            error = f"Invalid value for '{arg}': {e}"
+            raise ParseError(error, self._command_at(latest_command.path), prog) from e
 
         self._set_defaults_for_command(latest_command, parsed)
 
@@ -388,21 +769,55 @@ class CLI(Command):
             parsed_args=parsed["parsed_args"],
             help=parsed[_HELP_NAME],
             version=parsed[_VERSION_NAME],
+            batch=parsed[_BATCH_NAME],
+            output=parsed[_OUTPUT_NAME],
         )
 
-    def _cli_error(self, error: str, command: Optional[Command] = None):
+    def parse_cli(self, argv: Optional[Sequence[str]] = None) -> ParsedCLI:
+        """Return the commands and arguments parsed from the command string.
+
+        Displays the error and exits the CLI tool if the command line is invalid.
+
+        Args:
+            argv (Optional[Sequence[str]]):
+                The command line arguments, without the program name.
+                Defaults to `sys.argv[1:]`.
+
+        Returns:
+            ParsedCLI: The parsed commands and arguments.
+        """
+        try:
+            return self.parse(argv)
+        except CLIError as e:
+            self._cli_error(e.message, command=e.command, prog=e.prog, exit_code=e.exit_code)
+
+    @property
+    def _cli_command(self) -> str:
+        """The program name of the running script."""
+        return os.path.basename(sys.argv[0]) if sys.argv else ""
+
+    def _cli_error(
+        self,
+        error: str,
+        command: Optional[Command] = None,
+        prog: Optional[str] = None,
+        exit_code: int = 1,
+    ):
         """Display an error message and exit the CLI tool."""
         if error is None or error == "":
             error = "An unknown error occurred."
+        if self.console._output_format() != "text":
+            self.console.error(error)
+            sys.exit(exit_code)
         self.console.print(f"[bold red]Error:[/bold red] {error}\n")
-        self.display_help(command=command, header=False)
-        sys.exit(1)
+        self.display_help(command=command, header=False, prog=prog)
+        sys.exit(exit_code)
 
-    def _full_usage_string(self, command: Optional[Command]) -> str:
+    def _full_usage_string(self, command: Optional[Command], prog: Optional[str] = None) -> str:
         """Generate the full usage string for a command."""
         if not command:
             command = self
-        commands_string = f"{self._cli_command} "
+        commands_string = f"{prog or self._cli_command} "
         current_command = command
         subcommand_string = ""
         while current_command and current_command.name != _ROOT_COMMAND_NAME:
@@ -411,73 +826,611 @@ class CLI(Command):
         commands_string += subcommand_string.strip()
         return f"{commands_string} {current_command.usage}"
 
-    def display_help(self, command: Optional[Command] = None, header: bool = True):
+    def _help_cache_key(self) -> str:
+        """Hash everything besides the terminal that affects rendered help messages."""
+        hasher = hashlib.sha256(self.compile().key.encode())
+        hasher.update(repr((self.title, self.version, vars(self.console.theme))).encode())
+        return hasher.hexdigest()
+
+    def _load_rendered_help(self) -> Dict[str, str]:
+        """Get the rendered help messages, loading them from the help cache file."""
+        rendered_help = self._rendered_help
+        if rendered_help is None:
+            rendered_help = {}
+            if self.help_cache:
+                try:
+                    with open(self.help_cache, encoding="utf-8") as file:
+                        cached = json.load(file)
+                    if cached.get("key") == self._help_cache_key():
+                        rendered_help = cached["entries"]
+                except (OSError, ValueError, KeyError, AttributeError):
+                    pass
+            with self._help_lock:
+                if self._rendered_help is None:
+                    self._rendered_help = rendered_help
+                rendered_help = self._rendered_help
+        return rendered_help
+
+    def _save_rendered_help(self, rendered_help: Dict[str, str]):
+        """Persist the rendered help messages to the help cache file."""
+        # Other threads may add messages while they are serialized, so a snapshot is saved.
+        with self._help_lock:
+            entries = dict(rendered_help)
+        data = {"key": self._help_cache_key(), "entries": entries}
+        _atomic_write(self.help_cache, json.dumps(data).encode("utf-8"))
+
+    def display_help(
+        self,
+        command: Optional[Command] = None,
+        header: bool = True,
+        prog: Optional[str] = None,
+    ):
         """Display help information for the CLI tool.
 
+        Help messages are rendered once per command and terminal settings and cached until
+        the command tree is modified. See the `help_cache` option to persist them. With a
+        structured output format, help is written as records and never cached.
+
         Args:
             command (Command):
                 The command to display help for.
+            header (bool):
+                Whether to display the header information.
+            prog (Optional[str]):
+                The program name used in the usage string. Defaults to the name of the script.
         """
         if not command:
             command = self
-        cli_usage = self._full_usage_string(command)
-        self.console.display_help(
+        prog = prog or self._cli_command
+        path = []
+        current = command
+        while current is not None and current is not self:
+            path.append(current.name)
+            current = current._parent
+        help_kwargs = dict(
             title=self.title,
             description=command.description,
             version=self.version,
-            usage=cli_usage,
-            options=command.all_options + self.global_options,
-            arguments=command.all_arguments + self.global_arguments,
+            usage=self._full_usage_string(command, prog),
+            options=[*command.all_options, *self.global_options],
+            arguments=[*command.all_arguments, *self.global_arguments],
             subcommands=command.subcommands,
             show_header=header,
             version_flags=self.version_flags,
             help_flags=self.help_flags,
+            batch_flags=self.batch_flags,
+            output_flags=self.output_flags,
         )
+        if self.console._output_format() != "text":
+            with self._phase("write_help"):
+                self.console.display_help(**help_kwargs)
+            return
+        entry = repr((tuple(reversed(path)), header, prog, self.console.render_key()))
 
-    def run(self, parsed_cli: Optional[ParsedCLI] = None):
-        """Executes CLI tool based handlers, options, and arguments in
-            the ParsedCLI.
+        rendered_help = self._load_rendered_help()
+        if entry not in rendered_help:
+            with self._phase("render_help"):
+                rendered = self.console.render_help(**help_kwargs)
+            with self._help_lock:
+                rendered_help[entry] = rendered
+            if self.help_cache:
+                self._save_rendered_help(rendered_help)
+        with self._phase("write_help"):
+            self.console.write_rendered(rendered_help[entry])
 
+    def _prepare(
+        self, parsed_cli: ParsedCLI, prog: Optional[str]
+    ) -> Optional[Tuple[Command, Dict[str, Any]]]:
+        """Resolve the command to execute and the arguments of its handler.
 
-        Args:
-            parsed_cli (Optional[ParsedCLI]):
-                If not provided, CLI will be parsed by calling `self.parse_cli()`
+        Returns None if help or version information was displayed instead.
         """
-        parsed_cli = parsed_cli or self.parse_cli()
-        command_name = parsed_cli.commands[-1]
+        if parsed_cli.batch is not None:
+            raise ParseError("Batch mode is only available from the command line.", prog=prog)
 
-        if command_name == _ROOT_COMMAND_NAME:
-            command = self
-        else:
-            command = self.find_subcommand(command_name)
+        command = self._command_at(parsed_cli.commands[1:])
+        for middleware in command._middleware_chain:
+            parsed_cli = middleware.after_parse(parsed_cli, command)
 
         if parsed_cli.help or not command.handler:
-            self.display_help(command)
-            return
+            self.display_help(command, prog=prog)
+            return None
         if parsed_cli.version:
             self.console.display_version(self.version)
-            return
+            return None
 
         missing_required_options = [
             option.name
-            for option in command.all_options + self.global_options
+            for option in (*command.all_options, *self.global_options)
             if option.required and option.name not in parsed_cli.parsed_options
         ]
         if missing_required_options:
-            error = Text(f"Missing required options: {', '.join(missing_required_options)}")
-            self._cli_error(error, command=command)
+            error = f"Missing required options: {', '.join(missing_required_options)}"
+            raise ParseError(error, command=command, prog=prog)
 
         missing_required_arguments = [
             argument.name
-            for argument in command.all_arguments + self.global_arguments
+            for argument in (*command.all_arguments, *self.global_arguments)
             if argument.required and argument.name not in parsed_cli.parsed_args
         ]
         if missing_required_arguments:
-            error = Text(f"Missing required arguments: {', '.join(missing_required_arguments)}")
-            self._cli_error(error, command=command)
+            error = f"Missing required arguments: {', '.join(missing_required_arguments)}"
+            raise ParseError(error, command=command, prog=prog)
+
+        return command, parsed_cli.handler_kwargs_dict()
+
+    @property
+    def _event_loop(self) -> "asyncio.AbstractEventLoop":
+        """The event loop coroutine handlers run on, one per thread."""
+        loop = getattr(self._loops, "loop", None)
+        if loop is None or loop.is_closed():
+            import asyncio
+
+            loop = asyncio.new_event_loop()
+            self._loops.loop = loop
+        return loop
+
+    def close(self):
+        """Close the event loop managed for coroutine handlers in the current thread."""
+        loop = getattr(self._loops, "loop", None)
+        if loop is not None and not loop.is_closed():
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+        self._loops.loop = None
+
+    def _execute(self, command: Command, kwargs: Dict[str, Any]) -> Any:
+        """Execute the hooks and handler of a command, running coroutines on the loop."""
+        # Coroutine handlers of fan-out commands only leave the loop for worker processes.
+        on_loop = not command.fan_out or command.fan_out_executor == "thread"
+        hooks = (command.setup, command.teardown) + ((command.handler,) if on_loop else ())
+        if any(_is_coroutine_function(hook) for hook in hooks):
+            return self._event_loop.run_until_complete(self._execute_async(command, kwargs))
+
+        if command.setup:
+            command.setup()
+        try:
+            if command.fan_out:
+                return self._fan_out(command, kwargs)
+            result = command.handler(**kwargs)
+            if _is_awaitable(result):
+                result = self._event_loop.run_until_complete(result)
+            return result
+        finally:
+            if command.teardown:
+                command.teardown()
+
+    async def _execute_async(self, command: Command, kwargs: Dict[str, Any]) -> Any:
+        """Execute the hooks and handler of a command, awaiting any coroutines."""
+        if command.setup:
+            await _maybe_await(command.setup())
+        try:
+            if command.fan_out:
+                if command.fan_out_executor == "thread" and _is_coroutine_function(command.handler):
+                    return await self._fan_out_async(command, kwargs)
+                import asyncio
+
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self._fan_out, command, kwargs)
+            return await _maybe_await(command.handler(**kwargs))
+        finally:
+            if command.teardown:
+                await _maybe_await(command.teardown())
+
+    @staticmethod
+    def _fan_out_values(command: Command, kwargs: Dict[str, Any]) -> Iterable[Any]:
+        values = kwargs.get(command.fan_out)
+        if not isinstance(values, (list, ValueSource)):
+            values = [] if values is None else [values]
+        return values
+
+    async def _fan_out_async(
+        self, command: Command, kwargs: Dict[str, Any]
+    ) -> List["FanOutResult"]:
+        """Await a coroutine handler once per value of its fan-out argument.
+
+        The calls run on the running loop, at most `fan_out_workers` at a time.
+        """
+        import asyncio
+
+        name = command.fan_out
+        semaphore = asyncio.Semaphore(command.fan_out_workers)
+        completed = []
+
+        async def call(value: Any) -> FanOutResult:
+            try:
+                result = FanOutResult(
+                    value, result=await command.handler(**{**kwargs, name: value})
+                )
+            except Exception as e:
+                result = FanOutResult(value, error=str(e) or type(e).__name__)
+            finally:
+                semaphore.release()
+            completed.append(result)
+            return result
+
+        tasks = []
+        # A call starts once an earlier one completes, so a streamed source of values is
+        # never read far ahead of the calls.
+        for value in self._fan_out_values(command, kwargs):
+            await semaphore.acquire()
+            tasks.append(asyncio.ensure_future(call(value)))
+        results = await asyncio.gather(*tasks)
+        return list(results) if command.fan_out_ordered else completed
+
+    def _fan_out(self, command: Command, kwargs: Dict[str, Any]) -> List["FanOutResult"]:
+        """Call the handler of a command once per value of its fan-out argument."""
+        name = command.fan_out
+        values = self._fan_out_values(command, kwargs)
+        # Worker processes pull in `multiprocessing`, so executors are imported when used.
+        from concurrent.futures import FIRST_COMPLETED, as_completed, wait
+
+        if command.fan_out_executor == "process":
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(max_workers=command.fan_out_workers)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=command.fan_out_workers)
+        # Values are submitted as earlier calls complete, so a streamed source of values is
+        # never read far ahead of the calls.
+        window = command.fan_out_workers * 2
+        pending: Dict["Future", Any] = {}
+        results = []
+
+        def collect(futures: Iterable["Future"]):
+            for future in futures:
+                results.append(_fan_out_result(pending.pop(future), future))
+
+        with executor:
+            for value in values:
+                if len(pending) >= window:
+                    if command.fan_out_ordered:
+                        collect([next(iter(pending))])
+                    else:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                call_kwargs = {**kwargs, name: value}
+                call = (_call_handler, command.handler, call_kwargs)
+                if command.fan_out_executor != "process":
+                    call = (copy_context().run, *call)
+                pending[executor.submit(*call)] = value
+            collect(list(pending) if command.fan_out_ordered else as_completed(list(pending)))
+        return results
+
+    def _parse_with_middleware(
+        self, argv: Optional[Sequence[str]], prog: Optional[str]
+    ) -> ParsedCLI:
+        """Parse a command line, passing it through the global middleware first."""
+        if self.global_middleware:
+            argv = list(sys.argv[1:] if argv is None else argv)
+            for middleware in self.global_middleware:
+                argv = middleware.before_parse(argv)
+        return self.parse(argv, prog)
+
+    def _call_through(
+        self,
+        command: Command,
+        kwargs: Dict[str, Any],
+        execute: Callable[[Command, Dict[str, Any]], Any],
+    ) -> Any:
+        """Execute a command through the `around_handler` hooks of its middleware."""
+        chain = command._middleware_chain
+        if not chain:
+            return execute(command, kwargs)
+
+        def call(index: int, kwargs: Dict[str, Any]) -> Any:
+            if index == len(chain):
+                return execute(command, kwargs)
+            return chain[index].around_handler(
+                command, kwargs, lambda kwargs: call(index + 1, kwargs)
+            )
+
+        return call(0, kwargs)
+
+    def _report_error(self, error: Exception, command: Command):
+        """Pass an exception raised by a command to the `on_error` hooks of its middleware."""
+        for middleware in command._middleware_chain:
+            middleware.on_error(error, command)
+
+    def invoke(
+        self,
+        argv: Optional[Sequence[str]] = None,
+        parsed_cli: Optional[ParsedCLI] = None,
+        prog: Optional[str] = None,
+    ) -> Any:
+        """Execute the handler of the command selected by a command line.
+
+        Unlike `run`, errors are raised instead of exiting the CLI tool, so one CLI can
+        execute many command lines, e.g. in a long-running server. Coroutine handlers,
+        setup and teardown hooks run on an event loop managed by the CLI and reused
+        between invocations. Use `ainvoke` when an event loop is already running.
+
+        Args:
+            argv (Optional[Sequence[str]]):
+                The command line arguments, without the program name.
+                Defaults to `sys.argv[1:]`. Ignored if `parsed_cli` is provided.
+            parsed_cli (Optional[ParsedCLI]):
+                An already parsed command line to execute.
+            prog (Optional[str]):
+                The program name reported with errors. Defaults to the name of the script.
+
+        Returns:
+            Any: The value returned by the handler, a list of `FanOutResult` for commands
+                with a fan-out argument, or None if help or version information was
+                displayed instead.
+
+        Raises:
+            ParseError: If the command line is invalid or misses required values.
+            HandlerError: If the handler or its hooks raised an exception.
+        """
+        parsed_cli = parsed_cli or self._parse_with_middleware(argv, prog)
+        with self._invocation(parsed_cli):
+            with self._phase("prepare"):
+                prepared = self._prepare(parsed_cli, prog)
+            if prepared is None:
+                return None
+            command, kwargs = prepared
+            try:
+                with self._phase("handler"), self._capture():
+                    return self._call_through(command, kwargs, self._execute)
+            except Exception as e:
+                self._report_error(e, command)
+                raise HandlerError(str(e), command=command, prog=prog) from e
+
+    async def ainvoke(
+        self,
+        argv: Optional[Sequence[str]] = None,
+        parsed_cli: Optional[ParsedCLI] = None,
+        prog: Optional[str] = None,
+    ) -> Any:
+        """Execute the handler of the command selected by a command line, asynchronously.
+
+        The asynchronous counterpart of `invoke` for callers already running an event loop.
+        Coroutine handlers and hooks are awaited on the running loop, other handlers and
+        hooks are called directly.
+
+        Args:
+            argv (Optional[Sequence[str]]):
+                The command line arguments, without the program name.
+                Defaults to `sys.argv[1:]`. Ignored if `parsed_cli` is provided.
+            parsed_cli (Optional[ParsedCLI]):
+                An already parsed command line to execute.
+            prog (Optional[str]):
+                The program name reported with errors. Defaults to the name of the script.
+
+        Returns:
+            Any: The value returned by the handler, a list of `FanOutResult` for commands
+                with a fan-out argument, or None if help or version information was
+                displayed instead.
+
+        Raises:
+            ParseError: If the command line is invalid or misses required values.
+            HandlerError: If the handler or its hooks raised an exception.
+        """
+        parsed_cli = parsed_cli or self._parse_with_middleware(argv, prog)
+        with self._invocation(parsed_cli):
+            with self._phase("prepare"):
+                prepared = self._prepare(parsed_cli, prog)
+            if prepared is None:
+                return None
+            command, kwargs = prepared
+            try:
+                with self._phase("handler"), self._capture():
+                    return await _maybe_await(
+                        self._call_through(command, kwargs, self._execute_async)
+                    )
+            except Exception as e:
+                self._report_error(e, command)
+                raise HandlerError(str(e), command=command, prog=prog) from e
 
-        kwargs = parsed_cli.handler_kwargs_dict()
+    def run(
+        self,
+        parsed_cli: Optional[ParsedCLI] = None,
+        argv: Optional[Sequence[str]] = None,
+    ):
+        """Executes CLI tool based handlers, options, and arguments in
+            the ParsedCLI.
+
+        Displays the error and exits the CLI tool if the command line is invalid or the
+        handler raised an exception.
+
+        Args:
+            parsed_cli (Optional[ParsedCLI]):
+                If not provided, CLI will be parsed by calling `self.parse_cli()`
+            argv (Optional[Sequence[str]]):
+                The command line arguments to parse, without the program name.
+                Defaults to `sys.argv[1:]`.
+        """
+        argv = list(sys.argv[1:] if argv is None else argv)
+        profiler = _profiler_from_argv(argv)
+        if profiler is None:
+            try:
+                self._run(parsed_cli, argv)
+            finally:
+                self.console.flush()
+            return
+        profiler.record("startup", _IMPORTED_AT_NS)
+        self._profiler = profiler
+        try:
+            with profiler.phase("run"):
+                self._run(parsed_cli, argv)
+        finally:
+            self.console.flush()
+            self._profiler = None
+            profiler.finish()
+
+    def _invocation(self, parsed_cli: ParsedCLI):
+        """Attribute the console output of a parsed command line to its command."""
+        return self.console.invocation(" ".join(parsed_cli.commands[1:]), parsed_cli.output)
+
+    def _scan_output_format(self, argv: Sequence[str]) -> Optional[str]:
+        """Find the output format selected by a command line that could not be parsed.
+
+        Like the parser, the scan has no "--" separator, so output flags are found anywhere.
+        """
+        output_format = None
+        args = iter(argv)
+        for arg in args:
+            if arg in self.output_flags:
+                value = next(args, None)
+                if value in _OUTPUT_FORMATS:
+                    output_format = value
+        return output_format
+
+    def _run(self, parsed_cli: Optional[ParsedCLI], argv: List[str]):
+        try:
+            parsed_cli = parsed_cli or self._parse_with_middleware(argv, None)
+        except CLIError as e:
+            path = []
+            command = e.command
+            while command is not None and command is not self:
+                path.append(command.name)
+                command = command._parent
+            output_format = self._scan_output_format(argv) if self.output_flags else None
+            with self.console.invocation(" ".join(reversed(path)), output_format):
+                self._cli_error(e.message, command=e.command, prog=e.prog, exit_code=e.exit_code)
+        with self._invocation(parsed_cli):
+            try:
+                if parsed_cli.batch is not None:
+                    self._run_batch_file(parsed_cli.batch)
+                    return
+                result = self.invoke(parsed_cli=parsed_cli)
+                if self._command_at(parsed_cli.commands[1:]).fan_out and isinstance(result, list):
+                    self._report_fan_out(result)
+            except CLIError as e:
+                self._cli_error(e.message, command=e.command, prog=e.prog, exit_code=e.exit_code)
+
+    def _report_fan_out(self, results: List[FanOutResult]):
+        """Display the failed calls of a fan-out command and exit if any of them failed."""
+        failed = [result for result in results if result.error is not None]
+        for result in failed:
+            self.console.error(f"{result.value}: {result.error}")
+        if failed:
+            self.console.warning(f"{len(failed)} of {len(results)} targets failed.")
+            sys.exit(1)
+        self.console.success(f"{len(results)} targets succeeded.")
+
+    def _run_batch_line(self, line_number: int, line: str, prog: Optional[str]) -> BatchResult:
+        """Execute one command line of a batch, reporting its error on the console."""
+        import shlex
+
+        argv = []
+        try:
+            try:
+                argv = shlex.split(line, comments=True)
+            except ValueError as e:
+                raise ParseError(f"Invalid command line: {e}", prog=prog) from e
+            if argv:
+                self.invoke(argv, prog=prog)
+            return BatchResult(line_number, argv, 0)
+        except CLIError as e:
+            error, exit_code = e.message, e.exit_code
+        except SystemExit as e:
+            if e.code is None or e.code == 0:
+                return BatchResult(line_number, argv, 0)
+            error = None if isinstance(e.code, int) else str(e.code)
+            exit_code = e.code if isinstance(e.code, int) else 1
+        self.console.error(f"Line {line_number}: {error or f'Exited with status {exit_code}.'}")
+        return BatchResult(line_number, argv, exit_code, error)
+
+    def run_batch(
+        self,
+        lines: Iterable[str],
+        workers: Optional[int] = None,
+        prog: Optional[str] = None,
+    ) -> List[BatchResult]:
+        """Execute many command lines in one process.
+
+        Each line holds the arguments of one command line, without the program name,
+        quoted like a shell command. Blank lines and `#` comments are skipped. The command
+        tree, console and handler modules are loaded once and reused for every line.
+
+        A failing line does not stop the batch; its error is displayed with its line number
+        and recorded in its result.
+
+        Args:
+            lines (Iterable[str]):
+                The command lines to execute, e.g. an open file.
+            workers (Optional[int]):
+                The number of threads executing the lines in parallel. Handlers must be
+                thread-safe when greater than 1. Defaults to the `batch_workers` of the CLI.
+            prog (Optional[str]):
+                The program name reported with errors. Defaults to the name of the script.
+
+        Returns:
+            List[BatchResult]: The result of every executed line, in line order.
+        """
+        workers = workers or self.batch_workers
+        numbered = (
+            (line_number, line)
+            for line_number, line in enumerate(lines, start=1)
+            if line.strip() and not line.lstrip().startswith("#")
+        )
+        if workers <= 1:
+            return [self._run_batch_line(number, line, prog) for number, line in numbered]
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.compile()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each line runs in a copy of the current context, to keep the output format.
+            futures = [
+                executor.submit(copy_context().run, self._run_batch_line, number, line, prog)
+                for number, line in numbered
+            ]
+            return [future.result() for future in futures]
+
+    def _run_batch_file(self, path: str):
+        """Execute the command lines of a batch file and exit if any of them failed."""
+        try:
+            if path == "-":
+                results = self.run_batch(sys.stdin)
+            else:
+                with open(path, encoding="utf-8") as file:
+                    results = self.run_batch(file)
+        except OSError as e:
+            raise ParseError(f"Cannot read batch file '{path}': {e.strerror}") from e
+
+        failed = [result for result in results if result.exit_code]
+        if failed:
+            self.console.warning(f"{len(failed)} of {len(results)} command lines failed.")
+            sys.exit(max(result.exit_code for result in failed))
+
+    def serve(self, socket_path: str):
+        """Serve the CLI tool from this process on a Unix domain socket until interrupted.
+
+        Command lines forwarded with `saiuncli.daemon.forward`, or
+        `python -m saiuncli.daemon SOCKET [ARGS...]`, are executed by this process with the
+        working directory, environment and standard streams of the client. The command
+        tree, rendered help and handler modules stay loaded between command lines.
+
+        Args:
+            socket_path (str): The path of the Unix domain socket to listen on.
+        """
+        from saiuncli.daemon import serve
+
+        serve(self, socket_path)
+
+    async def arun(
+        self,
+        parsed_cli: Optional[ParsedCLI] = None,
+        argv: Optional[Sequence[str]] = None,
+    ):
+        """Executes CLI tool based handlers, options, and arguments in
+            the ParsedCLI, asynchronously.
+
+        The asynchronous counterpart of `run` for callers already running an event loop.
+        Displays the error and exits the CLI tool if the command line is invalid or the
+        handler raised an exception.
+
+        Args:
+            parsed_cli (Optional[ParsedCLI]):
+                If not provided, CLI will be parsed by calling `self.parse_cli()`
+            argv (Optional[Sequence[str]]):
+                The command line arguments to parse, without the program name.
+                Defaults to `sys.argv[1:]`.
+        """
         try:
-            command.handler(**kwargs)
-        except Exception as e:
-            self._cli_error(str(e), command=command)
+            await self.ainvoke(argv=argv, parsed_cli=parsed_cli)
+        except CLIError as e:
+            self._cli_error(e.message, command=e.command, prog=e.prog, exit_code=e.exit_code)
@@ -1,12 +1,19 @@
-from typing import List, Optional
+import importlib
+import threading
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
 
 from saiuncli.option import Option
 from saiuncli.argument import Argument
+from saiuncli.middleware import Middleware
 from saiuncli._constants import _DEFAULT_USAGE
 
 
 class Command:
     _parent: "Command" = None
+    _flag_index: Optional[Dict[str, Option]] = None
+    _subcommand_index: Optional[Dict[str, "Command"]] = None
+    _resolved: Optional[Dict[str, List]] = None
+    _plan = None
 
     _help_flags = ["-h", "--help"]
     _version_flags = ["-V", "--version"]
@@ -22,6 +29,15 @@ class Command:
         arguments: Optional[List[Argument]] = None,
         inherit_arguments: Optional[bool] = False,
         subcommands: Optional[List["Command"]] = None,
+        setup: Optional[callable] = None,
+        teardown: Optional[callable] = None,
+        aliases: Optional[List[str]] = None,
+        middleware: Optional[List[Middleware]] = None,
+        inherit_middleware: Optional[bool] = False,
+        fan_out: Optional[str] = None,
+        fan_out_workers: int = 8,
+        fan_out_executor: Literal["thread", "process"] = "thread",
+        fan_out_ordered: bool = True,
     ):
         """
         Initialize a Command object.
@@ -46,6 +62,33 @@ class Command:
                 Whether to inherit arguments from parent commands.
             subcommands (Optional[List[Command]]):
                 The subcommands available for the command.
+            setup (Optional[callable]):
+                A function called without arguments before the handler is executed.
+                May be a coroutine function.
+            teardown (Optional[callable]):
+                A function called without arguments after the handler is executed, even if
+                it failed. May be a coroutine function.
+            aliases (Optional[List[str]]):
+                Alternative names the command can be selected by.
+            middleware (Optional[List[Middleware]]):
+                The middleware run around the parsing and execution of the command.
+            inherit_middleware (Optional[bool]):
+                Whether to inherit middleware from parent commands.
+            fan_out (Optional[str]):
+                The name of an argument to fan the handler out over, e.g. "hosts" for
+                `tool check host1 host2`. The argument must be the last one of the command
+                and takes every remaining positional value, or a streamed source of values.
+                The handler is called once per value, in parallel, and the command returns
+                a `FanOutResult` per value. Setup and teardown hooks and middleware run
+                once around the whole fan-out.
+            fan_out_workers (int):
+                The maximum number of handler calls running at the same time.
+            fan_out_executor (Literal["thread", "process"]):
+                Whether handler calls run in a thread pool or a process pool. With a process
+                pool, the handler and its arguments must be picklable.
+            fan_out_ordered (bool):
+                Whether results are collected in the order of the values, or in the order
+                the calls complete.
         """
         self.name = name
         self.handler = handler
@@ -56,15 +99,72 @@ class Command:
         self.arguments = arguments or []
         self.inherit_arguments = inherit_arguments
         self.subcommands = subcommands or []
+        self.setup = setup
+        self.teardown = teardown
+        self.aliases = aliases or []
+        self.middleware = middleware or []
+        self.inherit_middleware = inherit_middleware
+        self.fan_out = fan_out
+        self.fan_out_workers = fan_out_workers
+        self.fan_out_executor = fan_out_executor
+        self.fan_out_ordered = fan_out_ordered
+        if fan_out_workers < 1:
+            raise ValueError("fan_out_workers must be at least 1.")
+        if fan_out_executor not in ("thread", "process"):
+            raise ValueError(f"Invalid fan-out executor '{fan_out_executor}'.")
 
         for subcommand in self.subcommands:
             subcommand._parent = self
             subcommand._version_flags = self._version_flags
             subcommand._help_flags = self._help_flags
 
-        self._validate_options(self.all_options)
+    @classmethod
+    def lazy(
+        cls,
+        target: str,
+        name: str,
+        description: Optional[str] = None,
+        aliases: Optional[List[str]] = None,
+    ) -> "LazyCommand":
+        """
+        Create a placeholder for a command that is imported only when it is selected.
+
+        Args:
+            target (str):
+                The import path of the command in "module:attribute" form. The attribute
+                may be a Command or a callable returning one.
+            name (str):
+                The name of the command.
+            description (Optional[str]):
+                The description of the command displayed in help tables.
+            aliases (Optional[List[str]]):
+                Alternative names the command can be selected by.
+
+        Returns:
+            LazyCommand: The placeholder command.
+        """
+        return LazyCommand(target=target, name=name, description=description, aliases=aliases)
 
-    def _validate_options(self, options: List[Option]):
+    def _resolve(self) -> "Command":
+        """
+        Get the command to dispatch to when this command is selected.
+        """
+        return self
+
+    def _memoized(self, name: str, resolve: Callable[[], Iterable]) -> Tuple:
+        """
+        Resolve a sequence derived from the command tree once, until the tree is modified.
+
+        The same tuple is returned on every access, so callers cannot modify the sequence
+        shared by every other caller.
+        """
+        if self._resolved is None:
+            self._resolved = {}
+        if name not in self._resolved:
+            self._resolved[name] = tuple(resolve())
+        return self._resolved[name]
+
+    def _validate_options(self, options: Sequence[Option]):
         """
         Ensure there are no duplicate flags across all options.
         """
@@ -77,107 +177,247 @@ class Command:
                     )
                 flag_set.add(flag)
 
-    def _validate_arguments(self, arguments: List[Argument]):
+    def _validate_arguments(self, arguments: Sequence[Argument]):
         """
         Ensure there are no duplicate names across all arguments.
         """
         name_set = set()
+        option_names = set(self.all_option_names)
         for argument in arguments:
-            if argument.name in name_set or argument.name in self.all_option_names:
+            if argument.name in name_set or argument.name in option_names:
                 raise ValueError(
                     f"Duplicate name detected: {argument.name}. "
                     + "Argument names must be unique between commands and options."
                 )
             name_set.add(argument.name)
 
+    def _validate_subcommands(self):
+        """
+        Ensure there are no duplicate names or aliases across subcommands.
+        """
+        name_set = set()
+        for subcommand in self.subcommands:
+            for name in [subcommand.name] + subcommand.aliases:
+                if name in name_set:
+                    raise ValueError(
+                        f"Duplicate subcommand name detected: {name}. "
+                        + "Subcommand names and aliases must be unique within a command."
+                    )
+                name_set.add(name)
+
     @property
-    def inherited_arguments(self) -> List[Argument]:
+    def inherited_arguments(self) -> Tuple[Argument, ...]:
         """
         Gather arguments inherited from parent commands if inheritance is enabled.
         """
-        if not self.inherit_arguments:
-            return []
-        inherited = []
-        parent = self._parent
-        while parent:
-            inherited.extend(parent.arguments)
-            parent = parent._parent
-        return inherited
+        return self._ancestor_arguments if self.inherit_arguments else ()
+
+    @property
+    def _ancestor_arguments(self) -> Tuple[Argument, ...]:
+        """
+        Gather the arguments of every parent command, the closest parent first.
+        """
+        if self._parent is None:
+            return ()
+        return self._memoized(
+            "ancestor_arguments",
+            lambda: (*self._parent.arguments, *self._parent._ancestor_arguments),
+        )
 
     @property
-    def all_arguments(self) -> List[Argument]:
+    def all_arguments(self) -> Tuple[Argument, ...]:
         """
         Gather all arguments available to the command.
         """
-        return self.inherited_arguments + self.arguments
+        return self._memoized("all_arguments", lambda: (*self.inherited_arguments, *self.arguments))
 
     @property
-    def all_argument_names(self) -> List[str]:
+    def all_argument_names(self) -> Tuple[str, ...]:
         """
         Gather all argument names available to the command.
         """
-        argument_names = []
-        for argument in self.all_arguments:
-            argument_names.append(argument.name)
-        return argument_names
+        return self._memoized(
+            "all_argument_names", lambda: [argument.name for argument in self.all_arguments]
+        )
 
     @property
-    def inherited_options(self) -> List[Option]:
+    def inherited_options(self) -> Tuple[Option, ...]:
         """
         Gather options inherited from parent commands if inheritance is enabled.
         """
-        if not self.inherit_options:
-            return []
-        inherited = []
-        parent = self._parent
-        while parent:
-            inherited.extend(parent.options)
-            parent = parent._parent
-        return inherited
+        return self._ancestor_options if self.inherit_options else ()
+
+    @property
+    def _ancestor_options(self) -> Tuple[Option, ...]:
+        """
+        Gather the options of every parent command, the closest parent first.
+        """
+        if self._parent is None:
+            return ()
+        return self._memoized(
+            "ancestor_options", lambda: (*self._parent.options, *self._parent._ancestor_options)
+        )
 
     @property
-    def all_options(self) -> List[Option]:
+    def all_options(self) -> Tuple[Option, ...]:
         """
         Gather all options available to the command.
         """
-        return self.inherited_options + self.options
+        return self._memoized("all_options", lambda: (*self.inherited_options, *self.options))
 
     @property
-    def all_option_long_names(self) -> List[str]:
+    def all_option_long_names(self) -> Tuple[str, ...]:
         """
         Gather all long option names available to the command.
         """
-        option_names = []
-        for option in self.all_options:
-            option_names.extend(option.long_name)
-        return option_names
+        return self._memoized(
+            "all_option_long_names",
+            lambda: [option.long_name for option in self.all_options if option.long_name],
+        )
 
     @property
-    def all_option_short_names(self) -> List[str]:
+    def all_option_short_names(self) -> Tuple[str, ...]:
         """
         Gather all short option names available to the command.
         """
-        option_names = []
-        for option in self.all_options:
-            option_names.extend(option.short_name)
-        return option_names
+        return self._memoized(
+            "all_option_short_names",
+            lambda: [option.short_name for option in self.all_options if option.short_name],
+        )
 
     @property
-    def all_option_names(self) -> List[str]:
+    def all_option_names(self) -> Tuple[str, ...]:
         """
         Gather all option names available to the command.
         """
-        return self.all_option_long_names + self.all_option_short_names
+        return self._memoized(
+            "all_option_names", lambda: self.all_option_long_names + self.all_option_short_names
+        )
 
     @property
-    def all_option_flags(self) -> List[str]:
+    def all_option_flags(self) -> Tuple[str, ...]:
         """
         Gather all option flags available to the command.
         """
-        option_flags = []
-        for option in self.all_options:
-            option_flags.extend(option.flags)
-        return option_flags
+        return self._memoized(
+            "all_option_flags",
+            lambda: [flag for option in self.all_options for flag in option.flags],
+        )
+
+    @property
+    def inherited_middleware(self) -> Tuple[Middleware, ...]:
+        """
+        Gather middleware inherited from parent commands if inheritance is enabled.
+        """
+        return self._ancestor_middleware if self.inherit_middleware else ()
+
+    @property
+    def _ancestor_middleware(self) -> Tuple[Middleware, ...]:
+        """
+        Gather the middleware of every parent command, the most distant parent first.
+        """
+        if self._parent is None:
+            return ()
+        return self._memoized(
+            "ancestor_middleware",
+            lambda: (*self._parent._ancestor_middleware, *self._parent.middleware),
+        )
+
+    @property
+    def all_middleware(self) -> Tuple[Middleware, ...]:
+        """
+        Gather all middleware run for the command, the outermost first.
+        """
+        return self._memoized(
+            "all_middleware", lambda: (*self.inherited_middleware, *self.middleware)
+        )
+
+    @property
+    def _global_middleware(self) -> List[Middleware]:
+        """
+        Gather global middleware registered at the root of the command tree.
+        """
+        if self._parent is None:
+            return []
+        return self._parent._global_middleware
+
+    @property
+    def _middleware_chain(self) -> Tuple[Middleware, ...]:
+        """
+        Gather the global middleware and all middleware of the command, the outermost first.
+        """
+        return self._memoized(
+            "middleware_chain", lambda: (*self._global_middleware, *self.all_middleware)
+        )
+
+    @property
+    def _global_options(self) -> List[Option]:
+        """
+        Gather global options registered at the root of the command tree.
+        """
+        if self._parent is None:
+            return []
+        return self._parent._global_options
+
+    @property
+    def flag_index(self) -> Dict[str, Option]:
+        """
+        Map every flag available to the command to its option.
+
+        Covers the command's own, inherited and global options. Command options take
+        precedence over global options using the same flag. The index is built on first
+        access and dropped whenever the command tree is modified.
+        """
+        if self._flag_index is None:
+            index = {}
+            for option in (*self.all_options, *self._global_options):
+                for flag in option.flags:
+                    index.setdefault(flag, option)
+            self._flag_index = index
+        return self._flag_index
+
+    @property
+    def subcommand_index(self) -> Dict[str, "Command"]:
+        """
+        Map the name and aliases of every subcommand to the subcommand.
+
+        The index is built on first access and dropped whenever the command tree is
+        modified. Lazy subcommands map to their placeholder.
+        """
+        if self._subcommand_index is None:
+            index = {}
+            for subcommand in self.subcommands:
+                for name in [subcommand.name] + subcommand.aliases:
+                    index.setdefault(name, subcommand)
+            self._subcommand_index = index
+        return self._subcommand_index
+
+    @property
+    def _root(self) -> "Command":
+        """
+        Get the root of the command tree.
+        """
+        command = self
+        while command._parent is not None:
+            command = command._parent
+        return command
+
+    def _invalidate_caches(self):
+        """Drop cached lookups after the command tree was modified at this command."""
+        self._root._tree_changed()
+        self._clear_caches()
+
+    def _tree_changed(self):
+        """Drop lookups cached for the whole tree, called on the root of the tree."""
+        self._plan = None
+
+    def _clear_caches(self):
+        """Drop cached lookups for this command and every command below it."""
+        self._flag_index = None
+        self._subcommand_index = None
+        self._resolved = None
+        for subcommand in self.subcommands:
+            subcommand._clear_caches()
 
     @property
     def all_subcommand_names(self) -> List[str]:
@@ -186,28 +426,34 @@ class Command:
         """
         command_names = []
         for subcommand in self.subcommands:
+            command_names.append(subcommand.name)
             command_names.extend(subcommand.all_subcommand_names)
         return command_names
 
     def add_option(self, option: Option):
         """Add an option to the command."""
         self.options.append(option)
-        self._validate_options(self.all_options)
+        self._invalidate_caches()
 
     def add_options(self, options: List[Option]):
         """Add multiple options to the command."""
         self.options.extend(options)
-        self._validate_options(self.all_options)
+        self._invalidate_caches()
+
+    def add_middleware(self, middleware: Middleware):
+        """Add middleware to the command."""
+        self.middleware.append(middleware)
+        self._invalidate_caches()
 
     def add_argument(self, argument: Argument):
         """Add an argument to the command."""
         self.arguments.append(argument)
-        self._validate_arguments(self.all_arguments)
+        self._invalidate_caches()
 
     def add_arguments(self, arguments: List[Argument]):
         """Add multiple arguments to the command."""
         self.arguments.extend(arguments)
-        self._validate_arguments(self.all_arguments)
+        self._invalidate_caches()
 
     def add_subcommand(self, subcommand: "Command"):
         """Add a subcommand to the command."""
@@ -215,6 +461,7 @@ class Command:
         subcommand._version_flags = self._version_flags
         subcommand._help_flags = self._help_flags
         self.subcommands.append(subcommand)
+        self._invalidate_caches()
 
     def add_subcommands(self, subcommands: List["Command"]):
         """Add multiple subcommands to the command."""
@@ -223,20 +470,97 @@ class Command:
             subcommand._version_flags = self._version_flags
             subcommand._help_flags = self._help_flags
         self.subcommands.extend(subcommands)
+        self._invalidate_caches()
 
     def flag_to_option(self, flag: str) -> Optional[Option]:
-        """Get an option by flag."""
-        for option in self.all_options:
-            if flag in option.flags:
-                return option
-        return None
+        """Get an option by flag, including inherited and global options."""
+        return self.flag_index.get(flag)
 
     def find_subcommand(self, name: str) -> Optional["Command"]:
-        """Find a subcommand by name."""
-        for subcommand in self.subcommands:
-            if subcommand.name == name:
-                return subcommand
-        return None
+        """Find a subcommand by name or alias, importing it if it was registered lazily."""
+        subcommand = self.subcommand_index.get(name)
+        return subcommand._resolve() if subcommand is not None else None
 
     def execute(self, **handler_args):
         self.handler(**handler_args)
+
+
+class LazyCommand(Command):
+    def __init__(
+        self,
+        target: str,
+        name: str,
+        description: Optional[str] = None,
+        aliases: Optional[List[str]] = None,
+    ):
+        """
+        Initialize a LazyCommand object.
+
+        A LazyCommand only carries the name and description displayed in help tables. The
+        real command, along with its handler and dependencies, is imported the first time
+        it is selected by `Command.find_subcommand`.
+
+        Args:
+            target (str):
+                The import path of the command in "module:attribute" form. The attribute
+                may be a Command or a callable returning one.
+            name (str):
+                The name of the command.
+            description (Optional[str]):
+                The description of the command displayed in help tables.
+            aliases (Optional[List[str]]):
+                Alternative names the command can be selected by.
+        """
+        if ":" not in target:
+            raise ValueError(f"Invalid lazy command target: {target}. Expected 'module:attr'.")
+        super().__init__(name=name, handler=None, description=description, aliases=aliases)
+        self.target = target
+        self._command: Optional[Command] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Whether the real command has been imported.
+        """
+        return self._command is not None
+
+    def load(self) -> Command:
+        """
+        Import the real command.
+
+        The command is imported once, even when several threads load it at the same time.
+
+        Returns:
+            Command: The imported command, attached to the parent of the placeholder.
+        """
+        if self._command is None:
+            with self._load_lock:
+                if self._command is None:
+                    module_name, _, attribute = self.target.partition(":")
+                    command = getattr(importlib.import_module(module_name), attribute)
+                    if not isinstance(command, Command):
+                        command = command()
+                    if not isinstance(command, Command):
+                        raise TypeError(
+                            f"Lazy command target {self.target} did not resolve to a Command."
+                        )
+                    # The command is only published once attached, so it is never seen
+                    # without its parent.
+                    self._attach(command)
+                    self._command = command
+        return self._command
+
+    def _attach(self, command: Command):
+        command._parent = self._parent
+        command._version_flags = self._version_flags
+        command._help_flags = self._help_flags
+
+    def _resolve(self) -> Command:
+        return self.load()
+
+    def _clear_caches(self):
+        super()._clear_caches()
+        if self._command is not None:
+            self._attach(self._command)
+            self._command._clear_caches()
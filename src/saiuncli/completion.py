@@ -0,0 +1,263 @@
+"""
+Shell completion for SaiunCLI tools.
+
+Completions are answered from a static index of the command tree, written once with
+`save_index` when the CLI tool is built or installed. Answering a completion only loads the
+index, so neither the CLI tool nor its handler modules are imported per TAB press.
+
+This module only imports the standard library and can be run as a script, which is how the
+scripts generated by `completion_script` call it.
+
+Usage:
+    python -m saiuncli.completion INDEX -- [WORDS...]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import marshal
+
+# Completing runs in a fresh interpreter per TAB press, so `typing` and `json` are not
+# imported at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Sequence
+
+    from saiuncli.cli import CLI
+    from saiuncli.command import Command
+    from saiuncli.option import Option
+    from saiuncli.argument import Argument
+
+__all__ = ["build_index", "save_index", "load_index", "complete", "completion_script"]
+
+_INDEX_FORMAT_VERSION = (2, sys.version_info[:2])
+_VALUE_ACTIONS = ("store", "append", "extend")
+
+
+def _choices(choices: Optional[List[Any]]) -> Optional[List[str]]:
+    return [str(choice) for choice in choices] if choices else None
+
+
+def _flag_entries(options: List["Option"]) -> Dict[str, Any]:
+    entries = {}
+    for option in options:
+        entry = {"value": option.action in _VALUE_ACTIONS, "choices": _choices(option.choices)}
+        for flag in option.flags:
+            entries.setdefault(flag, entry)
+    return entries
+
+
+def _argument_entries(arguments: List["Argument"]) -> List[Optional[List[str]]]:
+    return [_choices(argument.choices) for argument in arguments]
+
+
+def _command_entry(command: "Command") -> bytes:
+    """Serialize a command, its subcommands are only deserialized when completed."""
+    return marshal.dumps(
+        {
+            "flags": _flag_entries(command.all_options),
+            "arguments": _argument_entries(command.all_arguments),
+            "subcommands": {
+                subcommand.name: _command_entry(subcommand._resolve())
+                for subcommand in command.subcommands
+            },
+            "aliases": {
+                alias: subcommand.name
+                for subcommand in command.subcommands
+                for alias in subcommand.aliases
+            },
+        }
+    )
+
+
+def build_index(cli: "CLI") -> Dict[str, Any]:
+    """
+    Build the completion index of a CLI tool.
+
+    Lazy subcommands are imported to index their options and arguments.
+
+    Args:
+        cli (CLI): The CLI tool to index.
+
+    Returns:
+        Dict[str, Any]: The completion index.
+    """
+    from saiuncli._constants import _OUTPUT_FORMATS
+
+    reserved_flags = cli.help_flags + cli.version_flags + cli.batch_flags
+    output_choices = list(_OUTPUT_FORMATS)
+    return {
+        "format": _INDEX_FORMAT_VERSION,
+        "key": cli.compile().key,
+        "global_flags": {
+            **_flag_entries(cli.global_options),
+            **{flag: {"value": False, "choices": None} for flag in reserved_flags},
+            **{flag: {"value": True, "choices": output_choices} for flag in cli.output_flags},
+        },
+        "global_arguments": _argument_entries(cli.global_arguments),
+        "root": _command_entry(cli),
+    }
+
+
+def save_index(cli: "CLI", path: str) -> Dict[str, Any]:
+    """
+    Build the completion index of a CLI tool and write it to a file.
+
+    The index is serialized with `marshal`, which loads faster than any other format
+    available without imports, and is only readable by the Python version that wrote it.
+
+    Args:
+        cli (CLI): The CLI tool to index.
+        path (str): The path of the index file.
+
+    Returns:
+        Dict[str, Any]: The completion index.
+    """
+    from saiuncli._utils import _atomic_write
+
+    index = build_index(cli)
+    if not _atomic_write(path, marshal.dumps(index)):
+        raise OSError(f"Could not write the completion index to '{path}'.")
+    return index
+
+
+def load_index(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a completion index written by `save_index`.
+
+    Args:
+        path (str): The path of the index file.
+
+    Returns:
+        Optional[Dict[str, Any]]: The completion index, or None if it is missing,
+            unreadable or of an unknown format.
+    """
+    try:
+        with open(path, "rb") as file:
+            index = marshal.load(file)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(index, dict) or index.get("format") != _INDEX_FORMAT_VERSION:
+        return None
+    return index
+
+
+def complete(index: Dict[str, Any], words: Sequence[str]) -> List[str]:
+    """
+    Complete a command line from a completion index.
+
+    Args:
+        index (Dict[str, Any]): The completion index, see `build_index`.
+        words (Sequence[str]):
+            The words of the command line after the program name, up to the cursor. The
+            last word is the one being completed and may be empty.
+
+    Returns:
+        List[str]: The candidates for the last word.
+    """
+    current = words[-1] if words else ""
+    node = marshal.loads(index["root"])
+    positional_count = 0
+    pending_flag = None
+
+    for word in words[:-1]:
+        if pending_flag is not None:
+            pending_flag = None
+            continue
+        if word.startswith("-") and len(word) > 1:
+            entry = node["flags"].get(word) or index["global_flags"].get(word)
+            if entry and entry["value"]:
+                pending_flag = entry
+            continue
+        name = node["aliases"].get(word, word)
+        if name in node["subcommands"]:
+            node = marshal.loads(node["subcommands"][name])
+            continue
+        positional_count += 1
+
+    if pending_flag is not None:
+        candidates = pending_flag["choices"] or []
+    elif current.startswith("-"):
+        candidates = list(node["flags"]) + list(index["global_flags"])
+    else:
+        candidates = list(node["subcommands"])
+        positionals = index["global_arguments"] + node["arguments"]
+        if positional_count < len(positionals):
+            candidates += positionals[positional_count] or []
+    return [candidate for candidate in candidates if candidate.startswith(current)]
+
+
+_BASH_SCRIPT = """\
+_saiuncli_{function}() {{
+    local IFS=$'\\n'
+    COMPREPLY=($({command} -- "${{COMP_WORDS[@]:1:COMP_CWORD}}"))
+}}
+complete -o default -F _saiuncli_{function} {prog}
+"""
+
+_ZSH_SCRIPT = """\
+#compdef {name}
+_saiuncli_{function}() {{
+    local -a candidates
+    candidates=(${{(f)"$({command} -- "${{(@)words[2,CURRENT]}}")"}})
+    compadd -a candidates
+}}
+compdef _saiuncli_{function} {prog}
+"""
+
+_FISH_SCRIPT = """\
+function __saiuncli_{function}
+    set -l words (commandline -opc) (commandline -ct)
+    {command} -- $words[2..-1]
+end
+complete -c {prog} -f -a '(__saiuncli_{function})'
+"""
+
+_SCRIPTS = {"bash": _BASH_SCRIPT, "zsh": _ZSH_SCRIPT, "fish": _FISH_SCRIPT}
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
+
+def completion_script(shell: str, prog: str, index_path: str) -> str:
+    """
+    Generate the completion script of a CLI tool for a shell.
+
+    The script runs this module as a standalone script in an isolated interpreter, which
+    only loads the completion index.
+
+    Args:
+        shell (str): The shell to complete in, one of "bash", "zsh" or "fish".
+        prog (str): The name the CLI tool is run with.
+        index_path (str): The path of the completion index written by `save_index`,
+            relative to the current directory or absolute.
+
+    Returns:
+        str: The source of the completion script.
+    """
+    if shell not in _SCRIPTS:
+        raise ValueError(f"Unsupported shell '{shell}'. Choose from: {', '.join(_SCRIPTS)}.")
+    # The script runs in whatever directory the shell is in, so both paths are absolute.
+    paths = (os.path.abspath(__file__), os.path.abspath(index_path))
+    command = " ".join(_quote(part) for part in (sys.executable, "-I", "-S", *paths))
+    function = "".join(char if char.isalnum() else "_" for char in prog)
+    return _SCRIPTS[shell].format(command=command, function=function, prog=_quote(prog), name=prog)
+
+
+def main(args: Optional[List[str]] = None):
+    args = sys.argv[1:] if args is None else args
+    if len(args) < 2 or args[1] != "--":
+        sys.stderr.write("usage: python -m saiuncli.completion INDEX -- [WORDS...]\n")
+        sys.exit(2)
+    index = load_index(args[0])
+    if index is None:
+        sys.exit(1)
+    candidates = complete(index, args[2:])
+    if candidates:
+        sys.stdout.write("\n".join(candidates) + "\n")
+
+
+if __name__ == "__main__":
+    main()
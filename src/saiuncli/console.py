@@ -1,40 +1,454 @@
-from typing import Optional, Any, List
-from rich.console import Console as RichConsole
-from rich.theme import Theme as RichTheme
-from rich.highlighter import RegexHighlighter
-from rich.text import Text
-from rich.panel import Panel
-from rich.table import Table
-
-from saiuncli.theme import Theme
+import os
+import sys
+import time
+import atexit
+import shutil
+import weakref
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from json.encoder import encode_basestring
+from typing import Optional, Any, Dict, Iterator, List, Tuple
+
+from saiuncli.theme import Theme, PrefixStyle
 from saiuncli.command import Command
 from saiuncli.option import Option
 from saiuncli.argument import Argument
+from saiuncli.progress import Progress
+from saiuncli._utils import _strip_markup
+from saiuncli._constants import _OUTPUT_ENV, _OUTPUT_FORMATS
+
+
+# Characters that may start markup, emoji codes or option highlights in rich output.
+_RICH_SYNTAX = frozenset("[:-")
+
+# The command path and output format of the invocation running in the current context.
+_invocation: ContextVar[Optional[Tuple[str, Optional[str]]]] = ContextVar(
+    "saiuncli_invocation", default=None
+)
+
+# The second of the last record timestamp, and its formatted date and time.
+_timestamp_second: Tuple[int, str] = (0, "")
+
+
+def _timestamp() -> str:
+    """Get the current UTC time in ISO 8601 format with milliseconds, e.g. for records."""
+    global _timestamp_second
+    now = time.time()
+    second = int(now)
+    cached_second, formatted = _timestamp_second
+    if second != cached_second:
+        formatted = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _timestamp_second = (second, formatted)
+    return f"{formatted}.{int((now - second) * 1000):03d}Z"
+
+
+# Buffered consoles still holding output, flushed when the interpreter exits.
+_buffered_consoles: "weakref.WeakSet[Console]" = weakref.WeakSet()
+
+
+# Consoles in a `Console.shared` context, which forked worker processes write through.
+_shared_consoles: "weakref.WeakSet[Console]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_buffered_consoles():
+    for console in list(_buffered_consoles):
+        console.flush()
+
+
+def _send_shared_consoles():
+    for console in list(_shared_consoles):
+        console._send_to(console._queue)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_send_shared_consoles)
+
+
+def _restore_console(
+    theme: Theme,
+    buffer_size: int,
+    flush_interval: float,
+    output_format: str,
+    queue: Optional[Any],
+) -> "Console":
+    console = Console(
+        theme,
+        buffer_size=buffer_size,
+        flush_interval=flush_interval,
+        output_format=output_format,
+    )
+    if queue is not None:
+        console._send_to(queue)
+    return console
+
+
+def _stdout():
+    """Get the real stdout, unwrapped from any `rich` live display redirecting it."""
+    return getattr(sys.stdout, "rich_proxied_file", sys.stdout)
+
+
+class _ConsoleFile:
+    """
+    The file the `rich` console writes to, sending its output through the buffer of a
+    Console. Any other attribute is looked up on stdout.
+    """
+
+    def __init__(self, console: "Console"):
+        self._owner = weakref.ref(console)
+
+    def write(self, text: str) -> int:
+        self._owner()._write(text, _stdout())
+        return len(text)
+
+    def flush(self):
+        if not self._owner()._buffering:
+            _stdout().flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_stdout(), name)
 
 
 class Console:
-    def __init__(self, theme: Optional["Theme"] = None):
+    def __init__(
+        self,
+        theme: Optional["Theme"] = None,
+        buffered: bool = False,
+        buffer_size: int = 1 << 16,
+        flush_interval: float = 0.1,
+        output_format: Optional[str] = None,
+    ):
         """Initialize the Console with a theme.
 
+        The `rich` rendering stack is imported the first time it is needed.
+
+        With the "json" or "jsonl" output format, messages and printed text are written as
+        JSON Lines records instead of styled text, one object per line with the "level",
+        "timestamp", "command" and "message" of the output. Records are written directly,
+        without `rich` rendering, except for printed `rich` renderables such as tables.
+
         Args:
             theme (Optional[Theme]): The theme to use for the console output.
+            buffered (bool): Whether output is buffered and written in batches, see
+                `buffered`.
+            buffer_size (int): The number of buffered characters that triggers a flush.
+            flush_interval (float): The longest time output stays buffered, in seconds.
+            output_format (Optional[str]): The output format, "text", "json" or "jsonl".
+                Defaults to the `SAIUNCLI_OUTPUT` environment variable, or "text".
         """
+        output_format = output_format or os.environ.get(_OUTPUT_ENV) or "text"
+        if output_format not in _OUTPUT_FORMATS:
+            raise ValueError(
+                f"Invalid output format '{output_format}'. "
+                + f"Choose from {', '.join(_OUTPUT_FORMATS)}."
+            )
         self.theme = theme or Theme()
+        self.output_format = output_format
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._rich_console = None
+        self._option_highlighter = None
+        self._prefix_cache: Dict[Tuple[str, str], Tuple[str, int]] = {}
+        self._buffering = 1 if buffered else 0
+        self._buffer: List[str] = []
+        self._buffered_size = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._write_lock = threading.RLock()
+        self._batch_state: Optional[Tuple[bool, Optional[int]]] = None
+        # The queue of the writer thread of a shared console, and whether this console
+        # is a copy in a worker process sending its output to it.
+        self._queue = None
+        self._remote = False
 
-        class OptionHighlighter(RegexHighlighter):
-            highlights = [r"(?P<short_flag>\-\w)", r"(?P<long_flag>\-\-[\w\-]+)"]
+    @property
+    def _highlighter(self):
+        if self._option_highlighter is None:
+            from rich.highlighter import RegexHighlighter
 
-        self._highlighter = OptionHighlighter()
-        self._console = RichConsole(
-            theme=RichTheme(
-                {
-                    "long_flag": self.theme.option_long,
-                    "short_flag": self.theme.option_short,
-                }
-            ),
-            highlighter=self._highlighter,
+            class OptionHighlighter(RegexHighlighter):
+                highlights = [r"(?P<short_flag>\-\w)", r"(?P<long_flag>\-\-[\w\-]+)"]
+
+            self._option_highlighter = OptionHighlighter()
+        return self._option_highlighter
+
+    @property
+    def _console(self):
+        if self._rich_console is None:
+            with self._write_lock:
+                return self._create_rich_console()
+        return self._rich_console
+
+    def _create_rich_console(self):
+        if self._rich_console is None:
+            from rich.console import Console as RichConsole
+            from rich.theme import Theme as RichTheme
+
+            self._rich_console = RichConsole(
+                file=_ConsoleFile(self),
+                theme=RichTheme(
+                    {
+                        "long_flag": self.theme.option_long,
+                        "short_flag": self.theme.option_short,
+                    }
+                ),
+                highlighter=self._highlighter,
+            )
+            self._prefix_cache = {}
+        return self._rich_console
+
+    def render_key(self) -> Tuple[Any, ...]:
+        """Describe the terminal settings that affect how output is rendered.
+
+        Output rendered with the same key renders identically, so it can be cached and
+        written again with `write_rendered`. The key is computed without importing `rich`.
+
+        Returns:
+            Tuple[Any, ...]: The terminal width, whether output is styled and the
+                environment variables used to detect color support.
+        """
+        styled = not self._is_plain_output()
+        width = shutil.get_terminal_size().columns if styled else os.environ.get("COLUMNS")
+        return (
+            width,
+            styled,
+            *(os.environ.get(name) for name in ("TERM", "COLORTERM", "NO_COLOR", "FORCE_COLOR")),
+        )
+
+    def reset_terminal(self) -> None:
+        """Detect the terminal again before the next output.
+
+        The terminal is detected when the console first renders output. Call this when
+        the standard streams are switched to another terminal, e.g. by a daemon running
+        command lines for its clients.
+        """
+        with self._write_lock:
+            self._rich_console = None
+            self._prefix_cache = {}
+
+    def write_rendered(self, text: str) -> None:
+        """Write text previously rendered by the console, such as `render_help` output.
+
+        Args:
+            text (str): The rendered text, including any ANSI escape sequences.
+        """
+        self._write(text)
+        if not self._buffering:
+            _stdout().flush()
+
+    @contextmanager
+    def buffered(self) -> Iterator["Console"]:
+        """Buffer the output of the console in the context, and flush it on exit.
+
+        Buffered output is written in batches once `buffer_size` characters are buffered
+        or `flush_interval` seconds after the first buffered write, which makes printing
+        many short lines much cheaper. Call `flush` before writing to stdout directly.
+        """
+        with self._write_lock:
+            self._buffering += 1
+        try:
+            yield self
+        finally:
+            with self._write_lock:
+                self._buffering -= 1
+            self.flush()
+
+    @contextmanager
+    def shared(self) -> Iterator["Console"]:
+        """Let worker processes write through the console in the context.
+
+        Threads can always use the console, their output is written one whole print at a
+        time. Worker processes using the console in the context, forked with it or passed
+        it as an argument, buffer their output and send it in batches to a writer thread
+        of this process, through a `multiprocessing` manager queue. Batches are written
+        whole, so output of different processes never mixes. Output sent by processes
+        that exited is written before the context exits.
+        """
+        if self._queue is not None:
+            yield self
+            return
+        import multiprocessing
+
+        manager = multiprocessing.Manager()
+        self._queue = manager.Queue()
+        writer = threading.Thread(target=self._drain, args=(self._queue,), daemon=True)
+        writer.start()
+        _shared_consoles.add(self)
+        try:
+            yield self
+        finally:
+            _shared_consoles.discard(self)
+            self._queue.put(None)
+            writer.join()
+            self._queue = None
+            manager.shutdown()
+
+    def _drain(self, queue: Any) -> None:
+        """Write the output sent by worker processes, until `None` is received."""
+        try:
+            for text in iter(queue.get, None):
+                self._write(text)
+        except (EOFError, OSError):
+            pass
+
+    def _send_to(self, queue: Any) -> None:
+        """Send the output of this console, in a worker process, to a shared console."""
+        from multiprocessing.util import Finalize
+
+        # A forked copy starts with a new lock and without the output buffered by its parent.
+        self._write_lock = threading.RLock()
+        self._buffer = []
+        self._buffered_size = 0
+        self._flush_timer = None
+        self._batch_state = None
+        self._queue = queue
+        self._remote = True
+        self._buffering += 1
+        Finalize(None, _flush_buffered_consoles, exitpriority=10)
+
+    def __reduce__(self):
+        return _restore_console, (
+            self.theme,
+            self.buffer_size,
+            self.flush_interval,
+            self.output_format,
+            self._queue,
         )
 
+    def flush(self) -> None:
+        """Write any buffered output."""
+        with self._write_lock:
+            self._batch_state = None
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._buffer:
+                return
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._buffered_size = 0
+            if self._remote:
+                self._queue.put(text)
+                return
+            stdout = _stdout()
+            stdout.write(text)
+            stdout.flush()
+
+    def _write(self, text: str, stream: Optional[Any] = None) -> None:
+        """Write rendered output to a stream or stdout, buffering it if the console is buffered.
+
+        Buffered output is always written to the real stdout, see `_stdout`.
+        """
+        if not self._buffering:
+            with self._write_lock:
+                (stream or sys.stdout).write(text)
+            return
+        with self._write_lock:
+            self._buffer.append(text)
+            self._buffered_size += len(text)
+            if self._buffered_size >= self.buffer_size:
+                self.flush()
+            elif self._flush_timer is None:
+                _buffered_consoles.add(self)
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    @contextmanager
+    def invocation(self, command_path: str, output_format: Optional[str] = None) -> Iterator[None]:
+        """Attribute the output written in the context to a command.
+
+        The context applies to the current thread or task, so concurrent invocations each
+        keep their own command path and output format.
+
+        Args:
+            command_path (str): The names of the command and its parents, e.g. "deploy web",
+                included in JSON Lines records.
+            output_format (Optional[str]): The output format to use in the context instead
+                of `output_format`, e.g. selected with an output flag.
+        """
+        current = _invocation.get()
+        if output_format is None and current is not None:
+            output_format = current[1]
+        token = _invocation.set((command_path, output_format))
+        try:
+            yield
+        finally:
+            _invocation.reset(token)
+
+    def _output_format(self) -> str:
+        """Get the output format of the current invocation."""
+        invocation = _invocation.get()
+        return (invocation and invocation[1]) or self.output_format
+
+    def _format_record(self, level: str, message: str) -> str:
+        """Format output as a JSON Lines record."""
+        invocation = _invocation.get()
+        command = encode_basestring(invocation[0]) if invocation else '""'
+        # Only the command and message need encoding, the other fields are always plain text.
+        return (
+            f'{{"level":"{level}","timestamp":"{_timestamp()}",'
+            + f'"command":{command},"message":{encode_basestring(message)}}}\n'
+        )
+
+    def _write_record(self, level: str, message: str) -> None:
+        """Write output as a JSON Lines record."""
+        self._write(self._format_record(level, message))
+
+    def _is_plain_output(self) -> bool:
+        """Check if output goes somewhere that is not rendered with styles, like a pipe."""
+        if os.environ.get("FORCE_COLOR") or os.environ.get("TTY_COMPATIBLE") == "1":
+            return False
+        isatty = getattr(sys.stdout, "isatty", None)
+        return not (isatty and isatty())
+
+    def _output_state(self) -> Tuple[bool, Optional[int]]:
+        """Check if output is plain and how wide it is.
+
+        While the console is buffered, the state is checked once per batch of output.
+        """
+        state = self._batch_state
+        if state is None:
+            plain = self._is_plain_output()
+            state = (plain, None if plain else self._console.width)
+            if self._buffering:
+                self._batch_state = state
+        return state
+
+    def _rendered_prefix(self, prefix: PrefixStyle) -> Tuple[str, int]:
+        """Get a styled prefix symbol rendered once, along with its width in cells."""
+        key = (prefix.symbol, prefix.style)
+        console = self._console
+        if key not in self._prefix_cache:
+            from rich.cells import cell_len
+
+            with console.capture() as capture:
+                console.print(f"[{prefix.style}]{prefix.symbol}[/{prefix.style}]", end="")
+            self._prefix_cache[key] = (capture.get(), cell_len(prefix.symbol))
+        return self._prefix_cache[key]
+
+    def _print_prefixed(self, prefix: PrefixStyle, message: str, level: str) -> None:
+        """Display a message with a styled prefix symbol, or write it as a record."""
+        message = str(message)
+        if self._output_format() != "text":
+            self._write_record(level, _strip_markup(message))
+            return
+        plain, width = self._output_state()
+        if plain:
+            self._write(f"{prefix.symbol} {_strip_markup(message)}\n")
+            return
+        rendered_prefix, prefix_width = self._rendered_prefix(prefix)
+        # Short printable text without markup renders as itself, so it skips rich entirely.
+        if (
+            message.isascii()
+            and message.isprintable()
+            and _RICH_SYNTAX.isdisjoint(message)
+            and prefix_width + 1 + len(message) <= width
+        ):
+            self._write(f"{rendered_prefix} {message}\n")
+            return
+        self.print(f"[{prefix.style}]{prefix.symbol}[/{prefix.style}] {message}")
+
     def print(self, *objects: Any, style: Optional[str] = None, **kwargs: Any) -> None:
         """Display rich text in the console
 
@@ -45,38 +459,70 @@ class Console:
             style (Optional[str]): The style to apply to the text.
             **kwargs (Any): Additional keyword arguments for the print method.
         """
+        if self._output_format() != "text":
+            if objects:
+                self._write_record("info", self._plain_text(objects, kwargs))
+            return
         self._console.print(*objects, style=style, **kwargs)
 
+    def _plain_text(self, objects: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        """Get printed objects as text without styles, for JSON Lines records."""
+        if all(isinstance(obj, str) for obj in objects):
+            return kwargs.get("sep", " ").join(_strip_markup(obj) for obj in objects)
+        from rich.text import Text
+
+        console = self._console
+        with console.capture() as capture:
+            console.print(*objects, **{**kwargs, "end": ""})
+        return Text.from_ansi(capture.get()).plain.rstrip()
+
     def success(self, message: str) -> None:
         """Display a success message in the console."""
-        style = self.theme.success_prefix.style
-        symbol = self.theme.success_prefix.symbol
-        self.print(
-            f"[{style}]{symbol}[/{style}] {message}",
-        )
+        self._print_prefixed(self.theme.success_prefix, message, "success")
 
     def error(self, message: str) -> None:
         """Display an error message in the console."""
-        style = self.theme.error_prefix.style
-        symbol = self.theme.error_prefix.symbol
-        self.print(
-            f"[{style}]{symbol}[/{style}] {message}",
-        )
+        self._print_prefixed(self.theme.error_prefix, message, "error")
 
     def warning(self, message: str) -> None:
         """Display a warning message in the console."""
-        style = self.theme.warning_prefix.style
-        symbol = self.theme.warning_prefix.symbol
-        self.print(
-            f"[{style}]{symbol}[/{style}] {message}",
-        )
+        self._print_prefixed(self.theme.warning_prefix, message, "warning")
 
     def info(self, message: str) -> None:
         """Display an informational message in the console."""
-        style = self.theme.info_prefix.style
-        symbol = self.theme.info_prefix.symbol
-        self.print(
-            f"[{style}]{symbol}[/{style}] {message}",
+        self._print_prefixed(self.theme.info_prefix, message, "info")
+
+    def progress(
+        self,
+        refresh_per_second: float = 10,
+        plain_interval: float = 5.0,
+        processes: bool = False,
+    ) -> "Progress":
+        """Create a dashboard of progress bars for long-running tasks.
+
+        Use it as a context manager, and update its tasks from any thread:
+
+            with console.progress() as progress:
+                task = progress.add_task("Downloading", total=len(urls))
+                for url in urls:
+                    download(url)
+                    task.advance()
+
+        Args:
+            refresh_per_second (float): The maximum number of redraws per second.
+            plain_interval (float): The seconds between plain progress lines, written
+                instead of progress bars when the output is not a terminal.
+            processes (bool): Whether tasks can be passed to and updated from worker
+                processes.
+
+        Returns:
+            Progress: The dashboard, displayed once started.
+        """
+        return Progress(
+            self,
+            refresh_per_second=refresh_per_second,
+            plain_interval=plain_interval,
+            processes=processes,
         )
 
     def display_header(
@@ -91,6 +537,7 @@ class Console:
             description (Optional[str]): A brief description of the CLI tool.
             version (Optional[str]): The version of the CLI tool.
         """
+        from rich.text import Text
 
         title = Text(title, style=self.theme.title)
         if version:
@@ -116,6 +563,8 @@ class Console:
         Args:
             usage (str): The usage information for the CLI tool.
         """
+        from rich.text import Text
+
         self.print(Text(f"Usage: {usage}"), style=self.theme.usage)
 
     def display_version(self, version: str) -> None:
@@ -123,6 +572,8 @@ class Console:
         Args:
             version (str): The version of the CLI tool.
         """
+        from rich.text import Text
+
         self.print(
             Text(
                 f"v{version}",
@@ -139,6 +590,10 @@ class Console:
 
         if not subcommands:
             return
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich.text import Text
+
         subcommands_table = Table(highlight=True, box=None, show_header=False)
         for subcommand in subcommands:
             help_message = (
@@ -147,7 +602,9 @@ class Console:
             help_message.style = self.theme.subcommand_description
 
             if subcommand.description:
-                subcommand_name = Text(subcommand.name, style=self.theme.subcommand)
+                subcommand_name = Text(
+                    ", ".join([subcommand.name] + subcommand.aliases), style=self.theme.subcommand
+                )
                 subcommand_name.pad_right(5)
 
                 subcommands_table.add_row(subcommand_name, help_message)
@@ -160,6 +617,8 @@ class Console:
         options: Optional[List[Option]],
         version_flags: Optional[List[str]] = None,
         help_flags: Optional[List[str]] = None,
+        batch_flags: Optional[List[str]] = None,
+        output_flags: Optional[List[str]] = None,
     ) -> None:
         """Display the options table for the CLI tool.
 
@@ -167,9 +626,14 @@ class Console:
             options (Optional[List[Option]]): The options to display.
             version_flags (Optional[List[str]]): The version flags for the CLI tool.
             help_flags (Optional[List[str]]): The help flags for the CLI tool.
+            batch_flags (Optional[List[str]]): The batch flags for the CLI tool.
+            output_flags (Optional[List[str]]): The output format flags for the CLI tool.
         """
         if not options:
             return
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich.text import Text
 
         options_table = Table(highlight=True, box=None, show_header=False)
         for option in options:
@@ -185,32 +649,24 @@ class Console:
                 opt2 = Text("")
             opt2.pad_right(5)
             options_table.add_row(opt1, opt2, help_message)
-        # Always add version flags to the bottom of Global Options table
-        if len(version_flags) == 2:
-            version_flag1 = self._highlighter(version_flags[0])
-            version_flag2 = self._highlighter(version_flags[1])
-        else:
-            version_flag1 = self._highlighter(version_flags[0])
-            version_flag2 = Text("")
-        version_flag2.pad_right(5)
-        options_table.add_row(
-            version_flag1,
-            version_flag2,
-            Text("Display the version.", style=self.theme.option_description),
-        )
-        # Always add help flags to the bottom Global Options table
-        if len(help_flags) == 2:
-            help_flag1 = self._highlighter(help_flags[0])
-            help_flag2 = self._highlighter(help_flags[1])
-        else:
-            help_flag1 = self._highlighter(help_flags[0])
-            help_flag2 = Text("")
-        help_flag2.pad_right(5)
-        options_table.add_row(
-            help_flag1,
-            help_flag2,
-            Text("Display this help message and exit.", style=self.theme.option_description),
-        )
+        # Always add output, batch, version and help flags to the bottom of Global Options table
+        reserved_rows = [
+            (output_flags, f"Set the output format: {', '.join(_OUTPUT_FORMATS)}."),
+            (batch_flags, "Run the command lines of a file, or '-' for stdin, and exit."),
+            (version_flags, "Display the version."),
+            (help_flags, "Display this help message and exit."),
+        ]
+        for flags, description in reserved_rows:
+            if not flags:
+                continue
+            flag1 = self._highlighter(flags[0])
+            flag2 = self._highlighter(flags[1]) if len(flags) == 2 else Text("")
+            flag2.pad_right(5)
+            options_table.add_row(
+                flag1,
+                flag2,
+                Text(description, style=self.theme.option_description),
+            )
         self.print(Panel(options_table, border_style="dim", title_align="left", title="Options"))
 
     def display_arguments_table(
@@ -223,6 +679,9 @@ class Console:
         """
         if not arguments:
             return
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich.text import Text
 
         arguments_table = Table(highlight=True, box=None, show_header=False)
         for argument in arguments:
@@ -249,6 +708,8 @@ class Console:
         show_header: bool = True,
         help_flags: Optional[List[str]] = None,
         version_flags: Optional[List[str]] = None,
+        batch_flags: Optional[List[str]] = None,
+        output_flags: Optional[List[str]] = None,
     ) -> None:
         """
         Display the help message for a CLI tool.
@@ -264,6 +725,8 @@ class Console:
             show_header (bool): Whether to display the header information.
             help_flags (Optional[List[str]]): The help flags for the CLI tool.
             version_flags (Optional[List[str]]): The version flags for the CLI tool.
+            batch_flags (Optional[List[str]]): The batch flags for the CLI tool.
+            output_flags (Optional[List[str]]): The output format flags for the CLI tool.
         """
         if show_header and title:
             self.display_header(title, description, version)
@@ -271,6 +734,28 @@ class Console:
         self.display_usage(usage)
         self.display_subcommands_table(subcommands=subcommands)
         self.display_options_table(
-            options=options, version_flags=version_flags, help_flags=help_flags
+            options=options,
+            version_flags=version_flags,
+            help_flags=help_flags,
+            batch_flags=batch_flags,
+            output_flags=output_flags,
         )
         self.display_arguments_table(arguments=arguments)
+
+    def render_help(self, **kwargs: Any) -> str:
+        """
+        Render the help message for a CLI tool without displaying it.
+
+        The help message is always rendered as text, whatever the output format.
+
+        Args:
+            **kwargs (Any): The arguments of `display_help`.
+
+        Returns:
+            str: The rendered help message, including any ANSI escape sequences.
+        """
+        invocation = _invocation.get()
+        with self.invocation(invocation[0] if invocation else "", "text"):
+            with self._console.capture() as capture:
+                self.display_help(**kwargs)
+        return capture.get()
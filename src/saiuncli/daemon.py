@@ -0,0 +1,373 @@
+"""
+Serve a CLI tool from a resident process over a Unix domain socket.
+
+The daemon holds the constructed `CLI`, with its compiled plan, rendered help and imported
+handler modules, and executes command lines forwarded by `forward`. The client only uses
+the standard library, so forwarding a command line skips importing the CLI tool.
+
+Usage:
+    python -m saiuncli.daemon SOCKET [ARGS...]
+"""
+
+import io
+import os
+import sys
+import errno
+import json
+import stat
+import socket
+import struct
+import threading
+import traceback
+import socketserver
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from saiuncli.cli import CLI
+
+__all__ = ["DaemonServer", "serve", "forward"]
+
+# Every message is a kind byte followed by the big-endian length of its payload.
+_HEADER = struct.Struct(">cI")
+_REQUEST = b"R"
+_STDIN = b"I"
+_STDIN_EOF = b"E"
+_STDOUT = b"O"
+_STDERR = b"X"
+_EXIT = b"C"
+_CHUNK_SIZE = 65536
+
+
+def _send(sock: socket.socket, kind: bytes, payload: bytes = b""):
+    sock.sendall(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _recv(file) -> Tuple[Optional[bytes], bytes]:
+    """Read a message, the kind is None once the connection is closed."""
+    header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None, b""
+    kind, length = _HEADER.unpack(header)
+    payload = file.read(length)
+    if len(payload) < length:
+        return None, b""
+    return kind, payload
+
+
+class _Connection:
+    """A client connection, shared by the streams forwarded over it."""
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._file = sock.makefile("rb")
+        self._lock = threading.Lock()
+
+    def send(self, kind: bytes, payload: bytes = b""):
+        with self._lock:
+            _send(self._sock, kind, payload)
+
+    def recv(self) -> Tuple[Optional[bytes], bytes]:
+        return _recv(self._file)
+
+
+class _StreamWriter(io.RawIOBase):
+    """Forward writes to the client's stdout or stderr."""
+
+    def __init__(self, connection: _Connection, kind: bytes, tty: bool):
+        self._connection = connection
+        self._kind = kind
+        self._tty = tty
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def write(self, data) -> int:
+        self._connection.send(self._kind, bytes(data))
+        return len(data)
+
+
+class _StreamReader(io.RawIOBase):
+    """Read the client's stdin as the handler consumes it."""
+
+    def __init__(self, connection: _Connection, tty: bool):
+        self._connection = connection
+        self._tty = tty
+        self._pending = b""
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._eof:
+            kind, payload = self._connection.recv()
+            if kind == _STDIN:
+                self._pending = payload
+            else:
+                self._eof = True
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _text_stream(raw: io.RawIOBase, writable: bool) -> io.TextIOWrapper:
+    buffered = io.BufferedWriter(raw) if writable else io.BufferedReader(raw)
+    return io.TextIOWrapper(buffered, encoding="utf-8", line_buffering=writable)
+
+
+def _exit_code(exit: SystemExit) -> int:
+    if exit.code is None:
+        return 0
+    if isinstance(exit.code, int):
+        return exit.code
+    sys.stderr.write(f"{exit.code}\n")
+    return 1
+
+
+def _set_environ(environ: Dict[str, str]):
+    """Make `os.environ` equal to `environ`, only touching the variables that differ."""
+    for name in [name for name in os.environ if name not in environ]:
+        del os.environ[name]
+    for name, value in environ.items():
+        if os.environ.get(name) != value:
+            os.environ[name] = value
+
+
+def _peer_uid(sock: socket.socket) -> Optional[int]:
+    """Get the user id of the process at the other end of a Unix domain socket, if known."""
+    if hasattr(socket, "SO_PEERCRED"):
+        # struct ucred: pid, uid and gid.
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", credentials)[1]
+    if hasattr(socket, "LOCAL_PEERCRED"):
+        # struct xucred: version, uid, number of groups and groups.
+        credentials = sock.getsockopt(0, socket.LOCAL_PEERCRED, struct.calcsize("2Ih16I"))
+        return struct.unpack_from("2I", credentials)[1]
+    return None
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        connection = _Connection(self.request)
+        kind, payload = connection.recv()
+        if kind != _REQUEST:
+            return
+        uid = _peer_uid(self.request)
+        if uid is not None and uid != os.getuid():
+            connection.send(_STDERR, b"The daemon only serves the user running it.\n")
+            connection.send(_EXIT, b"1")
+            return
+        request = json.loads(payload)
+        tty = request.get("tty", [False, False, False])
+        stdin = _text_stream(_StreamReader(connection, tty[0]), writable=False)
+        stdout = _text_stream(_StreamWriter(connection, _STDOUT, tty[1]), writable=True)
+        stderr = _text_stream(_StreamWriter(connection, _STDERR, tty[2]), writable=True)
+        exit_code = self.server.execute(request, stdin, stdout, stderr)
+        connection.send(_EXIT, str(exit_code).encode())
+
+
+def _is_served(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    def __init__(self, cli: "CLI", socket_path: str):
+        """
+        Initialize a DaemonServer object.
+
+        Executes the command lines forwarded to a Unix domain socket by `forward`, one at
+        a time, since the working directory, environment and standard streams of the
+        process are switched to those of the client for each command line. Call
+        `serve_forever` to start serving.
+
+        Only the owner of the process can connect to the socket: it is created readable and
+        writable by its owner only, and connections from processes of other users are
+        closed where the platform reports the user of the peer.
+
+        Args:
+            cli (CLI): The CLI tool to execute command lines with.
+            socket_path (str): The path of the Unix domain socket to listen on.
+        """
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # Only a stale socket left by a daemon that stopped is replaced, never a file.
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(errno.EEXIST, "The path is not a socket", socket_path)
+            if _is_served(socket_path):
+                raise OSError(
+                    errno.EADDRINUSE, "A daemon is already serving the socket", socket_path
+                )
+            os.unlink(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        self.cli = cli
+        self.cli.compile()
+
+    def server_bind(self):
+        # The socket file is created with owner-only permissions rather than restricted
+        # after binding, so other users can never connect in between.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+    def execute(self, request: Dict[str, Any], stdin, stdout, stderr) -> int:
+        """Run a forwarded command line in the client's context, returning its exit status."""
+        saved_streams = sys.stdin, sys.stdout, sys.stderr
+        saved_argv = sys.argv
+        saved_environ = dict(os.environ)
+        saved_cwd = os.getcwd()
+        # The console detects the terminal of the client, not the one of the daemon.
+        self.cli.console.reset_terminal()
+        try:
+            sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+            sys.argv = [request["prog"]] + request["argv"]
+            _set_environ(request["env"])
+            os.chdir(request["cwd"])
+            try:
+                self.cli.run(argv=request["argv"])
+                return 0
+            except SystemExit as e:
+                return _exit_code(e)
+            except Exception:
+                traceback.print_exc()
+                return 1
+        finally:
+            for stream in (stdout, stderr):
+                try:
+                    stream.flush()
+                except OSError:
+                    pass
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            sys.argv = saved_argv
+            _set_environ(saved_environ)
+            os.chdir(saved_cwd)
+            self.cli.console.reset_terminal()
+
+
+def serve(cli: "CLI", socket_path: str):
+    """
+    Serve a CLI tool on a Unix domain socket until interrupted.
+
+    Args:
+        cli (CLI): The CLI tool to execute command lines with.
+        socket_path (str): The path of the Unix domain socket to listen on.
+    """
+    with DaemonServer(cli, socket_path) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _forward_stdin(sock: socket.socket, stdin):
+    try:
+        try:
+            fd = stdin.fileno()
+            while True:
+                data = os.read(fd, _CHUNK_SIZE)
+                if not data:
+                    break
+                _send(sock, _STDIN, data)
+        except (OSError, ValueError):
+            pass
+        _send(sock, _STDIN_EOF)
+    except OSError:
+        # The daemon finished the command line without reading all of stdin.
+        pass
+
+
+def _write_output(stream, data: bytes):
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        stream.write(data.decode("utf-8", errors="replace"))
+        stream.flush()
+        return
+    stream.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
+def _isatty(stream) -> bool:
+    return bool(stream and stream.isatty())
+
+
+def forward(socket_path: str, argv: Optional[Sequence[str]] = None, prog: Optional[str] = None):
+    """
+    Execute a command line in the daemon serving a Unix domain socket.
+
+    The command line is executed with the working directory, environment and standard
+    streams of the caller. Output is streamed back as the daemon writes it.
+
+    Args:
+        socket_path (str): The path of the daemon's Unix domain socket.
+        argv (Optional[Sequence[str]]):
+            The command line arguments, without the program name.
+            Defaults to `sys.argv[1:]`.
+        prog (Optional[str]):
+            The program name used in the CLI tool's output. Defaults to the name of the script.
+
+    Returns:
+        int: The exit status of the command line.
+
+    Raises:
+        OSError: If no daemon is serving the socket, e.g. `ConnectionRefusedError`.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    stdin, stdout, stderr = sys.stdin, sys.stdout, sys.stderr
+    environ = dict(os.environ)
+    if _isatty(stdout) and "COLUMNS" not in environ:
+        environ["COLUMNS"] = str(os.get_terminal_size(stdout.fileno()).columns)
+    request = {
+        "argv": argv,
+        "prog": prog or (os.path.basename(sys.argv[0]) if sys.argv else ""),
+        "env": environ,
+        "cwd": os.getcwd(),
+        "tty": [_isatty(stdin), _isatty(stdout), _isatty(stderr)],
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        _send(sock, _REQUEST, json.dumps(request).encode())
+        threading.Thread(target=_forward_stdin, args=(sock, stdin), daemon=True).start()
+
+        outputs = {_STDOUT: stdout, _STDERR: stderr}
+        file = sock.makefile("rb")
+        while True:
+            kind, payload = _recv(file)
+            if kind is None:
+                return 1
+            if kind == _EXIT:
+                return int(payload)
+            _write_output(outputs[kind], payload)
+
+
+def main(args: Optional[List[str]] = None):
+    args = sys.argv[1:] if args is None else args
+    if not args:
+        sys.stderr.write("usage: python -m saiuncli.daemon SOCKET [ARGS...]\n")
+        sys.exit(2)
+    sys.exit(forward(args[0], args[1:]))
+
+
+if __name__ == "__main__":
+    main()
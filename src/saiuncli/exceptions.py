@@ -0,0 +1,44 @@
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from saiuncli.command import Command
+
+__all__ = ["CLIError", "ParseError", "HandlerError"]
+
+
+class CLIError(Exception):
+    def __init__(
+        self,
+        message: str,
+        command: Optional["Command"] = None,
+        prog: Optional[str] = None,
+        exit_code: int = 1,
+    ):
+        """
+        Initialize a CLIError object.
+
+        Base class for the errors raised by `CLI.parse` and `CLI.invoke`.
+
+        Args:
+            message (str):
+                The error message to display.
+            command (Optional[Command]):
+                The command the error occurred in, used to display its help.
+            prog (Optional[str]):
+                The program name used in the usage string of the help.
+            exit_code (int):
+                The exit status the CLI tool should exit with.
+        """
+        super().__init__(message)
+        self.message = message
+        self.command = command
+        self.prog = prog
+        self.exit_code = exit_code
+
+
+class ParseError(CLIError):
+    """The command line is invalid for the command tree."""
+
+
+class HandlerError(CLIError):
+    """The handler of a command raised an exception, available as `__cause__`."""
@@ -0,0 +1,77 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+if TYPE_CHECKING:
+    from saiuncli.cli import ParsedCLI
+    from saiuncli.command import Command
+
+__all__ = ["Middleware"]
+
+
+class Middleware:
+    """
+    Hooks run around the parsing and execution of commands.
+
+    Subclass it and override the hooks needed, the default hooks do nothing. Middleware is
+    attached to a command with `Command(middleware=...)` and applies to its subcommands
+    created with `inherit_middleware=True`, or to every command of a CLI tool with
+    `CLI(global_middleware=...)`. Global middleware runs first, then the middleware of
+    the most distant parent command down to the command's own.
+    """
+
+    def before_parse(self, argv: List[str]) -> List[str]:
+        """
+        Called with the command line before it is parsed.
+
+        Only run for global middleware, since the command is not known yet.
+
+        Args:
+            argv (List[str]): The command line arguments, without the program name.
+
+        Returns:
+            List[str]: The command line arguments to parse.
+        """
+        return argv
+
+    def after_parse(self, parsed_cli: "ParsedCLI", command: "Command") -> "ParsedCLI":
+        """
+        Called with the parsed command line, before missing required values are checked.
+
+        Args:
+            parsed_cli (ParsedCLI): The parsed command line.
+            command (Command): The command selected by the command line.
+
+        Returns:
+            ParsedCLI: The parsed command line to execute.
+        """
+        return parsed_cli
+
+    def around_handler(
+        self,
+        command: "Command",
+        kwargs: Dict[str, Any],
+        call_next: Callable[[Dict[str, Any]], Any],
+    ) -> Any:
+        """
+        Called instead of the handler, to call it with `call_next` and return its result.
+
+        `call_next` runs the rest of the middleware and then the hooks and handler of the
+        command. With `CLI.ainvoke`, it returns an awaitable of the result.
+
+        Args:
+            command (Command): The command being executed.
+            kwargs (Dict[str, Any]): The arguments of the handler.
+            call_next (Callable[[Dict[str, Any]], Any]): Executes the handler with arguments.
+
+        Returns:
+            Any: The result of the handler.
+        """
+        return call_next(kwargs)
+
+    def on_error(self, error: Exception, command: "Command") -> None:
+        """
+        Called when the handler or its hooks raised an exception, before it is reported.
+
+        Args:
+            error (Exception): The exception raised.
+            command (Command): The command being executed.
+        """
@@ -1,10 +1,27 @@
 # flake8: noqa: E501
 from typing import Any, List, Optional, Literal, Union
 
-from saiuncli._utils import _is_long_flag, _is_short_flag, _validate_flags
+from saiuncli._utils import _Frozen, _validate_flags
 
 
-class Option:
+class Option(_Frozen):
+    __slots__ = (
+        "name",
+        "flags",
+        "description",
+        "required",
+        "action",
+        "default",
+        "choices",
+        "type",
+        "nargs",
+        "stream",
+        "long_flag",
+        "short_flag",
+        "long_name",
+        "short_name",
+    )
+
     def __init__(
         self,
         name: Optional[str] = None,
@@ -18,10 +35,15 @@ class Option:
         choices: Optional[List[Any]] = None,
         type: Optional[type] = str,
         nargs: Optional[Union[int, Literal["*"]]] = None,
+        stream: bool = False,
     ):
         """
         Initialize an Option object.
 
+        Options are immutable once created. The long and short flags, and the names derived
+        from them, are resolved here and available as the `long_flag`, `short_flag`,
+        `long_name` and `short_name` attributes.
+
         Args:
             name (Optional[str]):
                 This is the name of the option. The resolved value should be referenced by
@@ -39,45 +61,41 @@ class Option:
             default (Optional[str]):
                 The default value for the option.
             choices (Optional[List[Any]]):
-                The choices available for the option.
+                The choices available for the option. A `range` is checked without
+                listing its values.
             type (Optional[type]):
                 The type of the option.
             nargs (Optional[Union[int, Literal["*"]]]):
                 The number of arguments that should be consumed.
                 This is only applicable for actions - "store", "append", and "extend".
                 if nargs is not None, the resolved value for the Option will be always be a list.
+            stream (bool):
+                Whether the value names a source of many values: "-" for stdin or "@path" for
+                a file with one value per line. The handler receives a `ValueSource` that reads
+                the values lazily. Only applicable for the "store" action without nargs.
         """
-        self.name = name
-        self.flags = flags
-        if not self.flags or self.name:
+        if not flags and not name:
             raise ValueError("Either flags or name must be provided.")
+        flags = tuple(flags or [f"--{name.replace('_', '-')}"])
+        long_flag, short_flag = _validate_flags(flags)
+        if stream and (action != "store" or nargs):
+            raise ValueError("Streamed options must use the 'store' action without nargs.")
 
-        if not self.flags:
-            self.flags = [f"--{self.name}"]
-        if not self.name:
-            self.name = self.long_name or self.short_name
-
-        self.description = description
-        self.required = required
-        self.action = action
-        self.default = default
-        self.choices = choices
-        self.type = type
-        self.nargs = nargs
-
-        _validate_flags(self.flags)
-
-    @property
-    def long_name(self) -> str:
-        long_flag = next((flag for flag in self.flags if _is_long_flag(flag)), None)
-        if long_flag and long_flag.startswith("--"):
-            long_flag = long_flag[2:]
-            return long_flag.replace("-", "_")
-        return None
-
-    @property
-    def short_name(self) -> str:
-        short_flag = next((flag for flag in self.flags if _is_short_flag(flag)), None)
-        if short_flag and short_flag.startswith("-"):
-            return short_flag[1:]
-        return None
+        long_name = long_flag[2:].replace("-", "_") if long_flag else None
+        short_name = short_flag[1:] if short_flag else None
+        self._set(
+            name=name or long_name or short_name,
+            flags=flags,
+            description=description,
+            required=required,
+            action=action,
+            default=default,
+            choices=choices,
+            type=type,
+            nargs=nargs,
+            stream=stream,
+            long_flag=long_flag,
+            short_flag=short_flag,
+            long_name=long_name,
+            short_name=short_name,
+        )
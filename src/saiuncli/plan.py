@@ -0,0 +1,407 @@
+import pickle
+import hashlib
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+
+from saiuncli.option import Option
+from saiuncli.argument import Argument
+from saiuncli.command import Command, LazyCommand
+from saiuncli._utils import _atomic_write
+
+__all__ = ["ParserPlan", "CommandPlan", "OptionSpec", "ArgumentSpec"]
+
+_PLAN_FORMAT_VERSION = 7
+
+
+class OptionSpec(NamedTuple):
+    """Immutable, pre-validated view of an `Option` used while parsing."""
+
+    name: str
+    flags: Tuple[str, ...]
+    action: str
+    type: Any
+    choices: Optional[Union[FrozenSet[Any], range, Tuple[Any, ...]]]
+    nargs: Optional[Union[int, str]]
+    default: Any
+    required: bool
+    stream: bool
+
+
+class ArgumentSpec(NamedTuple):
+    """Immutable, pre-validated view of an `Argument` used while parsing."""
+
+    name: str
+    type: Any
+    choices: Optional[Union[FrozenSet[Any], range, Tuple[Any, ...]]]
+    default: Any
+    required: bool
+    stream: bool
+
+
+class CommandPlan(NamedTuple):
+    """
+    Parser tables for a single command of the command tree.
+
+    Attributes:
+        name (str): The name of the command.
+        path (Tuple[str, ...]): The command names leading to this command from the root.
+        flags (Dict[str, OptionSpec]): Every flag accepted by the command, including
+            inherited and global options.
+        options (Tuple[OptionSpec, ...]): The command's own and inherited options.
+        arguments (Tuple[ArgumentSpec, ...]): The command's own and inherited arguments.
+        positionals (Tuple[ArgumentSpec, ...]): The argument slots filled by positional
+            values, global arguments first.
+        subcommands (Dict[str, Optional[CommandPlan]]): The plans of the command's
+            subcommands. Lazy subcommands that have not been imported map to None until
+            they are compiled with `compile_lazy_subcommand`.
+        subcommand_names (Dict[str, str]): The name of the subcommand selected by each
+            subcommand name and alias.
+        sorted_subcommand_names (Tuple[str, ...]): The keys of `subcommand_names` in sorted
+            order, to look up the names starting with a prefix by bisection.
+        fan_out (Optional[str]): The name of the argument collecting every remaining
+            positional value, if the command fans out.
+    """
+
+    name: str
+    path: Tuple[str, ...]
+    flags: Dict[str, OptionSpec]
+    options: Tuple[OptionSpec, ...]
+    arguments: Tuple[ArgumentSpec, ...]
+    positionals: Tuple[ArgumentSpec, ...]
+    subcommands: Dict[str, Optional["CommandPlan"]]
+    subcommand_names: Dict[str, str]
+    sorted_subcommand_names: Tuple[str, ...]
+    fan_out: Optional[str]
+
+
+class ParserPlan(NamedTuple):
+    """
+    Frozen, pre-validated parser tables for a whole command tree.
+
+    The only part of a plan filled in after it is compiled is the `subcommands` mapping of
+    a command with lazy subcommands, see `compile_lazy_subcommand`.
+
+    Attributes:
+        key (str): Hash of the command tree definition the plan was compiled from.
+        root (CommandPlan): The plan of the root command.
+        help_flags (FrozenSet[str]): The flags reserved for the help operation.
+        version_flags (FrozenSet[str]): The flags reserved for the version operation.
+        global_arguments (Tuple[ArgumentSpec, ...]): The global arguments of the tree.
+        batch_flags (FrozenSet[str]): The flags reserved for the batch operation.
+        output_flags (FrozenSet[str]): The flags reserved for selecting the output format.
+    """
+
+    key: str
+    root: CommandPlan
+    help_flags: FrozenSet[str]
+    version_flags: FrozenSet[str]
+    global_arguments: Tuple[ArgumentSpec, ...]
+    batch_flags: FrozenSet[str]
+    output_flags: FrozenSet[str]
+
+
+def _freeze_choices(choices: Optional[Union[List[Any], range]]):
+    """
+    Freeze choices into a frozenset for constant time lookups.
+
+    Ranges already have constant time lookups and are kept as they are. Falls back to a
+    tuple when the choices are not hashable.
+    """
+    if not choices:
+        return None
+    if isinstance(choices, range):
+        return choices
+    try:
+        return frozenset(choices)
+    except TypeError:
+        return tuple(choices)
+
+
+def _option_spec(option: Option) -> OptionSpec:
+    return OptionSpec(
+        name=option.name,
+        flags=tuple(option.flags),
+        action=option.action,
+        type=option.type,
+        choices=_freeze_choices(option.choices),
+        nargs=option.nargs,
+        default=option.default,
+        required=bool(option.required),
+        stream=option.stream,
+    )
+
+
+def _argument_spec(argument: Argument) -> ArgumentSpec:
+    return ArgumentSpec(
+        name=argument.name,
+        type=argument.type,
+        choices=_freeze_choices(argument.choices),
+        default=argument.default,
+        required=bool(argument.required),
+        stream=argument.stream,
+    )
+
+
+def _spec(specs: Dict[int, Any], item: Any, factory) -> Any:
+    """Build each spec once so options shared between commands share a spec."""
+    if id(item) not in specs:
+        specs[id(item)] = factory(item)
+    return specs[id(item)]
+
+
+def _compile_command(
+    command: Command,
+    path: Tuple[str, ...],
+    global_arguments: Tuple[ArgumentSpec, ...],
+    specs: Dict[int, Any],
+) -> CommandPlan:
+    command._validate_options(command.all_options)
+    command._validate_arguments(command.all_arguments)
+    command._validate_subcommands()
+
+    arguments = tuple(_spec(specs, argument, _argument_spec) for argument in command.all_arguments)
+    positionals = global_arguments + arguments
+    if command.fan_out is not None and (not positionals or positionals[-1].name != command.fan_out):
+        raise ValueError(
+            f"Fan-out argument '{command.fan_out}' must be the last argument of "
+            + f"command '{command.name}'."
+        )
+    subcommands = {}
+    subcommand_names = {}
+    for subcommand in command.subcommands:
+        for name in [subcommand.name] + subcommand.aliases:
+            subcommand_names[name] = subcommand.name
+        if isinstance(subcommand, LazyCommand) and not subcommand.loaded:
+            subcommands[subcommand.name] = None
+            continue
+        subcommands[subcommand.name] = _compile_command(
+            subcommand._resolve(), path + (subcommand.name,), global_arguments, specs
+        )
+    return CommandPlan(
+        name=command.name,
+        path=path,
+        flags={
+            flag: _spec(specs, option, _option_spec) for flag, option in command.flag_index.items()
+        },
+        options=tuple(_spec(specs, option, _option_spec) for option in command.all_options),
+        arguments=arguments,
+        positionals=positionals,
+        subcommands=subcommands,
+        subcommand_names=subcommand_names,
+        sorted_subcommand_names=tuple(sorted(subcommand_names)),
+        fan_out=command.fan_out,
+    )
+
+
+def compile_plan(
+    command: Command,
+    key: str,
+    help_flags: List[str],
+    version_flags: List[str],
+    global_arguments: Optional[List[Argument]] = None,
+    batch_flags: Optional[List[str]] = None,
+    output_flags: Optional[List[str]] = None,
+) -> ParserPlan:
+    """
+    Validate a command tree and freeze it into a parser plan.
+
+    Args:
+        command (Command): The root command of the tree.
+        key (str): The hash of the tree definition, see `tree_key`.
+        help_flags (List[str]): The flags reserved for the help operation.
+        version_flags (List[str]): The flags reserved for the version operation.
+        global_arguments (Optional[List[Argument]]): The global arguments of the tree.
+        batch_flags (Optional[List[str]]): The flags reserved for the batch operation.
+        output_flags (Optional[List[str]]): The flags reserved for selecting the output format.
+
+    Returns:
+        ParserPlan: The compiled parser plan.
+    """
+    specs = {}
+    global_argument_specs = tuple(
+        _spec(specs, argument, _argument_spec) for argument in global_arguments or []
+    )
+    root = _compile_command(command, (), global_argument_specs, specs)
+    return ParserPlan(
+        key=key,
+        root=root,
+        help_flags=frozenset(help_flags),
+        version_flags=frozenset(version_flags),
+        global_arguments=global_argument_specs,
+        batch_flags=frozenset(batch_flags or []),
+        output_flags=frozenset(output_flags or []),
+    )
+
+
+def compile_lazy_subcommand(plan: ParserPlan, parent: CommandPlan, name: str, command: Command):
+    """
+    Compile a lazily imported subcommand into an existing parser plan.
+
+    The compiled plan replaces the None placeholder of the subcommand in the `subcommands`
+    mapping of its parent, so the subcommand is compiled once per plan. The mapping is
+    filled with a single item assignment, so threads parsing with the plan meanwhile see
+    either the placeholder or the complete plan, and at worst compile it twice.
+
+    Args:
+        plan (ParserPlan): The plan of the command tree.
+        parent (CommandPlan): The plan of the parent command.
+        name (str): The name the subcommand is registered under.
+        command (Command): The imported subcommand.
+
+    Returns:
+        CommandPlan: The compiled plan of the subcommand.
+    """
+    subcommand_plan = _compile_command(command, parent.path + (name,), plan.global_arguments, {})
+    parent.subcommands[name] = subcommand_plan
+    return subcommand_plan
+
+
+def _qualified_name(value: Any) -> str:
+    module = getattr(value, "__module__", None)
+    qualname = getattr(value, "__qualname__", None)
+    if module and qualname:
+        return f"{module}.{qualname}"
+    return repr(value)
+
+
+def _update_option_key(hasher, option: Option):
+    hasher.update(
+        repr(
+            (
+                "option",
+                option.name,
+                option.flags,
+                option.action,
+                _qualified_name(option.type),
+                option.choices,
+                option.nargs,
+                option.default,
+                option.required,
+                option.description,
+                option.stream,
+            )
+        ).encode()
+    )
+
+
+def _update_argument_key(hasher, argument: Argument):
+    hasher.update(
+        repr(
+            (
+                "argument",
+                argument.name,
+                _qualified_name(argument.type),
+                argument.choices,
+                argument.default,
+                argument.required,
+                argument.description,
+                argument.stream,
+            )
+        ).encode()
+    )
+
+
+def _update_command_key(hasher, command: Command):
+    if isinstance(command, LazyCommand):
+        # The placeholder is all that is known without importing the command.
+        hasher.update(
+            repr(
+                ("lazy", command.name, command.aliases, command.description, command.target)
+            ).encode()
+        )
+        return
+    hasher.update(
+        repr(
+            (
+                "command",
+                command.name,
+                command.aliases,
+                command.description,
+                command.usage,
+                command.inherit_options,
+                command.inherit_arguments,
+                command.fan_out,
+            )
+        ).encode()
+    )
+    for option in command.options:
+        _update_option_key(hasher, option)
+    for argument in command.arguments:
+        _update_argument_key(hasher, argument)
+    for subcommand in command.subcommands:
+        _update_command_key(hasher, subcommand)
+    hasher.update(b"end")
+
+
+def tree_key(
+    command: Command,
+    help_flags: List[str],
+    version_flags: List[str],
+    global_options: Optional[List[Option]] = None,
+    global_arguments: Optional[List[Argument]] = None,
+    batch_flags: Optional[List[str]] = None,
+    output_flags: Optional[List[str]] = None,
+) -> str:
+    """
+    Hash the definition of a command tree.
+
+    The key changes whenever a command, option or argument of the tree changes, so it can
+    be used to tell whether a cached plan still matches the tree.
+
+    Returns:
+        str: The hex digest of the tree definition.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(
+        repr((_PLAN_FORMAT_VERSION, help_flags, version_flags, batch_flags, output_flags)).encode()
+    )
+    for option in global_options or []:
+        _update_option_key(hasher, option)
+    for argument in global_arguments or []:
+        _update_argument_key(hasher, argument)
+    _update_command_key(hasher, command)
+    return hasher.hexdigest()
+
+
+def load_plan(path: str, key: str) -> Optional[ParserPlan]:
+    """
+    Load a cached parser plan.
+
+    Only load plans from files written by the CLI tool itself; the cache is a pickle.
+
+    Args:
+        path (str): The path of the cache file.
+        key (str): The expected hash of the tree definition.
+
+    Returns:
+        Optional[ParserPlan]: The cached plan, or None if the cache is missing, unreadable
+            or was compiled from a different tree.
+    """
+    try:
+        with open(path, "rb") as file:
+            plan = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+        return None
+    if not isinstance(plan, ParserPlan) or plan.key != key:
+        return None
+    return plan
+
+
+def save_plan(path: str, plan: ParserPlan) -> bool:
+    """
+    Write a parser plan to a cache file.
+
+    The file is replaced atomically. Plans referencing values that cannot be pickled,
+    such as lambda `type` converters, are not cached.
+
+    Args:
+        path (str): The path of the cache file.
+        plan (ParserPlan): The plan to cache.
+
+    Returns:
+        bool: Whether the plan was written.
+    """
+    try:
+        data = pickle.dumps(plan, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return _atomic_write(path, data)
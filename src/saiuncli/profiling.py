@@ -0,0 +1,261 @@
+import io
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from saiuncli._constants import _PROFILE_ENV, _PROFILE_FLAG
+
+__all__ = ["Profiler", "PhaseTiming"]
+
+# When the CLI framework was imported, the start of the "startup" phase.
+_IMPORTED_AT_NS = time.perf_counter_ns()
+
+_PROFILE_MODES = ("report", "cprofile", "tracemalloc")
+_REPORTED_STATS = 20
+
+
+class PhaseTiming(NamedTuple):
+    """
+    The timing of a phase of an invocation.
+
+    Attributes:
+        name (str): The name of the phase, e.g. "parse" or "handler".
+        start_ns (int): When the phase started, in `time.perf_counter_ns` nanoseconds.
+        duration_ns (int): How long the phase took, in nanoseconds.
+        thread_id (int): The thread the phase ran in.
+    """
+
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+
+
+class Profiler:
+    def __init__(
+        self,
+        report: bool = True,
+        cprofile: bool = False,
+        tracemalloc: bool = False,
+        trace_path: Optional[str] = None,
+    ):
+        """
+        Initialize a Profiler object.
+
+        Records the timings of the phases of CLI invocations, and optionally profiles or
+        traces the memory allocations of command handlers. Enable it for a CLI tool with
+        the `SAIUNCLI_PROFILE` environment variable or the hidden `--saiun-profile` flag,
+        see `from_spec`.
+
+        Args:
+            report (bool):
+                Whether to write a summary of the phase timings to stderr when finished.
+            cprofile (bool):
+                Whether to profile command handlers with `cProfile`.
+            tracemalloc (bool):
+                Whether to trace the memory allocated by command handlers.
+            trace_path (Optional[str]):
+                Path of a file to write the phase timings to in the Chrome trace format,
+                viewable in `chrome://tracing` or Perfetto.
+        """
+        self.report = report
+        self.cprofile = cprofile
+        self.tracemalloc = tracemalloc
+        self.trace_path = trace_path
+        self.phases: List[PhaseTiming] = []
+        self.stats: Optional[str] = None
+        self.memory: Optional[str] = None
+        self._capture_lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "Profiler":
+        """
+        Create a profiler from the value of `SAIUNCLI_PROFILE` or `--saiun-profile=`.
+
+        The value is a comma separated list of "report", "cprofile", "tracemalloc" and
+        "trace=PATH". "1" or an empty value only writes the report.
+
+        Args:
+            spec (str): The profiler specification, e.g. "cprofile,trace=trace.json".
+
+        Returns:
+            Profiler: The configured profiler.
+        """
+        modes = set()
+        trace_path = None
+        for item in filter(None, (item.strip() for item in spec.split(","))):
+            if item.startswith("trace="):
+                trace_path = item.partition("=")[2]
+            elif item in _PROFILE_MODES:
+                modes.add(item)
+            elif item != "1":
+                raise ValueError(f"Invalid profiler mode '{item}'")
+        # The report is only left out when the trace is the one output asked for.
+        if trace_path is None or modes:
+            modes.add("report")
+        return cls(
+            report="report" in modes,
+            cprofile="cprofile" in modes,
+            tracemalloc="tracemalloc" in modes,
+            trace_path=trace_path,
+        )
+
+    def record(self, name: str, start_ns: int, end_ns: Optional[int] = None):
+        """
+        Record a phase that already happened.
+
+        Args:
+            name (str): The name of the phase.
+            start_ns (int): When the phase started, in `time.perf_counter_ns` nanoseconds.
+            end_ns (Optional[int]): When the phase ended. Defaults to now.
+        """
+        end_ns = time.perf_counter_ns() if end_ns is None else end_ns
+        self.phases.append(PhaseTiming(name, start_ns, end_ns - start_ns, threading.get_ident()))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the code run in the context as a phase.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start_ns)
+
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """
+        Profile and trace the memory allocations of the code run in the context.
+
+        Only one capture runs at a time. Concurrent captures, e.g. of the handlers of a
+        parallel batch, are only timed.
+        """
+        if not (self.cprofile or self.tracemalloc) or not self._capture_lock.acquire(False):
+            yield
+            return
+        import cProfile
+        import tracemalloc
+
+        profile = cProfile.Profile() if self.cprofile else None
+        try:
+            # Memory is traced first and profiling enabled last, so neither measures the other.
+            if self.tracemalloc:
+                tracemalloc.start()
+            if profile is not None:
+                profile.enable()
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            if self.tracemalloc:
+                self.memory = self._format_memory()
+            if profile is not None:
+                self.stats = self._format_stats(profile)
+            self._capture_lock.release()
+
+    @staticmethod
+    def _format_stats(profile: Any) -> str:
+        import pstats
+
+        output = io.StringIO()
+        stats = pstats.Stats(profile, stream=output)
+        stats.sort_stats("cumulative").print_stats(_REPORTED_STATS)
+        return output.getvalue().strip("\n")
+
+    @staticmethod
+    def _format_memory() -> str:
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        lines = [f"peak memory: {peak / 1024:.1f} KiB"]
+        for stat in snapshot.statistics("lineno")[:10]:
+            lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Get the recorded phases in the Chrome trace format.
+
+        Returns:
+            Dict[str, Any]: The trace, with one complete ("X") event per phase.
+        """
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": phase.name,
+                    "cat": "saiuncli",
+                    "ph": "X",
+                    "ts": phase.start_ns / 1000,
+                    "dur": phase.duration_ns / 1000,
+                    "pid": pid,
+                    "tid": phase.thread_id,
+                }
+                for phase in self.phases
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def format_report(self) -> str:
+        """
+        Summarize the recorded phases, along with any profile and memory statistics.
+
+        Returns:
+            str: The report, one line per phase with its total time and count.
+        """
+        totals: Dict[str, List[int]] = {}
+        for phase in self.phases:
+            total = totals.setdefault(phase.name, [0, 0])
+            total[0] += phase.duration_ns
+            total[1] += 1
+        width = max((len(name) for name in totals), default=0)
+        lines = ["saiuncli profile:"]
+        for name, (duration_ns, count) in totals.items():
+            line = f"  {name:<{width}}  {duration_ns / 1e6:10.3f} ms"
+            lines.append(line + (f"  ({count} calls)" if count > 1 else ""))
+        for section in (self.memory, self.stats):
+            if section:
+                lines.append(section)
+        return "\n".join(lines) + "\n"
+
+    def finish(self):
+        """Write the report to stderr and the Chrome trace to its file, as configured."""
+        if self.trace_path:
+            with open(self.trace_path, "w") as file:
+                json.dump(self.chrome_trace(), file)
+        if self.report:
+            sys.stderr.write(self.format_report())
+            sys.stderr.flush()
+
+
+def _profiler_from_argv(argv: List[str]) -> Optional[Profiler]:
+    """
+    Create the profiler enabled by the environment or the hidden profile flag.
+
+    The flag is removed from `argv`, so commands never see it. Like the parser, the scan
+    has no "--" separator, so the flag is recognized anywhere. An invalid specification is
+    reported on stderr and leaves profiling disabled, so the command still runs.
+    """
+    spec = os.environ.get(_PROFILE_ENV)
+    for index, arg in enumerate(argv):
+        if arg == _PROFILE_FLAG or arg.startswith(_PROFILE_FLAG + "="):
+            del argv[index]
+            spec = arg.partition("=")[2]
+            break
+    if spec is None or spec == "0":
+        return None
+    try:
+        return Profiler.from_spec(spec)
+    except ValueError as e:
+        sys.stderr.write(f"saiuncli: {e}, profiling is disabled.\n")
+        return None
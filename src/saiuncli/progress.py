@@ -0,0 +1,321 @@
+import time
+import threading
+from contextvars import copy_context
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from saiuncli.console import Console
+
+__all__ = ["Progress", "ProgressTask"]
+
+# Remote tasks send their progress at most this often, in seconds.
+_REMOTE_FLUSH_INTERVAL = 0.05
+
+
+class ProgressTask:
+    def __init__(
+        self,
+        progress: "Progress",
+        task_id: int,
+        description: str,
+        total: Optional[float] = None,
+    ):
+        """
+        Initialize a ProgressTask object.
+
+        A task tracked by a `Progress` dashboard, created with `Progress.add_task`. Updating
+        a task only changes its counters; the dashboard displays them at its own refresh
+        rate, so tasks can be updated as often as needed, from any thread. Tasks of a
+        dashboard created with `processes=True` can also be passed to worker processes.
+
+        Args:
+            progress (Progress): The dashboard tracking the task.
+            task_id (int): The identifier of the task in the dashboard.
+            description (str): The description displayed for the task.
+            total (Optional[float]): The amount of work of the task, if known.
+        """
+        self.task_id = task_id
+        self.description = description
+        self.total = total
+        self.completed = 0.0
+        self._progress = progress
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the completed work reached the total."""
+        return self.total is not None and self.completed >= self.total
+
+    def advance(self, amount: float = 1):
+        """
+        Add completed work to the task.
+
+        Args:
+            amount (float): The amount of work completed.
+        """
+        with self._lock:
+            self.completed += amount
+
+    def update(
+        self,
+        completed: Optional[float] = None,
+        total: Optional[float] = None,
+        description: Optional[str] = None,
+    ):
+        """
+        Set the counters or description of the task.
+
+        Args:
+            completed (Optional[float]): The amount of work completed.
+            total (Optional[float]): The amount of work of the task.
+            description (Optional[str]): The description displayed for the task.
+        """
+        with self._lock:
+            if completed is not None:
+                self.completed = completed
+            if total is not None:
+                self.total = total
+            if description is not None:
+                self.description = description
+
+    def __reduce__(self):
+        queue = self._progress._queue
+        if queue is None:
+            raise TypeError(
+                "Progress tasks can only be passed to other processes from a "
+                + "Progress created with processes=True."
+            )
+        return _RemoteProgressTask, (self.task_id, queue)
+
+
+def _flush_remote(task_id: int, queue: Any, state: List[float], lock: threading.Lock):
+    with lock:
+        pending, state[0], state[1] = state[0], 0.0, time.monotonic()
+    if pending:
+        queue.put((task_id, "advance", pending))
+
+
+class _RemoteProgressTask:
+    """
+    A progress task unpickled in a worker process, sending its updates to the dashboard.
+
+    Advances are added up locally and sent at most every `_REMOTE_FLUSH_INTERVAL`
+    seconds, and when the task is garbage collected or the worker process exits.
+    """
+
+    def __init__(self, task_id: int, queue: Any):
+        from multiprocessing.util import Finalize
+
+        self.task_id = task_id
+        self._queue = queue
+        # The advances not sent yet, and when advances were last sent.
+        self._state = [0.0, time.monotonic()]
+        self._lock = threading.Lock()
+        Finalize(self, _flush_remote, (task_id, queue, self._state, self._lock), exitpriority=10)
+
+    def advance(self, amount: float = 1):
+        with self._lock:
+            self._state[0] += amount
+        if time.monotonic() - self._state[1] >= _REMOTE_FLUSH_INTERVAL:
+            self.flush()
+
+    def update(
+        self,
+        completed: Optional[float] = None,
+        total: Optional[float] = None,
+        description: Optional[str] = None,
+    ):
+        self.flush()
+        self._queue.put((self.task_id, "update", (completed, total, description)))
+
+    def flush(self):
+        """Send the advances not sent yet to the dashboard."""
+        _flush_remote(self.task_id, self._queue, self._state, self._lock)
+
+    def __reduce__(self):
+        return _RemoteProgressTask, (self.task_id, self._queue)
+
+
+class Progress:
+    def __init__(
+        self,
+        console: "Console",
+        refresh_per_second: float = 10,
+        plain_interval: float = 5.0,
+        processes: bool = False,
+    ):
+        """
+        Initialize a Progress object.
+
+        A dashboard of progress bars for long-running tasks, created with
+        `Console.progress`. The dashboard is redrawn by a background thread at most
+        `refresh_per_second` times per second, however often tasks are updated. When the
+        console output is not a terminal, a plain line per changed task is written every
+        `plain_interval` seconds instead, and a last line when the dashboard stops. With a
+        structured output format, those lines are written as "progress" records.
+
+        Args:
+            console (Console): The console displaying the dashboard.
+            refresh_per_second (float): The maximum number of redraws per second.
+            plain_interval (float): The seconds between plain progress lines.
+            processes (bool): Whether tasks can be passed to and updated from worker
+                processes. Starts a `multiprocessing` manager process relaying updates.
+        """
+        self.console = console
+        self.refresh_per_second = refresh_per_second
+        self.plain_interval = plain_interval
+        self.tasks: List[ProgressTask] = []
+        self._processes = processes
+        self._manager = None
+        self._queue = None
+        self._plain = True
+        self._structured = False
+        self._rich_progress = None
+        self._rich_ids: Dict[int, Any] = {}
+        self._reported: Dict[int, tuple] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add_task(self, description: str, total: Optional[float] = None) -> ProgressTask:
+        """
+        Add a task to the dashboard.
+
+        Args:
+            description (str): The description displayed for the task.
+            total (Optional[float]): The amount of work of the task, if known.
+
+        Returns:
+            ProgressTask: The task, to update as work completes.
+        """
+        with self._lock:
+            task = ProgressTask(self, len(self.tasks), description, total)
+            self.tasks.append(task)
+        return task
+
+    def start(self):
+        """Start displaying the dashboard."""
+        if self._thread is not None:
+            return
+        if self._processes:
+            import multiprocessing
+
+            self._manager = multiprocessing.Manager()
+            self._queue = self._manager.Queue()
+        self._structured = self.console._output_format() != "text"
+        self._plain = self._structured or self.console._is_plain_output()
+        if not self._plain:
+            self._rich_progress = self._create_rich_progress()
+            self._rich_progress.start()
+        self._stopped.clear()
+        # The thread runs in a copy of the current context, to keep the output format.
+        self._thread = threading.Thread(
+            target=copy_context().run, args=(self._refresh_loop,), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the dashboard after displaying the latest progress of every task."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self._refresh()
+        if self._rich_progress is not None:
+            self._rich_progress.stop()
+            self._rich_progress = None
+            self._rich_ids = {}
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._queue = None
+
+    def __enter__(self) -> "Progress":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.stop()
+
+    def _create_rich_progress(self):
+        from rich.progress import (
+            BarColumn,
+            MofNCompleteColumn,
+            Progress as RichProgress,
+            TaskProgressColumn,
+            TextColumn,
+            TimeRemainingColumn,
+        )
+
+        return RichProgress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            MofNCompleteColumn(),
+            TimeRemainingColumn(),
+            console=self.console._console,
+            auto_refresh=False,
+        )
+
+    def _refresh_loop(self):
+        interval = self.plain_interval if self._plain else 1 / self.refresh_per_second
+        while not self._stopped.wait(interval):
+            self._refresh()
+
+    def _drain_queue(self):
+        """Apply the updates sent by tasks in worker processes."""
+        if self._queue is None:
+            return
+        import queue
+
+        while True:
+            try:
+                task_id, kind, value = self._queue.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                return
+            task = self.tasks[task_id]
+            if kind == "advance":
+                task.advance(value)
+            else:
+                task.update(*value)
+
+    def _refresh(self):
+        self._drain_queue()
+        if self._plain:
+            self._write_plain_lines()
+            return
+        progress = self._rich_progress
+        for task in list(self.tasks):
+            if task.task_id not in self._rich_ids:
+                self._rich_ids[task.task_id] = progress.add_task(task.description, total=None)
+            progress.update(
+                self._rich_ids[task.task_id],
+                completed=task.completed,
+                total=task.total,
+                description=task.description,
+            )
+        progress.refresh()
+
+    def _write_plain_lines(self):
+        lines = []
+        for task in list(self.tasks):
+            state = (task.description, task.completed, task.total)
+            if self._reported.get(task.task_id) == state:
+                continue
+            self._reported[task.task_id] = state
+            lines.append(_plain_line(*state))
+        if not lines:
+            return
+        if self._structured:
+            text = "".join(self.console._format_record("progress", line) for line in lines)
+        else:
+            text = "".join(line + "\n" for line in lines)
+        self.console.write_rendered(text)
+
+
+def _plain_line(description: str, completed: float, total: Optional[float]) -> str:
+    amount = f"{completed:g}"
+    if total:
+        amount += f"/{total:g} ({completed / total:.0%})"
+    return f"{description}: {amount}"
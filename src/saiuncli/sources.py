@@ -0,0 +1,137 @@
+import os
+import sys
+import mmap
+from typing import Any, Callable, Iterator, List, Optional
+
+from saiuncli.exceptions import ParseError
+
+__all__ = ["ValueSource"]
+
+_CHUNK_SIZE = 1 << 16
+# Files at least this large are memory-mapped instead of read through a buffer.
+_MMAP_THRESHOLD = 1 << 20
+
+
+def _chunked_lines(read: Callable[[int], bytes]) -> Iterator[bytes]:
+    """Split a binary stream into lines, holding at most one chunk in memory."""
+    pending = b""
+    while True:
+        chunk = read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _file_lines(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < _MMAP_THRESHOLD:
+            yield from _chunked_lines(file.read)
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b""):
+                yield line.rstrip(b"\n")
+
+
+def _stdin_lines() -> Iterator[bytes]:
+    buffer = getattr(sys.stdin, "buffer", None)
+    if buffer is not None:
+        yield from _chunked_lines(getattr(buffer, "read1", buffer.read))
+        return
+    for line in sys.stdin:
+        yield line.rstrip("\n").encode("utf-8")
+
+
+def args_file_tokens(path: str) -> Iterator[str]:
+    """
+    Read the command line arguments of an arguments file, one argument per line.
+
+    The file is read lazily as the arguments are consumed. Blank lines are skipped.
+
+    Args:
+        path (str): The path of the arguments file.
+
+    Raises:
+        ParseError: If the file cannot be read.
+    """
+    try:
+        for line in _file_lines(path):
+            line = line.rstrip(b"\r")
+            if line:
+                yield line.decode("utf-8")
+    except OSError as e:
+        raise ParseError(f"Cannot read arguments file '{path}': {e.strerror}") from e
+
+
+class ValueSource:
+    def __init__(
+        self,
+        source: str,
+        type: Optional[Callable[[str], Any]] = str,
+        choices: Optional[List[Any]] = None,
+        name: Optional[str] = None,
+    ):
+        """
+        Initialize a ValueSource object.
+
+        The values of an `Option` or `Argument` created with `stream=True`. Iterating it
+        reads the values one line at a time, so memory stays flat however many values the
+        source holds. Blank lines are skipped.
+
+        Args:
+            source (str):
+                "-" to read values from stdin, "@path" to read them from a file, or a single
+                literal value.
+            type (Optional[Callable[[str], Any]]):
+                The type every value is converted to.
+            choices (Optional[List[Any]]):
+                The choices every value must be one of.
+            name (Optional[str]):
+                The name of the option or argument, used in error messages.
+        """
+        self.source = source
+        self.type = type or str
+        self.choices = choices
+        self.name = name
+
+    @property
+    def is_stdin(self) -> bool:
+        """Whether the values are read from stdin."""
+        return self.source == "-"
+
+    @property
+    def path(self) -> Optional[str]:
+        """The path of the file the values are read from, if any."""
+        if self.source.startswith("@") and len(self.source) > 1:
+            return self.source[1:]
+        return None
+
+    def _raw_values(self) -> Iterator[str]:
+        if self.is_stdin:
+            lines = _stdin_lines()
+        elif self.path is not None:
+            lines = _file_lines(self.path)
+        else:
+            yield self.source
+            return
+        try:
+            for line in lines:
+                line = line.rstrip(b"\r")
+                if line.strip():
+                    yield line.decode("utf-8")
+        except OSError as e:
+            raise ValueError(f"Cannot read values from '{self.source}': {e.strerror}") from e
+
+    def __iter__(self) -> Iterator[Any]:
+        for raw in self._raw_values():
+            value = self.type(raw)
+            if self.choices and value not in self.choices:
+                raise ValueError(f"Invalid choice '{raw}' for '{self.name or self.source}'")
+            yield value
+
+    def __repr__(self) -> str:
+        return f"<ValueSource({self.source!r})>"
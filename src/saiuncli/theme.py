@@ -1,32 +1,86 @@
-from typing import Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
-from rich.style import Style
+if TYPE_CHECKING:
+    from rich.style import Style
 
 __all__ = ["Theme", "Style", "PrefixStyle"]
 
 
-@dataclass
+def __getattr__(name: str):
+    # `rich` is only imported once something is rendered, `Style` is re-exported lazily.
+    if name == "Style":
+        from rich.style import Style
+
+        return Style
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class PrefixStyle:
-    symbol: str
-    style: str
+    # A plain class rather than a dataclass, since `dataclasses` imports `inspect`.
+    __hash__ = None
+
+    def __init__(self, symbol: str, style: str):
+        self.symbol = symbol
+        self.style = style
+
+    def __repr__(self):
+        return f"{type(self).__name__}(symbol={self.symbol!r}, style={self.style!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return (self.symbol, self.style) == (other.symbol, other.style)
+
+
+# Style definitions are kept as strings so `rich` is not imported until rendering.
+_DEFAULT_STYLE_SPECS = {
+    "version": "bold italic magenta",
+    "title": "bold white",
+    "title_description": "dim white",
+    "usage": "bold white",
+    "option_long": "bold cyan",
+    "option_short": "bold green",
+    "option_description": "white",
+    "subcommand": "bold cyan",
+    "subcommand_description": "white",
+    "argument": "bold cyan",
+    "argument_description": "white",
+}
+
+
+class _DefaultStyles:
+    """The default styles of `Theme`, as `rich` Style objects parsed when first read."""
+
+    def __init__(self):
+        self.styles: Optional[Dict[str, Union[str, "Style"]]] = None
+
+    def __get__(self, instance: Any, owner: type) -> Dict[str, Union[str, "Style"]]:
+        if self.styles is None:
+            from rich.style import Style
+
+            self.styles = {name: Style.parse(spec) for name, spec in _DEFAULT_STYLE_SPECS.items()}
+        return self.styles
+
+
+def _style_property(name: str) -> property:
+    def get(self) -> "Style":
+        value = self._styles[name]
+        if isinstance(value, str):
+            from rich.style import Style
+
+            # `Style.parse` caches parsed styles, so reading an attribute stays cheap.
+            return Style.parse(value)
+        return value
+
+    def set(self, value: Union[str, "Style"]):
+        self._styles[name] = value
+
+    return property(get, set, doc=f"The `rich` Style of the {name.replace('_', ' ')} text.")
 
 
 class Theme:
 
-    DEFAULT_STYLES = {
-        "version": Style(color="magenta", bold=True, italic=True),
-        "title": Style(color="white", bold=True),
-        "title_description": Style(color="white", dim=True),
-        "usage": Style(color="white", bold=True),
-        "option_long": Style(color="cyan", bold=True),
-        "option_short": Style(color="green", bold=True),
-        "option_description": Style(color="white"),
-        "subcommand": Style(color="cyan", bold=True),
-        "subcommand_description": Style(color="white"),
-        "argument": Style(color="cyan", bold=True),
-        "argument_description": Style(color="white"),
-    }
+    DEFAULT_STYLES = _DefaultStyles()
 
     DEFAULT_PREFIXES = {
         "success": PrefixStyle("✔", "bold green"),
@@ -35,19 +89,31 @@ class Theme:
         "info": PrefixStyle("ℹ", "bold blue"),
     }
 
+    version = _style_property("version")
+    title = _style_property("title")
+    title_description = _style_property("title_description")
+    usage = _style_property("usage")
+    option_long = _style_property("option_long")
+    option_short = _style_property("option_short")
+    option_description = _style_property("option_description")
+    subcommand = _style_property("subcommand")
+    subcommand_description = _style_property("subcommand_description")
+    argument = _style_property("argument")
+    argument_description = _style_property("argument_description")
+
     def __init__(
         self,
-        version: Optional[Style] = None,
-        title: Optional[Style] = None,
-        title_description: Optional[Style] = None,
-        usage: Optional[Style] = None,
-        option_long: Optional[Style] = None,
-        option_short: Optional[Style] = None,
-        option_description: Optional[Style] = None,
-        subcommand: Optional[Style] = None,
-        subcommand_description: Optional[Style] = None,
-        argument: Optional[Style] = None,
-        argument_description: Optional[Style] = None,
+        version: Optional[Union[str, "Style"]] = None,
+        title: Optional[Union[str, "Style"]] = None,
+        title_description: Optional[Union[str, "Style"]] = None,
+        usage: Optional[Union[str, "Style"]] = None,
+        option_long: Optional[Union[str, "Style"]] = None,
+        option_short: Optional[Union[str, "Style"]] = None,
+        option_description: Optional[Union[str, "Style"]] = None,
+        subcommand: Optional[Union[str, "Style"]] = None,
+        subcommand_description: Optional[Union[str, "Style"]] = None,
+        argument: Optional[Union[str, "Style"]] = None,
+        argument_description: Optional[Union[str, "Style"]] = None,
         success_prefix: Optional[PrefixStyle] = None,
         error_prefix: Optional[PrefixStyle] = None,
         warning_prefix: Optional[PrefixStyle] = None,
@@ -56,40 +122,56 @@ class Theme:
         """
         Initialize a Theme object with custom styles and prefixes.
 
+        Styles can be given as style strings or `rich` Style objects, and are read back as
+        Style objects, e.g. `theme.title.bold`. They are only parsed when read, so creating
+        a theme does not import `rich`.
+
         Args:
-            version (Optional[Style]): Style for the version text.
-            title (Optional[Style]): Style for the title text.
-            title_description (Optional[Style]): Style for the title description text.
-            usage (Optional[Style]): Style for the usage text.
-            option_long (Optional[Style]): Style for long option flags.
-            option_short (Optional[Style]): Style for short option flags.
-            option_description (Optional[Style]): Style for option descriptions.
-            subcommand (Optional[Style]): Style for subcommand names.
-            subcommand_description (Optional[Style]): Style for subcommand descriptions.
-            argument (Optional[Style]): Style for argument names.
-            argument_description (Optional[Style]): Style for argument descriptions.
+            version (Optional[Union[str, Style]]): Style for the version text.
+            title (Optional[Union[str, Style]]): Style for the title text.
+            title_description (Optional[Union[str, Style]]): Style for the title description text.
+            usage (Optional[Union[str, Style]]): Style for the usage text.
+            option_long (Optional[Union[str, Style]]): Style for long option flags.
+            option_short (Optional[Union[str, Style]]): Style for short option flags.
+            option_description (Optional[Union[str, Style]]): Style for option descriptions.
+            subcommand (Optional[Union[str, Style]]): Style for subcommand names.
+            subcommand_description (Optional[Union[str, Style]]): Style for subcommand descriptions.
+            argument (Optional[Union[str, Style]]): Style for argument names.
+            argument_description (Optional[Union[str, Style]]): Style for argument descriptions.
             success_prefix (Optional[PrefixStyle]): Prefix style for success messages.
             error_prefix (Optional[PrefixStyle]): Prefix style for error messages.
             warning_prefix (Optional[PrefixStyle]): Prefix style for warning messages.
             info_prefix (Optional[PrefixStyle]): Prefix style for info messages.
         """
 
-        self.version = version or self.DEFAULT_STYLES["version"]
-        self.title = title or self.DEFAULT_STYLES["title"]
-        self.title_description = title_description or self.DEFAULT_STYLES["title_description"]
-        self.usage = usage or self.DEFAULT_STYLES["usage"]
-        self.option_long = option_long or self.DEFAULT_STYLES["option_long"]
-        self.option_short = option_short or self.DEFAULT_STYLES["option_short"]
-        self.option_description = option_description or self.DEFAULT_STYLES["option_description"]
-        self.subcommand = subcommand or self.DEFAULT_STYLES["subcommand"]
-        self.subcommand_description = (
-            subcommand_description or self.DEFAULT_STYLES["subcommand_description"]
-        )
-        self.argument = argument or self.DEFAULT_STYLES["argument"]
-        self.argument_description = (
-            argument_description or self.DEFAULT_STYLES["argument_description"]
+        # Styles are stored as given, and only parsed into `rich` Style objects when read.
+        defaults = self._default_styles()
+        given = dict(
+            version=version,
+            title=title,
+            title_description=title_description,
+            usage=usage,
+            option_long=option_long,
+            option_short=option_short,
+            option_description=option_description,
+            subcommand=subcommand,
+            subcommand_description=subcommand_description,
+            argument=argument,
+            argument_description=argument_description,
         )
+        self._styles = {name: value or defaults[name] for name, value in given.items()}
         self.success_prefix = success_prefix or self.DEFAULT_PREFIXES["success"]
         self.error_prefix = error_prefix or self.DEFAULT_PREFIXES["error"]
         self.warning_prefix = warning_prefix or self.DEFAULT_PREFIXES["warning"]
         self.info_prefix = info_prefix or self.DEFAULT_PREFIXES["info"]
+
+    @classmethod
+    def _default_styles(cls) -> Dict[str, Union[str, "Style"]]:
+        """Get the default styles without importing `rich` unless they were read before."""
+        for klass in cls.__mro__:
+            if "DEFAULT_STYLES" in vars(klass):
+                defaults = vars(klass)["DEFAULT_STYLES"]
+                break
+        if isinstance(defaults, _DefaultStyles):
+            return defaults.styles or _DEFAULT_STYLE_SPECS
+        return defaults
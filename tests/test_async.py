@@ -0,0 +1,96 @@
+import asyncio
+import functools
+
+import pytest
+
+from saiuncli.cli import CLI, _is_coroutine_function
+from saiuncli.argument import Argument
+from saiuncli.command import Command
+from saiuncli.exceptions import HandlerError
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def cli(calls):
+    async def setup():
+        calls.append("setup")
+
+    def teardown():
+        calls.append("teardown")
+
+    async def fetch(url: str):
+        await asyncio.sleep(0)
+        calls.append(("fetch", url, asyncio.get_running_loop()))
+        return url.upper()
+
+    async def fail():
+        raise RuntimeError("unreachable")
+
+    return CLI(
+        title="Test CLI",
+        subcommands=[
+            Command(
+                name="fetch",
+                handler=fetch,
+                setup=setup,
+                teardown=teardown,
+                arguments=[Argument(name="url")],
+            ),
+            Command(name="fail", handler=fail, teardown=teardown),
+        ],
+    )
+
+
+def test_coroutine_handler_runs_on_managed_loop(cli: CLI, calls):
+    assert cli.invoke(["fetch", "a"]) == "A"
+    assert cli.invoke(["fetch", "b"]) == "B"
+
+    assert [call if isinstance(call, str) else call[:2] for call in calls] == [
+        "setup",
+        ("fetch", "a"),
+        "teardown",
+        "setup",
+        ("fetch", "b"),
+        "teardown",
+    ]
+    assert calls[1][2] is calls[4][2]
+    cli.close()
+    assert calls[1][2].is_closed()
+
+
+def test_teardown_runs_when_handler_fails(cli: CLI, calls):
+    with pytest.raises(HandlerError, match="unreachable"):
+        cli.invoke(["fail"])
+
+    assert calls == ["teardown"]
+
+
+def test_ainvoke_inside_running_loop(cli: CLI, calls):
+    async def main():
+        result = await cli.ainvoke(["fetch", "c"])
+        return result, asyncio.get_running_loop()
+
+    result, loop = asyncio.run(main())
+
+    assert result == "C"
+    assert calls[1][2] is loop
+
+
+def test_coroutine_detection_without_inspect():
+    async def handler():
+        pass
+
+    class Client:
+        async def fetch(self):
+            pass
+
+    assert _is_coroutine_function(handler)
+    assert _is_coroutine_function(Client().fetch)
+    assert _is_coroutine_function(functools.partial(handler))
+    assert not _is_coroutine_function(print)
+    assert not _is_coroutine_function(lambda: None)
+    assert not _is_coroutine_function(None)
@@ -0,0 +1,105 @@
+import io
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from saiuncli.cli import CLI, BatchResult
+from saiuncli.command import Command
+from saiuncli.exceptions import ParseError
+from saiuncli.option import Option
+
+BATCH = """
+# Greet everyone
+greet --name Alice
+greet --name 'Bob Smith' -c 2
+
+greet --count 3
+fail
+"""
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def cli(calls):
+    lock = threading.Lock()
+
+    def greet(name: str, count: int = 1):
+        with lock:
+            calls.append((name, count))
+
+    def fail():
+        raise RuntimeError("boom")
+
+    return CLI(
+        title="Test CLI",
+        batch_flags=["--batch"],
+        subcommands=[
+            Command(
+                name="greet",
+                handler=greet,
+                options=[
+                    Option(flags=["-n", "--name"], required=True),
+                    Option(flags=["-c", "--count"], type=int),
+                ],
+            ),
+            Command(name="fail", handler=fail),
+        ],
+    )
+
+
+def test_run_batch_reports_each_line(cli: CLI, calls, capsys):
+    results = cli.run_batch(BATCH.splitlines())
+
+    assert calls == [("Alice", 1), ("Bob Smith", 2)]
+    assert results == [
+        BatchResult(3, ["greet", "--name", "Alice"], 0),
+        BatchResult(4, ["greet", "--name", "Bob Smith", "-c", "2"], 0),
+        BatchResult(6, ["greet", "--count", "3"], 1, "Missing required options: name"),
+        BatchResult(7, ["fail"], 1, "boom"),
+    ]
+    output = capsys.readouterr().out
+    assert "Line 6: Missing required options: name" in output
+    assert "Line 7: boom" in output
+
+
+def test_run_batch_in_parallel_keeps_line_order(cli: CLI, calls):
+    lines = [f"greet --name user{index}" for index in range(50)]
+
+    results = cli.run_batch(lines, workers=4)
+
+    assert [result.line_number for result in results] == list(range(1, 51))
+    assert all(result.exit_code == 0 for result in results)
+    assert sorted(calls) == sorted((f"user{index}", 1) for index in range(50))
+
+
+def test_batch_flag_reads_stdin(cli: CLI, calls):
+    parsed_cli = cli.parse(["--batch"])
+    assert parsed_cli.batch == "-"
+
+    with patch("sys.stdin", io.StringIO(BATCH)), pytest.raises(SystemExit) as exc_info:
+        cli.run(argv=["--batch", "-"])
+
+    assert exc_info.value.code == 1
+    assert calls == [("Alice", 1), ("Bob Smith", 2)]
+
+
+def test_batch_flag_reads_file(cli: CLI, calls, tmp_path):
+    batch_file = tmp_path / "commands.txt"
+    batch_file.write_text("greet -n Alice\ngreet -n Bob\n")
+
+    cli.run(argv=["--batch", str(batch_file)])
+
+    assert calls == [("Alice", 1), ("Bob", 1)]
+
+
+def test_batch_cannot_be_invoked_or_nested(cli: CLI, capsys):
+    with pytest.raises(ParseError):
+        cli.invoke(["--batch", "commands.txt"])
+
+    results = cli.run_batch(["--batch commands.txt"])
+    assert results[0].exit_code == 1
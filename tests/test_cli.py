@@ -1,7 +1,11 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from unittest.mock import patch
 
 from saiuncli.cli import CLI
+from saiuncli.option import Option
 
 from .data import dummy_handler, PARSE_CLI_HAPPY_CASE_TESTS, PARSE_CLI_NEGATIVE_CASE_TESTS
 
@@ -81,3 +85,77 @@ def test_parse_command_negative_cases(mock_argv, test_case, auracli: CLI):
 
     with pytest.raises(SystemExit):
         auracli.run()
+
+
+@patch("sys.argv", new_callable=list)
+def test_parse_long_argv(mock_argv, auracli: CLI):
+    auracli.add_options(
+        [
+            Option(flags=["-f", "--files"], nargs="*"),
+            Option(flags=["-i", "--include"], action="extend", nargs="*"),
+            Option(flags=["-v"], action="store_true"),
+            Option(flags=["-q"], action="store_true"),
+        ]
+    )
+    files = [f"file_{i}" for i in range(100_000)]
+    mock_argv.extend(["root", "-vq", "--files", *files, "--include", "a", "b"])
+
+    parsed_cli = auracli.parse_cli()
+
+    assert parsed_cli.files == files
+    assert parsed_cli.include == ["a", "b"]
+    assert parsed_cli.v is True
+    assert parsed_cli.q is True
+
+
+def test_display_help_cached_until_tree_changes(auracli: CLI, capsys):
+    with patch.object(
+        auracli.console, "render_help", wraps=auracli.console.render_help
+    ) as mock_render_help:
+        auracli.display_help()
+        auracli.display_help()
+        assert mock_render_help.call_count == 1
+
+        auracli.add_option(Option(flags=["--name"], description="The name."))
+        auracli.display_help()
+        assert mock_render_help.call_count == 2
+
+    outputs = capsys.readouterr().out
+    assert outputs.count("My Super Cool CLI Tool") == 3
+    assert "--name" in outputs
+
+
+def test_display_help_persisted_to_help_cache(tmp_path, capsys):
+    help_cache = str(tmp_path / "help.json")
+    CLI(title="Cached CLI", handler=dummy_handler, help_cache=help_cache).display_help()
+    first_output = capsys.readouterr().out
+
+    cli = CLI(title="Cached CLI", handler=dummy_handler, help_cache=help_cache)
+    with patch.object(cli.console, "render_help") as mock_render_help:
+        cli.display_help()
+
+    mock_render_help.assert_not_called()
+    assert capsys.readouterr().out == first_output
+
+
+def test_display_help_cached_per_program_name(capsys):
+    cli = CLI(title="Named CLI", handler=dummy_handler)
+
+    cli.display_help(prog="alpha")
+    cli.display_help(prog="beta")
+    cli.display_help(prog="alpha")
+
+    usages = [line for line in capsys.readouterr().out.splitlines() if "Usage:" in line]
+    assert [usage.split()[1] for usage in usages] == ["alpha", "beta", "alpha"]
+
+
+def test_display_help_saved_from_threads(tmp_path, capsys):
+    help_cache = tmp_path / "help.json"
+    cli = CLI(title="Cached CLI", handler=dummy_handler, help_cache=str(help_cache))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda index: cli.display_help(prog=f"tool{index}"), range(8)))
+
+    entries = json.loads(help_cache.read_text())["entries"]
+    assert entries and set(entries) <= set(cli._rendered_help)
+    assert [path.name for path in tmp_path.iterdir()] == ["help.json"]
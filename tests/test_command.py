@@ -0,0 +1,237 @@
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import Mock, patch
+
+from saiuncli.argument import Argument
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli.exceptions import ParseError
+from saiuncli.option import Option
+
+from .data import dummy_handler
+
+
+def _build_cli():
+    child = Command(
+        name="child",
+        handler=dummy_handler,
+        inherit_options=True,
+        options=[Option(flags=["-c", "--child"])],
+    )
+    parent = Command(
+        name="parent",
+        handler=dummy_handler,
+        options=[Option(flags=["-p", "--parent"])],
+        subcommands=[child],
+    )
+    cli = CLI(
+        title="Test CLI",
+        handler=dummy_handler,
+        global_options=[Option(flags=["-g", "--global"], action="store_true")],
+        subcommands=[parent],
+    )
+    return cli, parent, child
+
+
+def test_flag_index_covers_inherited_and_global_options():
+    cli, parent, child = _build_cli()
+
+    assert set(child.flag_index) == {"-c", "--child", "-p", "--parent", "-g", "--global"}
+    assert child.flag_to_option("--parent") is parent.options[0]
+    assert child.flag_to_option("-g") is cli.global_options[0]
+    assert parent.flag_to_option("--child") is None
+
+
+def test_all_subcommand_names():
+    cli, parent, child = _build_cli()
+
+    assert cli.all_subcommand_names == ["parent", "child"]
+    assert child.all_subcommand_names == []
+
+
+def test_resolved_options_cached_until_tree_changes():
+    cli, parent, child = _build_cli()
+    grandchild = Command(name="grandchild", handler=dummy_handler, inherit_options=True)
+    child.add_subcommand(grandchild)
+
+    all_options = grandchild.all_options
+    assert grandchild.all_options is all_options
+    assert grandchild.all_option_flags == ("-c", "--child", "-p", "--parent")
+
+    cli.add_option(Option(flags=["-r", "--root"]))
+    assert grandchild.all_options is not all_options
+    assert grandchild.all_option_names == ("child", "parent", "root", "c", "p", "r")
+
+
+def test_flag_index_invalidated_on_tree_changes():
+    cli, parent, child = _build_cli()
+    assert child.flag_to_option("--new") is None
+
+    parent.add_option(Option(flags=["--new"]))
+    assert child.flag_to_option("--new") is parent.options[-1]
+
+    cli.add_global_option(Option(flags=["--everywhere"]))
+    assert child.flag_to_option("--everywhere") is cli.global_options[-1]
+
+    grandchild = Command(name="grandchild", handler=dummy_handler, inherit_options=True)
+    assert grandchild.flag_to_option("--child") is None
+    child.add_subcommand(grandchild)
+    assert grandchild.flag_to_option("--child") is child.options[0]
+
+
+LAZY_MODULE = """
+import time
+
+from saiuncli.command import Command
+from saiuncli.option import Option
+
+def handler(**kwargs):
+    pass
+
+factory_calls = []
+
+def make_deploy():
+    factory_calls.append(None)
+    time.sleep(0.05)
+    return Command(name="deploy", handler=handler)
+
+deploy = Command(
+    name="deploy",
+    handler=handler,
+    options=[Option(flags=["-e", "--env"])],
+)
+"""
+
+
+@pytest.fixture
+def lazy_module(tmp_path, monkeypatch):
+    module_name = "saiuncli_lazy_deploy"
+    (tmp_path / f"{module_name}.py").write_text(LAZY_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield module_name
+    sys.modules.pop(module_name, None)
+
+
+def test_lazy_command_imported_when_selected(lazy_module):
+    lazy = Command.lazy(f"{lazy_module}:deploy", name="deploy", description="Deploy.")
+    cli = CLI(title="Test CLI", handler=dummy_handler, subcommands=[lazy])
+
+    cli.compile()
+    assert lazy_module not in sys.modules
+    assert [subcommand.name for subcommand in cli.subcommands] == ["deploy"]
+
+    with patch("sys.argv", ["tool", "deploy", "--env", "prod"]):
+        parsed_cli = cli.parse_cli()
+
+    assert lazy_module in sys.modules
+    assert parsed_cli.commands == ["root", "deploy"]
+    assert parsed_cli.parsed_options == {"env": "prod"}
+    deploy = cli.find_subcommand("deploy")
+    assert deploy is sys.modules[lazy_module].deploy
+    assert deploy._parent is cli
+
+
+def test_lazy_command_loaded_once_across_threads(lazy_module):
+    lazy = Command.lazy(f"{lazy_module}:make_deploy", name="deploy")
+    cli = CLI(title="Test CLI", handler=dummy_handler, subcommands=[lazy])
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        loaded = list(executor.map(lambda _: lazy.load(), range(4)))
+
+    assert len(sys.modules[lazy_module].factory_calls) == 1
+    assert all(command is loaded[0] for command in loaded)
+    assert loaded[0]._parent is cli
+
+
+def test_lazy_command_invalid_target():
+    with pytest.raises(ValueError):
+        Command.lazy("no_attribute", name="deploy")
+
+
+def _tree_with_aliases():
+    return CLI(
+        title="Test CLI",
+        handler=dummy_handler,
+        allow_abbrev=True,
+        subcommands=[
+            Command(
+                name="deploy",
+                handler=dummy_handler,
+                aliases=["ship"],
+                subcommands=[Command(name="status", handler=dummy_handler)],
+            ),
+            Command(name="destroy", handler=dummy_handler),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "argv, commands",
+    [
+        (["deploy"], ["root", "deploy"]),
+        (["ship", "status"], ["root", "deploy", "status"]),
+        (["dep", "st"], ["root", "deploy", "status"]),
+        (["sh"], ["root", "deploy"]),
+        (["destr"], ["root", "destroy"]),
+    ],
+)
+def test_subcommands_selected_by_alias_or_prefix(argv, commands):
+    assert _tree_with_aliases().parse(argv).commands == commands
+
+
+def test_ambiguous_subcommand_prefix():
+    with pytest.raises(ParseError, match="Ambiguous command 'de', could be: deploy, destroy"):
+        _tree_with_aliases().parse(["de"])
+
+
+def test_duplicate_subcommand_alias():
+    cli = _tree_with_aliases()
+    cli.add_subcommand(Command(name="ship", handler=dummy_handler))
+
+    with pytest.raises(ValueError):
+        cli.compile()
+
+
+def test_nested_subcommand_handler_executed():
+    status = Mock()
+    cli = _tree_with_aliases()
+    cli.find_subcommand("ship").add_subcommand(Command(name="logs", handler=status))
+
+    cli.invoke(["deploy", "logs"])
+
+    status.assert_called_once_with()
+
+
+def test_option_names_resolved_from_flags():
+    option = Option(flags=["-d", "--dry-run"])
+
+    assert option.flags == ("-d", "--dry-run")
+    assert (option.long_flag, option.short_flag) == ("--dry-run", "-d")
+    assert (option.long_name, option.short_name) == ("dry_run", "d")
+    assert option.name == "dry_run"
+
+
+def test_option_flag_from_name():
+    option = Option(name="dry_run")
+
+    assert option.flags == ("--dry-run",)
+    assert option.name == "dry_run"
+    with pytest.raises(ValueError):
+        Option()
+
+
+def test_option_and_argument_are_immutable():
+    option = Option(flags=["--name"])
+    argument = Argument(name="path")
+
+    with pytest.raises(AttributeError):
+        option.flags = ("--other",)
+    with pytest.raises(AttributeError):
+        argument.name = "other"
+    assert not hasattr(option, "__dict__")
+
+    copied = pickle.loads(pickle.dumps(option))
+    assert (copied.flags, copied.long_name) == (option.flags, option.long_name)
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from saiuncli.argument import Argument
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli.completion import complete, completion_script, load_index, save_index
+from saiuncli.option import Option
+import saiuncli.completion
+
+from .data import dummy_handler
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    cli = CLI(
+        title="Test CLI",
+        handler=dummy_handler,
+        global_options=[Option(flags=["-v", "--verbose"], action="store_true")],
+        subcommands=[
+            Command(
+                name="deploy",
+                handler=dummy_handler,
+                options=[Option(flags=["-e", "--env"], choices=["dev", "prod"])],
+                arguments=[Argument(name="target", choices=["web", "worker"])],
+            ),
+            Command(name="destroy", handler=dummy_handler),
+        ],
+    )
+    path = str(tmp_path / "completion.index")
+    save_index(cli, path)
+    return path
+
+
+@pytest.mark.parametrize(
+    "words, expected",
+    [
+        ([""], ["deploy", "destroy"]),
+        (["de"], ["deploy", "destroy"]),
+        (["dep"], ["deploy"]),
+        (["deploy", "--"], ["--env", "--verbose", "--help", "--version"]),
+        (["deploy", "-e", ""], ["dev", "prod"]),
+        (["deploy", "--env", "p"], ["prod"]),
+        (["deploy", "-v", "w"], ["web", "worker"]),
+        (["deploy", "web", ""], []),
+    ],
+)
+def test_complete_from_index(index_path, words, expected):
+    assert complete(load_index(index_path), words) == expected
+
+
+def test_completion_endpoint_runs_standalone(index_path):
+    result = subprocess.run(
+        [sys.executable, "-I", "-S", saiuncli.completion.__file__, index_path, "--", "deploy", ""],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.splitlines() == ["web", "worker"]
+
+
+@pytest.mark.parametrize("shell", ["bash", "zsh", "fish"])
+def test_completion_script(shell, index_path):
+    script = completion_script(shell, "my-tool", index_path)
+
+    assert "my-tool" in script
+    assert "_saiuncli_my_tool" in script
+    assert index_path in script
+
+
+def test_completion_script_uses_absolute_index_path(index_path, monkeypatch):
+    directory, name = os.path.split(index_path)
+    monkeypatch.chdir(directory)
+
+    script = completion_script("bash", "my-tool", name)
+
+    assert f"'{os.path.join(os.getcwd(), name)}'" in script
+
+
+def test_completion_script_unsupported_shell(index_path):
+    with pytest.raises(ValueError):
+        completion_script("powershell", "my-tool", index_path)
@@ -0,0 +1,129 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from saiuncli.console import Console
+from saiuncli.option import Option
+from saiuncli.theme import Theme, PrefixStyle
+
+
+def test_prefixed_messages_plain_when_not_a_terminal(capsys, monkeypatch):
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    console = Console(theme=Theme(info_prefix=PrefixStyle("i", "bold blue")))
+
+    console.success("[bold]Deployed[/bold] \\[web]")
+    console.info("Done")
+
+    assert capsys.readouterr().out == "✔ Deployed [web]\ni Done\n"
+    assert console._rich_console is None
+
+
+def test_display_help_renders_tables(capsys):
+    console = Console()
+
+    console.display_help(
+        title="Test CLI",
+        usage="tool [OPTIONS]",
+        options=[Option(flags=["-n", "--name"], description="The name.")],
+        help_flags=["-h", "--help"],
+        version_flags=["-V", "--version"],
+    )
+
+    output = capsys.readouterr().out
+    assert "Usage: tool [OPTIONS]" in output
+    assert "--name" in output
+    assert "The name." in output
+
+
+def test_buffered_output_is_written_on_flush(capsys, monkeypatch):
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    console = Console(flush_interval=60)
+
+    with console.buffered():
+        console.success("One")
+        console.print("Two")
+        assert capsys.readouterr().out == ""
+        console.flush()
+        assert capsys.readouterr().out == "✔ One\nTwo\n"
+        console.info("Three")
+
+    assert capsys.readouterr().out == "ℹ Three\n"
+
+
+def test_buffered_output_is_flushed_by_size_and_interval(capsys, monkeypatch):
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    console = Console(buffered=True, buffer_size=10, flush_interval=0.01)
+
+    console.success("A longer line")
+    assert capsys.readouterr().out == "✔ A longer line\n"
+
+    console.success("Short")
+    assert capsys.readouterr().out == ""
+    console._flush_timer.join()
+    assert capsys.readouterr().out == "✔ Short\n"
+
+
+def test_prefixed_messages_without_markup_match_rich_rendering(capsys, monkeypatch):
+    monkeypatch.setenv("FORCE_COLOR", "1")
+    console = Console()
+
+    console.success("Done")
+    console.success("Done [bold]now[/bold]")
+    fast, rendered = capsys.readouterr().out.splitlines()
+
+    console.print("[bold green]✔[/bold green] Done")
+    assert fast == capsys.readouterr().out.rstrip("\n")
+    assert "now" in rendered and "[bold]" not in rendered
+
+
+def test_concurrent_threads_write_whole_lines(capsys, monkeypatch):
+    monkeypatch.setenv("FORCE_COLOR", "1")
+    console = Console()
+
+    def write(worker):
+        for index in range(200):
+            console.info(f"Worker {worker} line {index}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write, range(8)))
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1600
+    assert set(lines) == {
+        f"\x1b[1;34mℹ\x1b[0m Worker {worker} line {index}"
+        for worker in range(8)
+        for index in range(200)
+    }
+
+
+def _write_from_process(console, worker):
+    for index in range(50):
+        console.success(f"Worker {worker} line {index}")
+
+
+def test_shared_console_writes_output_of_worker_processes(capsys, monkeypatch):
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    console = Console()
+
+    with console.shared():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(_write_from_process, [console] * 4, range(4)))
+    console.info("Workers done")
+
+    lines = capsys.readouterr().out.splitlines()
+    assert sorted(lines[:-1]) == sorted(
+        f"✔ Worker {worker} line {index}" for worker in range(4) for index in range(50)
+    )
+    assert lines[-1] == "ℹ Workers done"
+    assert console._queue is None
+
+
+def test_theme_styles_are_read_as_rich_styles():
+    from rich.style import Style
+
+    theme = Theme(title="bold red", usage=Style(italic=True))
+
+    assert theme.title == Style(color="red", bold=True)
+    assert theme.title.bold
+    assert theme.usage == Style(italic=True)
+    assert theme.argument == Theme.DEFAULT_STYLES["argument"] == Style(color="cyan", bold=True)
+    theme.version = "underline"
+    assert theme.version.underline
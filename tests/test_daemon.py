@@ -0,0 +1,111 @@
+import os
+import socket
+import stat
+import sys
+import threading
+
+import pytest
+
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli import daemon
+from saiuncli.daemon import DaemonServer, forward
+from saiuncli.option import Option
+
+
+def _greet(name: str):
+    print(f"Hello, {name} from {os.getcwd()} as {os.environ.get('GREETER')}!")
+
+
+def _echo():
+    sys.stdout.write(sys.stdin.read().upper())
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    cli = CLI(
+        title="Test CLI",
+        subcommands=[
+            Command(
+                name="greet",
+                handler=_greet,
+                options=[Option(flags=["-n", "--name"], required=True)],
+            ),
+            Command(name="echo", handler=_echo),
+            Command(name="fail", handler=_fail),
+        ],
+    )
+    path = str(tmp_path / "cli.sock")
+    server = DaemonServer(cli, path)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_forward_runs_in_client_context(socket_path, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GREETER", "client")
+
+    assert forward(socket_path, ["greet", "--name", "Alice"]) == 0
+
+    assert capsys.readouterr().out == f"Hello, Alice from {tmp_path} as client!\n"
+
+
+def test_forward_streams_stdin(socket_path, monkeypatch, capsys):
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"hello daemon\n")
+    os.close(write_fd)
+    monkeypatch.setattr(sys, "stdin", os.fdopen(read_fd))
+
+    assert forward(socket_path, ["echo"]) == 0
+
+    assert capsys.readouterr().out == "HELLO DAEMON\n"
+
+
+def test_forward_returns_exit_status(socket_path, capsys):
+    assert forward(socket_path, ["fail"]) == 1
+    assert "boom" in capsys.readouterr().out
+
+    assert forward(socket_path, ["greet"]) == 1
+    assert "Missing required options: name" in capsys.readouterr().out
+
+    assert forward(socket_path, ["greet", "-n", "Bob"]) == 0
+
+
+def test_daemon_refuses_served_socket(socket_path):
+    with pytest.raises(OSError):
+        DaemonServer(CLI(title="Other CLI"), socket_path)
+
+
+def test_daemon_refuses_path_that_is_not_a_socket(tmp_path):
+    path = tmp_path / "cli.sock"
+    path.write_text("data")
+
+    with pytest.raises(FileExistsError):
+        DaemonServer(CLI(title="Other CLI"), str(path))
+    assert path.read_text() == "data"
+
+
+def test_daemon_only_serves_its_owner(socket_path, monkeypatch, capsys):
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    assert daemon._peer_uid(_connected(socket_path)) == os.getuid()
+
+    monkeypatch.setattr(daemon, "_peer_uid", lambda sock: os.getuid() + 1)
+
+    assert forward(socket_path, ["greet", "-n", "Mallory"]) == 1
+    output = capsys.readouterr()
+    assert "Mallory" not in output.out
+    assert "only serves the user running it" in output.err
+
+
+def _connected(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    return sock
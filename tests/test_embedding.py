@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli.exceptions import HandlerError, ParseError
+from saiuncli.option import Option
+
+
+def _greet(name: str, count: int = 1):
+    return " ".join([f"Hello, {name}!"] * count)
+
+
+def _fail(**kwargs):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def cli():
+    return CLI(
+        title="Test CLI",
+        subcommands=[
+            Command(
+                name="greet",
+                handler=_greet,
+                options=[
+                    Option(flags=["-n", "--name"], required=True),
+                    Option(flags=["-c", "--count"], type=int),
+                ],
+            ),
+            Command(name="fail", handler=_fail),
+        ],
+    )
+
+
+def test_parse_argv_without_sys_argv(cli: CLI):
+    parsed_cli = cli.parse(["greet", "--name", "Alice", "-c", "2"])
+
+    assert parsed_cli.commands == ["root", "greet"]
+    assert parsed_cli.parsed_options == {"name": "Alice", "count": 2}
+
+
+@pytest.mark.parametrize(
+    "argv, message",
+    [
+        (["greet", "--unknown"], "Invalid option '--unknown'"),
+        (["greet", "--name"], "Expected a value for '--name'"),
+        (["greet", "--count", "many"], "Invalid value for '--count'"),
+        (["greet", "extra"], "Invalid argument 'extra'"),
+    ],
+)
+def test_parse_raises_instead_of_exiting(cli: CLI, argv, message):
+    with pytest.raises(ParseError) as error:
+        cli.parse(argv, prog="tool")
+
+    assert error.value.message.startswith(message)
+    assert error.value.command is cli.find_subcommand("greet")
+    assert error.value.prog == "tool"
+
+
+@pytest.mark.parametrize(
+    "argv, message",
+    [
+        (["greet", "--nmae", "Alice"], "Invalid option '--nmae'. Did you mean '--name'?"),
+        (["gret"], "Invalid argument 'gret'. Did you mean 'greet'?"),
+        (["greet", "--zzz"], "Invalid option '--zzz'"),
+    ],
+)
+def test_parse_errors_suggest_close_names(cli: CLI, argv, message):
+    with pytest.raises(ParseError) as error:
+        cli.parse(argv)
+
+    assert error.value.message == message
+
+
+def test_invoke_returns_handler_result(cli: CLI):
+    assert cli.invoke(["greet", "-n", "Bob", "-c", "2"]) == "Hello, Bob! Hello, Bob!"
+
+    with pytest.raises(ParseError, match="Missing required options: name"):
+        cli.invoke(["greet"])
+
+    with pytest.raises(HandlerError, match="boom") as error:
+        cli.invoke(["fail"])
+    assert isinstance(error.value.__cause__, RuntimeError)
+
+
+def test_parse_from_many_threads(cli: CLI):
+    def parse(index: int):
+        return cli.parse(["greet", "--name", f"user{index}", "--count", str(index)])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parse, range(200)))
+
+    assert [result.parsed_options["count"] for result in results] == list(range(200))
+    assert results[7].parsed_options["name"] == "user7"
+
+
+@pytest.mark.parametrize(
+    "option, argv, expected",
+    [
+        (Option(flags=["--ids"], type=int, nargs="*"), ["--ids", "1", "2"], [1, 2]),
+        (Option(flags=["--ids"], type=int, nargs=2), ["--ids", "1", "2"], [1, 2]),
+        (
+            Option(flags=["--ids"], type=int, action="append", nargs=2),
+            ["--ids", "1", "2", "--ids", "3", "4"],
+            [1, 2, [3, 4]],
+        ),
+        (
+            Option(flags=["--ids"], type=int, action="extend", nargs="*"),
+            ["--ids", "1", "--ids", "2", "3"],
+            [1, 2, 3],
+        ),
+        (Option(flags=["--ids"], type=int, action="append"), ["--ids", "1", "--ids", "2"], [1, 2]),
+    ],
+)
+def test_parse_converts_multiple_values(option, argv, expected):
+    cli = CLI(title="Test CLI", options=[option])
+
+    assert cli.parse(argv).parsed_options["ids"] == expected
+
+
+@pytest.mark.parametrize(
+    "option, argv, message",
+    [
+        (
+            Option(flags=["--level"], type=int, nargs="*", choices=range(1, 4)),
+            ["--level", "1", "3", "5"],
+            "Invalid choice '5'",
+        ),
+        (
+            Option(flags=["--mode"], action="extend", nargs="*", choices=["a", "b"]),
+            ["--mode", "a", "c"],
+            "Invalid choice 'c'",
+        ),
+        (
+            Option(flags=["--ids"], type=int, action="append", nargs=2),
+            ["--ids", "1"],
+            "Expected '2' arguments for --ids",
+        ),
+    ],
+)
+def test_parse_rejects_invalid_multiple_values(option, argv, message):
+    cli = CLI(title="Test CLI", options=[option])
+
+    with pytest.raises(ParseError, match=message):
+        cli.parse(argv)
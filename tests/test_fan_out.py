@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+import pytest
+
+from saiuncli.argument import Argument
+from saiuncli.cli import CLI, FanOutResult
+from saiuncli.command import Command
+from saiuncli.option import Option
+
+
+def check(host: str, port: int = 22):
+    if host == "down":
+        raise ConnectionError(f"{host} is unreachable")
+    return f"{host}:{port}"
+
+
+def process_id(host: str):
+    return os.getpid()
+
+
+def _build_cli(handler=check, **fan_out_options):
+    return CLI(
+        title="Test CLI",
+        subcommands=[
+            Command(
+                name="check",
+                handler=handler,
+                options=[Option(flags=["-p", "--port"], type=int)],
+                arguments=[Argument(name="host", required=True)],
+                fan_out="host",
+                **fan_out_options,
+            )
+        ],
+    )
+
+
+def test_fan_out_calls_handler_per_value():
+    cli = _build_cli()
+
+    results = cli.invoke(["check", "a", "b", "-p", "2222", "c"])
+
+    assert results == [
+        FanOutResult("a", "a:2222"),
+        FanOutResult("b", "b:2222"),
+        FanOutResult("c", "c:2222"),
+    ]
+
+
+def test_fan_out_bounds_concurrency():
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow(host):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    cli = _build_cli(handler=slow, fan_out_workers=3)
+
+    results = cli.invoke(["check"] + [f"host{index}" for index in range(20)])
+
+    assert [result.value for result in results] == [f"host{index}" for index in range(20)]
+    assert peak[0] == 3
+
+
+def test_fan_out_as_completed():
+    def delayed(host):
+        time.sleep(float(host))
+        return host
+
+    cli = _build_cli(handler=delayed, fan_out_ordered=False)
+
+    results = cli.invoke(["check", "0.2", "0"])
+
+    assert [result.value for result in results] == ["0", "0.2"]
+
+
+def test_fan_out_with_processes():
+    cli = _build_cli(handler=process_id, fan_out_executor="process", fan_out_workers=2)
+
+    results = cli.invoke(["check", "a", "b"])
+
+    assert [result.error for result in results] == [None, None]
+    assert os.getpid() not in {result.result for result in results}
+
+
+def test_fan_out_reports_failures(capsys):
+    cli = _build_cli()
+
+    with pytest.raises(SystemExit) as exit_info:
+        cli.run(argv=["check", "up", "down"])
+
+    assert exit_info.value.code == 1
+    output = capsys.readouterr().out
+    assert "down: down is unreachable" in output
+    assert "1 of 2 targets failed." in output
+
+
+def test_fan_out_argument_must_be_last():
+    cli = CLI(
+        title="Test CLI",
+        subcommands=[
+            Command(
+                name="copy",
+                handler=check,
+                arguments=[Argument(name="sources"), Argument(name="target")],
+                fan_out="sources",
+            )
+        ],
+    )
+
+    with pytest.raises(ValueError, match="must be the last argument"):
+        cli.compile()
+
+
+def test_fan_out_awaits_coroutine_handlers_on_managed_loop():
+    import asyncio
+
+    loops, running, peak = set(), [0], [0]
+
+    async def fetch(host):
+        loops.add(asyncio.get_running_loop())
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        if host == "down":
+            raise ConnectionError("unreachable")
+        return host.upper()
+
+    cli = _build_cli(fetch, fan_out_workers=2)
+
+    results = cli.invoke(["check", "a", "down", "c", "d"])
+
+    assert results == [
+        FanOutResult("a", "A"),
+        FanOutResult("down", error="unreachable"),
+        FanOutResult("c", "C"),
+        FanOutResult("d", "D"),
+    ]
+    assert loops == {cli._event_loop}
+    assert peak[0] == 2
+    cli.close()
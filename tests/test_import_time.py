@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+import pytest
+
+# Importing the CLI framework may cost at most this many times the imports the interpreter does at
+# startup (`site`, `encodings`, ...), measured in the same `python -X importtime` run. Comparing
+# against startup keeps the budget independent of how fast, or how loaded, the machine is.
+IMPORT_TIME_BUDGET_FACTOR = 14
+
+# Standard library modules that are only needed by optional features and must be imported lazily.
+LAZY_STDLIB_MODULES = ["concurrent.futures", "dataclasses", "inspect", "multiprocessing", "shlex"]
+
+
+def _import_times(module: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = (int(cumulative), not name.startswith("  "))
+    return times
+
+
+@pytest.mark.parametrize("module", ["saiuncli.cli", "saiuncli.console", "saiuncli.theme"])
+def test_import_does_not_load_rich(module):
+    imported = _import_times(module)
+
+    assert module in imported
+    assert not [name for name in imported if name == "rich" or name.startswith("rich.")]
+
+
+def test_import_does_not_load_optional_stdlib_modules():
+    imported = _import_times("saiuncli.cli")
+
+    assert not [name for name in LAZY_STDLIB_MODULES if name in imported]
+
+
+def test_import_time_budget():
+    def ratio():
+        times = _import_times("saiuncli.cli")
+        startup = sum(
+            cumulative
+            for name, (cumulative, top_level) in times.items()
+            if top_level and name != "saiuncli.cli"
+        )
+        return times["saiuncli.cli"][0] / startup
+
+    # The first import may compile bytecode, only warm imports are measured.
+    assert min(ratio() for _ in range(3)) < IMPORT_TIME_BUDGET_FACTOR
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli.exceptions import HandlerError
+from saiuncli.middleware import Middleware
+from saiuncli.option import Option
+
+
+class Recorder(Middleware):
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+
+    def before_parse(self, argv):
+        self.events.append((self.name, "before_parse"))
+        return argv
+
+    def after_parse(self, parsed_cli, command):
+        self.events.append((self.name, "after_parse", command.name))
+        return parsed_cli
+
+    def around_handler(self, command, kwargs, call_next):
+        self.events.append((self.name, "enter"))
+        result = call_next(kwargs)
+        self.events.append((self.name, "exit"))
+        return result
+
+    def on_error(self, error, command):
+        self.events.append((self.name, "error", str(error)))
+
+
+class Retry(Middleware):
+    def __init__(self, attempts):
+        self.attempts = attempts
+
+    def around_handler(self, command, kwargs, call_next):
+        for attempt in range(self.attempts - 1):
+            try:
+                return call_next(kwargs)
+            except ConnectionError:
+                pass
+        return call_next(kwargs)
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+def _build_cli(events, handler, inherit_middleware=True):
+    return CLI(
+        title="Test CLI",
+        middleware=[Recorder("root", events)],
+        global_middleware=[Recorder("global", events)],
+        subcommands=[
+            Command(
+                name="greet",
+                handler=handler,
+                options=[Option(flags=["-n", "--name"])],
+                middleware=[Recorder("greet", events)],
+                inherit_middleware=inherit_middleware,
+            )
+        ],
+    )
+
+
+def test_middleware_runs_outermost_first(events):
+    cli = _build_cli(events, lambda name: f"Hello, {name}!")
+
+    assert cli.invoke(["greet", "-n", "Alice"]) == "Hello, Alice!"
+    assert events == [
+        ("global", "before_parse"),
+        ("global", "after_parse", "greet"),
+        ("root", "after_parse", "greet"),
+        ("greet", "after_parse", "greet"),
+        ("global", "enter"),
+        ("root", "enter"),
+        ("greet", "enter"),
+        ("greet", "exit"),
+        ("root", "exit"),
+        ("global", "exit"),
+    ]
+
+
+def test_middleware_not_inherited(events):
+    cli = _build_cli(events, lambda name: None, inherit_middleware=False)
+
+    cli.invoke(["greet", "-n", "Alice"])
+
+    assert not [event for event in events if event[0] == "root"]
+
+
+def test_middleware_on_error(events):
+    def fail(name):
+        raise RuntimeError("boom")
+
+    cli = _build_cli(events, fail)
+
+    with pytest.raises(HandlerError):
+        cli.invoke(["greet", "-n", "Alice"])
+    assert ("greet", "error", "boom") in events
+
+
+def test_middleware_around_handler_can_retry():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("unreachable")
+        return "done"
+
+    cli = CLI(title="Test CLI", handler=flaky, middleware=[Retry(3)])
+
+    assert cli.invoke([]) == "done"
+    assert len(attempts) == 3
+
+
+def test_middleware_with_ainvoke(events):
+    async def greet(name):
+        return f"Hello, {name}!"
+
+    cli = _build_cli(events, greet)
+
+    assert asyncio.run(cli.ainvoke(["greet", "-n", "Bob"])) == "Hello, Bob!"
+
+
+def test_middleware_added_later():
+    events = []
+    command = Command(name="greet", handler=lambda: "hi")
+    cli = CLI(title="Test CLI", subcommands=[command])
+    cli.invoke(["greet"])
+
+    command.add_middleware(Recorder("greet", events))
+    cli.invoke(["greet"])
+
+    assert ("greet", "enter") in events
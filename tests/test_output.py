@@ -0,0 +1,140 @@
+import io
+import json
+from datetime import datetime
+
+import pytest
+from unittest.mock import patch
+
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli.console import Console
+from saiuncli.exceptions import ParseError
+from saiuncli.option import Option
+
+
+def _records(output: str):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+@pytest.fixture
+def cli():
+    console = Console()
+
+    def deploy(target: str):
+        console.info(f"Deploying [bold]{target}[/bold]")
+        if target == "broken":
+            raise RuntimeError("Deployment failed")
+        console.success("Deployed")
+
+    return CLI(
+        title="Test CLI",
+        console=console,
+        subcommands=[
+            Command(
+                name="deploy",
+                handler=deploy,
+                options=[Option(flags=["-t", "--target"], required=True)],
+            )
+        ],
+        batch_flags=["--batch"],
+        batch_workers=2,
+        output_flags=["--output"],
+    )
+
+
+def test_console_writes_json_lines_records(capsys):
+    from rich.text import Text
+
+    console = Console(output_format="jsonl")
+
+    console.warning("Disk [bold]almost[/bold] full")
+    console.print("a", "b", sep="-")
+    console.print(Text("Styled", style="bold red"))
+    console.print()
+
+    records = _records(capsys.readouterr().out)
+    assert [(record["level"], record["message"]) for record in records] == [
+        ("warning", "Disk almost full"),
+        ("info", "a-b"),
+        ("info", "Styled"),
+    ]
+    assert records[0]["command"] == ""
+    assert datetime.fromisoformat(records[0]["timestamp"]).tzinfo is not None
+
+
+def test_console_output_format_from_environment(capsys, monkeypatch):
+    monkeypatch.setenv("SAIUNCLI_OUTPUT", "json")
+    console = Console()
+
+    with console.invocation("deploy web"):
+        console.error("Failed")
+
+    assert console.output_format == "json"
+    assert _records(capsys.readouterr().out)[0]["command"] == "deploy web"
+    with pytest.raises(ValueError, match="Invalid output format 'xml'"):
+        Console(output_format="xml")
+
+
+def test_output_flag_selects_format_for_invocation(cli: CLI, capsys):
+    cli.run(argv=["deploy", "--target", "web", "--output", "jsonl"])
+
+    records = _records(capsys.readouterr().out)
+    assert [(record["level"], record["message"]) for record in records] == [
+        ("info", "Deploying web"),
+        ("success", "Deployed"),
+    ]
+    assert {record["command"] for record in records} == {"deploy"}
+
+    cli.run(argv=["deploy", "--target", "web"])
+    assert capsys.readouterr().out.startswith("ℹ Deploying web\n")
+
+
+def test_errors_are_records_without_help(cli: CLI, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        cli.run(argv=["--output", "json", "deploy", "--target", "broken"])
+
+    assert exc_info.value.code == 1
+    records = _records(capsys.readouterr().out)
+    assert records[-1]["level"] == "error"
+    assert records[-1]["message"] == "Deployment failed"
+
+    # The output flag applies to parse errors too, wherever it is on the command line.
+    for argv in (
+        ["--output", "jsonl", "deploy", "--bogus"],
+        ["deploy", "--bogus", "--output", "jsonl"],
+        ["deploy", "--bogus", "--", "--output", "jsonl"],
+    ):
+        with pytest.raises(SystemExit) as exc_info:
+            cli.run(argv=argv)
+        assert exc_info.value.code == 1
+        records = _records(capsys.readouterr().out)
+        assert len(records) == 1
+        assert records[0]["level"] == "error"
+        assert records[0]["command"] == "deploy"
+        assert records[0]["message"].startswith("Invalid option '--bogus'")
+    with pytest.raises(ParseError, match="Invalid output format 'xml'"):
+        cli.parse(["--output", "xml"])
+
+
+def test_batch_lines_keep_output_format(cli: CLI, capsys):
+    lines = "deploy -t web\ndeploy -t db\n"
+    with patch("sys.stdin", io.StringIO(lines)):
+        cli.run(argv=["--output", "jsonl", "--batch", "-"])
+
+    messages = sorted(record["message"] for record in _records(capsys.readouterr().out))
+    assert messages == ["Deployed", "Deployed", "Deploying db", "Deploying web"]
+
+
+def test_help_records_are_not_cached_as_text_help(cli: CLI, capsys, tmp_path):
+    cli.help_cache = str(tmp_path / "help.json")
+
+    cli.run(argv=["--output", "jsonl", "--help"])
+    records = _records(capsys.readouterr().out)
+    assert any(record["message"].startswith("Usage:") for record in records)
+    assert not (tmp_path / "help.json").exists()
+
+    cli.run(argv=["--help"])
+    output = capsys.readouterr().out
+    assert "Usage:" in output
+    assert "{" not in output
+    assert "Usage:" in json.loads((tmp_path / "help.json").read_text())["entries"].popitem()[1]
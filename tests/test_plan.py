@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch
+
+from saiuncli.cli import CLI
+from saiuncli.command import Command
+from saiuncli.option import Option
+from saiuncli.argument import Argument
+
+from .data import dummy_handler
+
+
+def _build_cli(**kwargs):
+    return CLI(
+        title="Test CLI",
+        handler=dummy_handler,
+        global_options=[Option(flags=["-v", "--verbose"], action="store_true")],
+        subcommands=[
+            Command(
+                name="deploy",
+                handler=dummy_handler,
+                options=[Option(flags=["-e", "--env"], choices=["dev", "prod"])],
+                arguments=[Argument(name="target")],
+            )
+        ],
+        **kwargs,
+    )
+
+
+def test_compile_freezes_command_tree():
+    cli = _build_cli()
+    plan = cli.compile()
+
+    deploy = plan.root.subcommands["deploy"]
+    assert deploy.path == ("deploy",)
+    assert set(deploy.flags) == {"-e", "--env", "-v", "--verbose"}
+    assert deploy.flags["--env"].choices == frozenset({"dev", "prod"})
+    assert [argument.name for argument in deploy.positionals] == ["target"]
+    assert cli.compile() is plan
+
+
+def test_compile_invalidated_by_tree_changes():
+    cli = _build_cli()
+    plan = cli.compile()
+
+    cli.find_subcommand("deploy").add_option(Option(flags=["--force"], action="store_true"))
+    new_plan = cli.compile()
+
+    assert new_plan is not plan
+    assert new_plan.key != plan.key
+    assert "--force" in new_plan.root.subcommands["deploy"].flags
+
+
+def test_compile_validates_duplicate_flags():
+    cli = _build_cli()
+    cli.add_option(Option(flags=["-x"]))
+    cli.add_option(Option(flags=["-x", "--extra"]))
+
+    with pytest.raises(ValueError):
+        cli.compile()
+
+
+@patch("sys.argv", new_callable=list)
+def test_plan_cache_loaded_instead_of_recompiled(mock_argv, tmp_path):
+    cache_path = str(tmp_path / "plan.cache")
+    plan = _build_cli().compile(cache_path)
+
+    cli = _build_cli(plan_cache=cache_path)
+    mock_argv.extend(["tool", "deploy", "-e", "prod", "web"])
+    with patch("saiuncli.cli.compile_plan") as mock_compile_plan:
+        parsed_cli = cli.parse_cli()
+
+    mock_compile_plan.assert_not_called()
+    assert cli.compile().key == plan.key
+    assert parsed_cli.commands == ["root", "deploy"]
+    assert parsed_cli.parsed_options == {"env": "prod"}
+    assert parsed_cli.parsed_args == {"target": "web"}
@@ -0,0 +1,107 @@
+import json
+import sys
+
+import pytest
+from unittest.mock import patch
+
+from saiuncli.cli import CLI
+from saiuncli.option import Option
+from saiuncli.profiling import Profiler, _profiler_from_argv
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def cli(calls):
+    return CLI(
+        title="Test CLI",
+        handler=lambda name: calls.append(name),
+        options=[Option(flags=["-n", "--name"])],
+    )
+
+
+def test_profile_env_reports_phases(cli, calls, capsys, monkeypatch):
+    monkeypatch.setenv("SAIUNCLI_PROFILE", "1")
+
+    cli.run(argv=["-n", "Alice"])
+
+    report = capsys.readouterr().err
+    assert calls == ["Alice"]
+    assert report.startswith("saiuncli profile:")
+    for phase in ("startup", "parse", "prepare", "handler", "run"):
+        assert f"  {phase} " in report
+
+
+def test_profile_flag_writes_chrome_trace(cli, calls, capsys, tmp_path, monkeypatch):
+    monkeypatch.delenv("SAIUNCLI_PROFILE", raising=False)
+    trace_path = tmp_path / "trace.json"
+
+    with patch.object(sys, "argv", ["tool", f"--saiun-profile=trace={trace_path}", "-n", "Bob"]):
+        cli.run()
+
+    assert calls == ["Bob"]
+    assert capsys.readouterr().err == ""
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert {event["name"] for event in events} >= {"parse", "handler", "run"}
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+def test_profile_captures_handler(cli, capsys, monkeypatch):
+    monkeypatch.setenv("SAIUNCLI_PROFILE", "cprofile,tracemalloc")
+
+    cli.run(argv=["-n", "Alice"])
+
+    report = capsys.readouterr().err
+    assert "peak memory:" in report
+    assert "function calls" in report
+
+
+def test_profile_disabled_by_default(cli, capsys, monkeypatch):
+    monkeypatch.delenv("SAIUNCLI_PROFILE", raising=False)
+
+    cli.run(argv=["-n", "Alice"])
+
+    assert capsys.readouterr().err == ""
+
+
+def test_invalid_profile_spec_is_reported_and_ignored(cli, calls, capsys, monkeypatch):
+    monkeypatch.setenv("SAIUNCLI_PROFILE", "bogus")
+
+    cli.run(argv=["-n", "Alice"])
+
+    assert calls == ["Alice"]
+    assert capsys.readouterr().err == (
+        "saiuncli: Invalid profiler mode 'bogus', profiling is disabled.\n"
+    )
+
+
+def test_profile_flag_is_recognized_anywhere(monkeypatch):
+    # The parser has no "--" separator, so neither has the scan for the profile flag.
+    monkeypatch.delenv("SAIUNCLI_PROFILE", raising=False)
+    argv = ["-n", "Alice", "--", "--saiun-profile"]
+
+    assert _profiler_from_argv(argv) is not None
+    assert argv == ["-n", "Alice", "--"]
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("", (True, False, False, None)),
+        ("cprofile", (True, True, False, None)),
+        ("trace=out.json", (False, False, False, "out.json")),
+        ("report,trace=out.json", (True, False, False, "out.json")),
+    ],
+)
+def test_profiler_from_spec(spec, expected):
+    profiler = Profiler.from_spec(spec)
+
+    assert (profiler.report, profiler.cprofile, profiler.tracemalloc, profiler.trace_path) == (
+        expected
+    )
+
+    with pytest.raises(ValueError, match="Invalid profiler mode 'flame'"):
+        Profiler.from_spec("flame")
@@ -0,0 +1,94 @@
+import json
+import time
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from saiuncli.console import Console
+
+
+def _advance_remote(task, amount):
+    for _ in range(amount):
+        task.advance()
+
+
+@pytest.fixture
+def plain_output(monkeypatch):
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    monkeypatch.delenv("TTY_COMPATIBLE", raising=False)
+
+
+def test_progress_plain_lines_when_not_a_terminal(capsys, plain_output):
+    console = Console()
+
+    with console.progress(plain_interval=60) as progress:
+        download = progress.add_task("Downloading", total=4)
+        progress.add_task("Indexing")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(4):
+                executor.submit(download.advance)
+
+    assert download.finished
+    assert capsys.readouterr().out == "Downloading: 4/4 (100%)\nIndexing: 0\n"
+    assert console._rich_console is None
+
+
+def test_progress_plain_lines_only_for_changed_tasks(capsys, plain_output):
+    progress = Console().progress(plain_interval=60)
+    task = progress.add_task("Copying", total=10)
+    progress.start()
+    task.advance(5)
+    progress._refresh()
+    progress._refresh()
+    progress.stop()
+
+    assert capsys.readouterr().out == "Copying: 5/10 (50%)\n"
+
+
+def test_progress_updates_from_processes(capsys, plain_output):
+    with Console().progress(plain_interval=60, processes=True) as progress:
+        task = progress.add_task("Processing", total=20)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(_advance_remote, [task, task], [10, 10]))
+
+    assert task.completed == 20
+    assert capsys.readouterr().out == "Processing: 20/20 (100%)\n"
+
+
+def test_progress_tasks_not_shared_with_processes_by_default():
+    progress = Console().progress()
+    task = progress.add_task("Processing")
+
+    with pytest.raises(TypeError, match="processes=True"):
+        pickle.dumps(task)
+
+
+def test_progress_bars_on_terminal(capsys, monkeypatch):
+    monkeypatch.setenv("FORCE_COLOR", "1")
+
+    with Console().progress() as progress:
+        task = progress.add_task("Building", total=2)
+        task.advance(2)
+
+    output = capsys.readouterr().out
+    assert "Building" in output
+    assert "2/2" in output
+
+
+def test_progress_records_in_structured_output(capsys, monkeypatch):
+    monkeypatch.setenv("FORCE_COLOR", "1")
+    console = Console(output_format="jsonl")
+
+    with console.invocation("sync"):
+        with console.progress(plain_interval=0.01) as progress:
+            task = progress.add_task("Downloading", total=4)
+            task.advance(4)
+            time.sleep(0.1)
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[-1]["level"] == "progress"
+    assert records[-1]["command"] == "sync"
+    assert records[-1]["message"] == "Downloading: 4/4 (100%)"
+    assert {record["level"] for record in records} == {"progress"}
+    assert console._rich_console is None
@@ -0,0 +1,135 @@
+import io
+import tracemalloc
+
+import pytest
+from unittest.mock import patch
+
+from saiuncli.argument import Argument
+from saiuncli.cli import CLI
+from saiuncli.exceptions import ParseError
+from saiuncli.option import Option
+from saiuncli.sources import ValueSource, args_file_tokens
+
+
+@pytest.fixture
+def cli():
+    return CLI(
+        title="Test CLI",
+        fromfile_prefix_chars="@",
+        options=[
+            Option(flags=["-n", "--name"]),
+            Option(flags=["--ids"], type=int, stream=True),
+        ],
+        arguments=[Argument(name="target"), Argument(name="paths", stream=True)],
+    )
+
+
+def test_args_file_expanded(cli, tmp_path):
+    args_file = tmp_path / "args.txt"
+    args_file.write_text("--name\nAlice Smith\n\n")
+
+    parsed = cli.parse(["@" + str(args_file)])
+
+    assert parsed.parsed_options["name"] == "Alice Smith"
+
+
+def test_option_values_from_args_file(tmp_path):
+    cli = CLI(
+        title="Test CLI",
+        fromfile_prefix_chars="@",
+        options=[
+            Option(flags=["-n", "--name"]),
+            Option(flags=["--ids"], type=int, nargs="*"),
+        ],
+    )
+    ids_file = tmp_path / "ids.txt"
+    ids_file.write_text("1\n2\n\n3\n")
+    name_file = tmp_path / "name.txt"
+    name_file.write_text("Alice Smith\n")
+
+    parsed = cli.parse(["--ids", "0", "@" + str(ids_file), "4", "-n", "@" + str(name_file)])
+
+    assert parsed.parsed_options["ids"] == [0, 1, 2, 3, 4]
+    assert parsed.parsed_options["name"] == "Alice Smith"
+
+
+def test_args_file_unreadable(cli, tmp_path):
+    with pytest.raises(ParseError, match="Cannot read arguments file"):
+        cli.parse(["-n", "x", "@" + str(tmp_path / "missing.txt")])
+
+
+def test_stream_option_from_file(cli, tmp_path):
+    ids_file = tmp_path / "ids.txt"
+    ids_file.write_text("1\n2\r\n\n3")
+
+    parsed = cli.parse(["--ids", "@" + str(ids_file)])
+
+    source = parsed.parsed_options["ids"]
+    assert isinstance(source, ValueSource)
+    assert source.path == str(ids_file)
+    assert list(source) == [1, 2, 3]
+
+
+def test_stream_argument_from_stdin(cli):
+    with patch("sys.stdin", io.StringIO("a.txt\nb.txt\n")):
+        parsed = cli.parse(["build", "-"])
+        assert parsed.parsed_args["paths"].is_stdin
+        assert list(parsed.parsed_args["paths"]) == ["a.txt", "b.txt"]
+
+
+def test_stream_argument_not_expanded(cli, tmp_path):
+    paths_file = tmp_path / "paths.txt"
+    paths_file.write_text("a.txt\n")
+
+    parsed = cli.parse(["build", "@" + str(paths_file)])
+
+    assert parsed.parsed_args["target"] == "build"
+    assert list(parsed.parsed_args["paths"]) == ["a.txt"]
+
+
+def test_stream_literal_value(cli):
+    parsed = cli.parse(["--ids", "7"])
+    assert list(parsed.parsed_options["ids"]) == [7]
+
+
+def test_stream_unreadable_file(cli, tmp_path):
+    with pytest.raises(ParseError, match="Cannot read"):
+        cli.parse(["--ids", "@" + str(tmp_path / "missing.txt")])
+
+
+def test_stream_invalid_choice(tmp_path):
+    values = tmp_path / "values.txt"
+    values.write_text("a\nz\n")
+    source = ValueSource("@" + str(values), choices=["a", "b"], name="letters")
+    with pytest.raises(ValueError, match="Invalid choice 'z' for 'letters'"):
+        list(source)
+
+
+def test_stream_option_requires_store():
+    with pytest.raises(ValueError):
+        Option(flags=["--ids"], action="append", stream=True)
+
+
+@pytest.mark.parametrize("lines", [1_000, 200_000])
+def test_stream_memory_is_flat(tmp_path, lines):
+    # 200k lines are over the memory-mapping threshold, 1k lines are read in chunks.
+    values = tmp_path / "values.txt"
+    values.write_text("".join(f"{i:08d}\n" for i in range(lines)))
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in ValueSource("@" + str(values), type=int))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count == lines
+    assert peak < 1 << 20
+
+
+def test_args_file_tokens_lazy(tmp_path):
+    args_file = tmp_path / "args.txt"
+    args_file.write_text("a\nb\n")
+    tokens = args_file_tokens(str(args_file))
+    assert next(tokens) == "a"
+    assert list(tokens) == ["b"]